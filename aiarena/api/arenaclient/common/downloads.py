@@ -0,0 +1,128 @@
+import re
+from datetime import datetime
+
+from django.core.files import File
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_PATTERN = re.compile(r"^bytes=(?P<start>\d*)-(?P<end>\d*)$")
+
+
+def file_download_response(
+    request: HttpRequest,
+    file: File,
+    filename: str,
+    md5hash: str = None,
+    content_type: str = "application/zip",
+) -> HttpResponse:
+    """
+    Streams a file to an arena client.
+
+    When the file's MD5 hash is known, it's used as a strong ETag, so clients which already have the file can skip
+    downloading it again via If-None-Match. Otherwise, the file's modified time is used with If-Modified-Since.
+    A single byte range may be requested, so interrupted downloads can be resumed.
+    """
+    etag = f'"{md5hash}"' if md5hash else None
+    last_modified = _get_modified_time(file)
+
+    if _is_not_modified(request, etag, last_modified):
+        response = HttpResponseNotModified()
+        _set_validator_headers(response, etag, last_modified)
+        return response
+
+    size = file.size
+    start, end = 0, size - 1
+    byte_range = _get_range(request, etag, last_modified)
+    if byte_range is not None:
+        start, end = _resolve_range(byte_range, size)
+        if start > end:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    response = StreamingHttpResponse(
+        _stream(file, start, end - start + 1),
+        status=206 if byte_range is not None else 200,
+        content_type=content_type,
+    )
+    if byte_range is not None:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = end - start + 1
+    response["Accept-Ranges"] = "bytes"
+    response["Content-Disposition"] = f'inline; filename="{filename}"'
+    _set_validator_headers(response, etag, last_modified)
+    return response
+
+
+def _get_modified_time(file: File) -> datetime | None:
+    try:
+        return file.storage.get_modified_time(file.name)
+    except NotImplementedError:
+        return None
+
+
+def _set_validator_headers(response: HttpResponse, etag: str | None, last_modified: datetime | None):
+    if etag is not None:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+
+
+def _is_not_modified(request: HttpRequest, etag: str | None, last_modified: datetime | None) -> bool:
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is sent
+        if etag is None:
+            return False
+        return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+    if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    return (
+        if_modified_since is not None
+        and last_modified is not None
+        and int(last_modified.timestamp()) <= if_modified_since
+    )
+
+
+def _get_range(request: HttpRequest, etag: str | None, last_modified: datetime | None) -> tuple[str, str] | None:
+    """Returns the requested byte range's start and end, as sent. Requests for multiple ranges are served in full."""
+    match = _RANGE_PATTERN.match(request.META.get("HTTP_RANGE", "").strip())
+    if match is None or match.group("start") == match.group("end") == "":
+        return None
+
+    # A range conditional on a different version of the file is ignored, so the whole new version is sent
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range is not None:
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            if etag is None or if_range != etag:
+                return None
+        elif last_modified is None or parse_http_date_safe(if_range) != int(last_modified.timestamp()):
+            return None
+    return match.group("start"), match.group("end")
+
+
+def _resolve_range(byte_range: tuple[str, str], size: int) -> tuple[int, int]:
+    """Resolves a byte range against the file's size. The start is after the end when the range can't be satisfied."""
+    start, end = byte_range
+    if start == "":  # the last n bytes
+        return max(size - int(end), 0), size - 1
+    if end == "":
+        return int(start), size - 1
+    if int(start) > int(end):
+        return int(start), -1
+    return int(start), min(int(end), size - 1)
+
+
+def _stream(file: File, start: int, length: int):
+    # Open a separate handle, so concurrent downloads of the same file don't share a position
+    with file.storage.open(file.name, "rb") as opened_file:
+        opened_file.seek(start)
+        while length > 0:
+            chunk = opened_file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
@@ -3,14 +3,15 @@ from rest_framework.fields import FileField, FloatField
 from rest_framework.reverse import reverse
 
 from aiarena.core.models import ArenaClientStatus, Bot, Map, Match, MatchParticipation, Result
-from aiarena.core.s3_helpers import get_file_s3_url_with_content_disposition, is_s3_file
+from aiarena.core.s3_helpers import get_cached_file_s3_url_with_content_disposition, is_s3_file
 from aiarena.core.validators import validate_not_inf, validate_not_nan
 
 
 class MapSerializer(serializers.ModelSerializer):
     class Meta:
         model = Map
-        fields = "__all__"
+        # file_hash is only part of the v2 contract
+        fields = ("id", "name", "file", "game_mode", "enabled", "competitions")
 
 
 class BotSerializer(serializers.ModelSerializer):
@@ -26,9 +27,9 @@ class BotSerializer(serializers.ModelSerializer):
         # The parameters in get_file_s3_url_with_content_disposition can only be specified with the S3 backend, else
         # it breaks.
         if is_s3_file(obj.bot_zip):
-            return get_file_s3_url_with_content_disposition(obj.bot_zip, f"{obj.name}.zip")
+            return get_cached_file_s3_url_with_content_disposition(obj.bot_zip, f"{obj.name}.zip")
         else:
-            p = MatchParticipation.objects.only("participant_number").get(bot=obj, match_id=self.root.instance.id)
+            p = self._get_participation(obj)
             return reverse(
                 "match-download-zip",
                 kwargs={"pk": self.root.instance.id, "p_num": p.participant_number},
@@ -36,17 +37,13 @@ class BotSerializer(serializers.ModelSerializer):
             )
 
     def get_bot_data(self, obj):
-        p = (
-            MatchParticipation.objects.select_related("bot")
-            .only("use_bot_data", "bot__bot_data", "participant_number")
-            .get(bot=obj, match_id=self.root.instance.id)
-        )
-        if p.use_bot_data and p.bot.bot_data:
+        p = self._get_participation(obj)
+        if p.use_bot_data and obj.bot_data:
             # This is_s3_file check is a quick fix to avoid having to figure out how to restructure the storage backend.
             # The parameters in get_file_s3_url_with_content_disposition can only be specified with the S3 backend, else
             # it breaks.
             if is_s3_file(obj.bot_data):
-                return get_file_s3_url_with_content_disposition(obj.bot_data, f"{obj.name}_data.zip")
+                return get_cached_file_s3_url_with_content_disposition(obj.bot_data, f"{obj.name}_data.zip")
             else:
                 return reverse(
                     "match-download-data",
@@ -56,6 +53,15 @@ class BotSerializer(serializers.ModelSerializer):
         else:
             return None
 
+    def _get_participation(self, obj) -> MatchParticipation:
+        """Returns the bot's participation in the match, from the context's participations if they were passed."""
+        participations = self.context.get("participations")
+        if participations is not None:
+            return participations[obj.id]
+        return MatchParticipation.objects.only("use_bot_data", "participant_number").get(
+            bot=obj, match_id=self.root.instance.id
+        )
+
     class Meta:
         model = Bot
         fields = (
@@ -1,11 +1,10 @@
 import logging
-from wsgiref.util import FileWrapper
 
 from django.conf import settings
 from django.core.cache import cache
 from django.db import transaction
-from django.db.models import Prefetch, Sum
-from django.http import HttpResponse
+from django.db.models import Prefetch, Sum, prefetch_related_objects
+from django.shortcuts import get_object_or_404
 
 from constance import config
 from rest_framework import mixins, status, viewsets
@@ -13,8 +12,10 @@ from rest_framework.decorators import action
 from rest_framework.exceptions import APIException, PermissionDenied
 from rest_framework.response import Response
 
-from aiarena.core.api import BotStatistics
+from aiarena.core.api import BotStatistics, Ladders
+from aiarena.core.api.internal.statistics.competition_participation_charts import CompetitionParticipationCharts
 from aiarena.core.models import (
+    ArenaClientStatus,
     BotCrashLimitAlert,
     CompetitionParticipation,
     Match,
@@ -26,6 +27,7 @@ from aiarena.core.permissions import IsArenaClient, IsArenaClientOrAdminUser
 from aiarena.core.utils import parse_tags
 
 from .ac_coordinator import ACCoordinator
+from .downloads import file_download_response
 from .exceptions import LadderDisabled, NoGameForClient
 from .serializers import (
     MatchSerializer,
@@ -51,19 +53,18 @@ class MatchViewSet(viewsets.GenericViewSet):
     throttle_scope = "arenaclient"
     swagger_schema = None  # exclude this from swagger generation
 
-    def load_participants(self, match: Match):
-        match.bot1 = (
-            MatchParticipation.objects.select_related("bot")
-            .only("bot")
-            .get(match_id=match.id, participant_number=1)
-            .bot
-        )
-        match.bot2 = (
-            MatchParticipation.objects.select_related("bot")
-            .only("bot")
-            .get(match_id=match.id, participant_number=2)
-            .bot
+    def load_match(self, match_id: int) -> tuple[Match, list[MatchParticipation]]:
+        """Loads everything the match's serializer needs: its participations, bots, their races and its map."""
+        participations = list(
+            MatchParticipation.objects.select_related("bot__plays_race", "match__map")
+            .filter(match_id=match_id)
+            .order_by("participant_number")
         )
+        match = participations[0].match
+        match.bot1 = participations[0].bot
+        match.bot2 = participations[1].bot
+        prefetch_related_objects([match.map], "competitions")
+        return match, participations
 
     def create(self, request, *args, **kwargs):
         no_game_available = cache.get("NoGameAvailable", False)
@@ -71,9 +72,12 @@ class MatchViewSet(viewsets.GenericViewSet):
         if request.user.is_arenaclient:
             match = ACCoordinator.next_match(request.user.arenaclient, no_game_available)
             if match:
-                self.load_participants(match)
+                match, participations = self.load_match(match.id)
 
-                serializer = self.get_serializer(match)
+                # Pass the participations on, so the serializer doesn't need to look up each bot's participation
+                context = self.get_serializer_context()
+                context["participations"] = {p.bot_id: p for p in participations}
+                serializer = self.get_serializer(match, context=context)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             else:
                 if not no_game_available:
@@ -86,9 +90,7 @@ class MatchViewSet(viewsets.GenericViewSet):
     def download_zip(self, request, *args, **kwargs):
         p = MatchParticipation.objects.get(match=kwargs["pk"], participant_number=kwargs["p_num"])
         if p.bot.can_download_bot_zip(request.user):
-            response = HttpResponse(FileWrapper(p.bot.bot_zip), content_type="application/zip")
-            response["Content-Disposition"] = f'inline; filename="{p.bot.name}.zip"'
-            return response
+            return file_download_response(request, p.bot.bot_zip, f"{p.bot.name}.zip", md5hash=p.bot.bot_zip_md5hash)
         else:
             raise PermissionDenied("You cannot download that bot zip.")
 
@@ -97,12 +99,23 @@ class MatchViewSet(viewsets.GenericViewSet):
     def download_data(self, request, *args, **kwargs):
         p = MatchParticipation.objects.get(match=kwargs["pk"], participant_number=kwargs["p_num"])
         if p.bot.can_download_bot_data(request.user):
-            response = HttpResponse(FileWrapper(p.bot.bot_data), content_type="application/zip")
-            response["Content-Disposition"] = f'inline; filename="{p.bot.name}_data.zip"'
-            return response
+            return file_download_response(
+                request, p.bot.bot_data, f"{p.bot.name}_data.zip", md5hash=p.bot.bot_data_md5hash
+            )
         else:
             raise PermissionDenied("You cannot download that bot data.")
 
+    @action(detail=True, methods=["GET"], name="Download the match's map file", url_path="map")
+    def download_map(self, request, *args, **kwargs):
+        match = get_object_or_404(Match.objects.select_related("map").only("map"), pk=kwargs["pk"])
+        return file_download_response(
+            request,
+            match.map.file,
+            match.map.file.name.split("/")[-1],
+            md5hash=match.map.file_hash,
+            content_type="application/octet-stream",
+        )
+
 
 class ResultViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     """
@@ -352,6 +365,15 @@ class ResultViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
 
                         BotStatistics.update_stats_based_on_result(sp1, result, sp2)
                         BotStatistics.update_stats_based_on_result(sp2, result, sp1)
+                        Ladders.update_elo_trend(sp1)
+                        Ladders.update_elo_trend(sp2)
+                        transaction.on_commit(
+                            lambda: CompetitionParticipationCharts.invalidate(sp1.id, sp2.id), robust=True
+                        )
+                        # Ranks depend on every participant in the competition, so they're updated after the commit
+                        # to avoid holding locks on all of them for the rest of the transaction.
+                        # The result has been stored by then, so a failure is logged rather than failing the request.
+                        transaction.on_commit(lambda: Ladders.update_leaderboard_ranks(sp1.competition), robust=True)
 
                         if result.is_crash_or_timeout:
                             run_consecutive_crashes_check(result.get_causing_participant_of_crash_or_timeout_result)
@@ -379,7 +401,9 @@ class SetArenaClientStatusViewSet(mixins.CreateModelMixin, viewsets.GenericViewS
     swagger_schema = None  # exclude this from swagger generation
 
     def perform_create(self, serializer):
-        serializer.save(arenaclient=self.request.user.arenaclient)
+        serializer.instance = ArenaClientStatus.set_status(
+            self.request.user.arenaclient, serializer.validated_data["status"]
+        )
 
 
 def run_consecutive_crashes_check(triggering_participant: MatchParticipation):
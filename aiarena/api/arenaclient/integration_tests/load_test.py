@@ -0,0 +1,248 @@
+"""
+Generates load against a local server with many concurrent mock arena clients, then reports each API endpoint's
+latency and error rate. Used to size the web workers and database connection pool ahead of busy periods.
+
+The arena clients authenticate with the API tokens created by the seed command, which are their AC number,
+so seed at least as many arena clients as are to be run. e.g.:
+
+    python manage.py seed --numacs 300 --matches 0 --flush --migrate
+    python -m aiarena.api.arenaclient.integration_tests.load_test --acs 300 --duration 600 --match-duration 5 30
+
+Results submitted with --failure-rate above 0 include bot crashes, so bots may be disabled by the crash limit
+during long runs.
+"""
+
+import argparse
+import bisect
+import json
+import logging
+import math
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+import requests
+
+from aiarena.api.arenaclient.integration_tests.mock_ac import MockArenaClient
+
+
+logger = logging.getLogger(__name__)
+
+WORKING_DIR = os.path.join(os.path.dirname(__file__), "tmp", "load_test")
+
+
+class LatencyRecorder:
+    """
+    Records the latency and outcome of each request, per endpoint. Safe to share between threads.
+    """
+
+    # Histogram bucket upper bounds, in seconds
+    BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, math.inf]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list)
+        self._status_codes = defaultdict(Counter)
+
+    def record(self, endpoint: str, seconds: float, status_code: int | None):
+        """
+        :param status_code: None if the request failed to complete, e.g. it timed out or the connection failed.
+        """
+        with self._lock:
+            self._latencies[endpoint].append(seconds)
+            self._status_codes[endpoint][status_code] += 1
+
+    def report(self) -> dict:
+        """
+        Returns each endpoint's request count, error rate, latency percentiles and latency histogram.
+        Requests which failed to complete, or which the server failed with a 5xx status, are counted as errors.
+        """
+        with self._lock:
+            latencies = {endpoint: sorted(values) for endpoint, values in self._latencies.items()}
+            status_codes = {endpoint: Counter(counts) for endpoint, counts in self._status_codes.items()}
+
+        report = {}
+        for endpoint in sorted(latencies):
+            values = latencies[endpoint]
+            errors = sum(count for code, count in status_codes[endpoint].items() if code is None or code >= 500)
+            histogram = [0] * len(LatencyRecorder.BUCKETS)
+            for value in values:
+                histogram[bisect.bisect_left(LatencyRecorder.BUCKETS, value)] += 1
+            report[endpoint] = {
+                "requests": len(values),
+                "errors": errors,
+                "error_rate": errors / len(values),
+                "status_codes": {
+                    str(code) if code is not None else "failed": count
+                    for code, count in sorted(status_codes[endpoint].items(), key=lambda item: item[0] or 0)
+                },
+                "mean": statistics.fmean(values),
+                "p50": self._percentile(values, 50),
+                "p90": self._percentile(values, 90),
+                "p99": self._percentile(values, 99),
+                "max": values[-1],
+                "histogram": {
+                    f"<={bound}" if bound != math.inf else f">{LatencyRecorder.BUCKETS[-2]}": count
+                    for bound, count in zip(LatencyRecorder.BUCKETS, histogram)
+                },
+            }
+        return report
+
+    @staticmethod
+    def _percentile(sorted_values: list[float], percentile: int) -> float:
+        return sorted_values[min(len(sorted_values) - 1, math.ceil(len(sorted_values) * percentile / 100) - 1)]
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace):
+        self._args = args
+        self.recorder = LatencyRecorder()
+        self.matches_played = 0
+        self.matches_failed = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run(self) -> dict:
+        threads = [
+            threading.Thread(target=self._run_ac, args=(ac_number,), daemon=True)
+            for ac_number in range(self._args.token_offset, self._args.token_offset + self._args.acs)
+        ]
+        started = time.monotonic()
+        for index, thread in enumerate(threads):
+            # Stagger the arena clients' starts, so they don't all request a match at once
+            if self._stop.wait(self._args.ramp_up * index / len(threads)):
+                break
+            thread.start()
+
+        try:
+            self._stop.wait(max(0.0, self._args.duration - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            logger.warning("Interrupted: waiting for in progress requests to finish.")
+        self._stop.set()
+        for thread in threads:
+            if thread.is_alive():
+                thread.join()
+        elapsed = time.monotonic() - started
+
+        endpoints = self.recorder.report()
+        requests_made = sum(endpoint["requests"] for endpoint in endpoints.values())
+        return {
+            "arena_clients": self._args.acs,
+            "elapsed_seconds": elapsed,
+            "matches_played": self.matches_played,
+            "matches_failed": self.matches_failed,
+            "matches_per_minute": self.matches_played / elapsed * 60,
+            "requests_per_second": requests_made / elapsed,
+            "endpoints": endpoints,
+        }
+
+    def _run_ac(self, ac_number: int):
+        ac_id = str(ac_number)
+        ac = MockArenaClient(
+            ac_id=ac_id,
+            webserver_url=self._args.url,
+            api_token=ac_id,
+            working_dir=os.path.join(WORKING_DIR, ac_id),
+            recorder=self.recorder,
+            timeout=self._args.timeout,
+            match_duration=tuple(self._args.match_duration),
+            failure_rate=self._args.failure_rate,
+            upload_size=self._args.upload_size,
+            report_status=self._args.report_status,
+        )
+
+        while not self._stop.is_set():
+            try:
+                played = ac.run_a_match()
+            except requests.RequestException as e:
+                logger.warning(f"AC {ac_id}: Request failed: {e}")
+                played = False
+
+            if played:
+                with self._lock:
+                    self.matches_played += 1
+                    if self._args.matches is not None and self.matches_played >= self._args.matches:
+                        self._stop.set()
+            else:
+                with self._lock:
+                    self.matches_failed += 1
+                # No match was available, or the match failed, so wait before asking for another
+                self._stop.wait(self._args.poll_interval)
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"Arena clients: {report['arena_clients']}",
+        f"Elapsed: {report['elapsed_seconds']:.1f}s",
+        f"Matches played: {report['matches_played']} ({report['matches_per_minute']:.1f}/min)",
+        f"Match attempts without a result: {report['matches_failed']}",
+        f"Requests: {report['requests_per_second']:.1f}/s",
+        "",
+        f"{'endpoint':<12}{'requests':>10}{'errors':>8}{'error %':>9}"
+        f"{'mean ms':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    for endpoint, stats in report["endpoints"].items():
+        lines.append(
+            f"{endpoint:<12}{stats['requests']:>10}{stats['errors']:>8}{stats['error_rate'] * 100:>9.2f}"
+            + "".join(f"{stats[key] * 1000:>10.1f}" for key in ("mean", "p50", "p90", "p99", "max"))
+        )
+    for endpoint, stats in report["endpoints"].items():
+        lines += ["", f"{endpoint} status codes: {stats['status_codes']}", f"{endpoint} latency histogram (s):"]
+        lines += [f"  {bucket:>8} {count}" for bucket, count in stats["histogram"].items()]
+    return "\n".join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="The website to generate load against.")
+    parser.add_argument("--acs", type=int, default=100, help="The number of concurrent arena clients.")
+    parser.add_argument(
+        "--token-offset", type=int, default=0, help="The AC number, and therefore API token, of the first arena client."
+    )
+    parser.add_argument("--duration", type=float, default=300, help="How long to generate load for, in seconds.")
+    parser.add_argument("--matches", type=int, help="Stop once this many matches have been played.")
+    parser.add_argument("--ramp-up", type=float, default=10, help="The seconds over which to start the arena clients.")
+    parser.add_argument(
+        "--match-duration",
+        type=float,
+        nargs=2,
+        default=[0, 0],
+        metavar=("MIN", "MAX"),
+        help="The range, in seconds, from which each match's duration is randomly picked.",
+    )
+    parser.add_argument(
+        "--failure-rate", type=float, default=0, help="The proportion of matches which end in a crash or error."
+    )
+    parser.add_argument(
+        "--upload-size",
+        type=int,
+        help="The size in bytes of each bot data, log and replay file uploaded with a result.",
+    )
+    parser.add_argument(
+        "--report-status", action="store_true", help="Have the arena clients report their status during each match."
+    )
+    parser.add_argument("--timeout", type=float, default=60, help="The timeout for each request, in seconds.")
+    parser.add_argument(
+        "--poll-interval", type=float, default=1, help="The seconds an arena client waits when no match is available."
+    )
+    parser.add_argument("--report", help="Also write the report as JSON to this path.")
+    parser.add_argument("--verbose", action="store_true", help="Log each arena client's activity.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    report = LoadTest(args).run()
+    print(format_report(report))
+    if args.report:
+        with open(args.report, "w") as report_file:
+            json.dump(report, report_file, indent=2)
@@ -4,6 +4,7 @@ import logging
 import os
 import random
 import shutil
+import time
 from urllib import parse
 
 import requests
@@ -19,24 +20,47 @@ class AiArenaWebACApi:
 
     API_MATCHES_ENDPOINT = "/api/arenaclient/matches/"
     API_RESULTS_ENDPOINT = "/api/arenaclient/results/"
+    API_SET_STATUS_ENDPOINT = "/api/arenaclient/set-status/"
 
-    def __init__(self, ac_id, api_url, api_token):
+    def __init__(self, ac_id, api_url, api_token, recorder=None, timeout=None):
+        """
+        :param recorder: If supplied, each request's latency and outcome is recorded against its endpoint
+        with recorder.record(endpoint, seconds, status_code). status_code is None when the request failed to complete.
+        :param timeout: The timeout in seconds for each request.
+        """
         self._ac_id = ac_id
         self.API_URL = api_url
         self.API_TOKEN = api_token
         self.API_MATCHES_URL = parse.urljoin(self.API_URL, AiArenaWebACApi.API_MATCHES_ENDPOINT)
         self.API_RESULTS_URL = parse.urljoin(self.API_URL, AiArenaWebACApi.API_RESULTS_ENDPOINT)
+        self.API_SET_STATUS_URL = parse.urljoin(self.API_URL, AiArenaWebACApi.API_SET_STATUS_ENDPOINT)
+        self._recorder = recorder
+        self._timeout = timeout
+
+    def _request(self, endpoint: str, method: str, url: str, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        try:
+            response = requests.request(method, url, timeout=self._timeout, **kwargs)
+        except requests.RequestException:
+            if self._recorder is not None:
+                self._recorder.record(endpoint, time.perf_counter() - started, None)
+            raise
+        if self._recorder is not None:
+            self._recorder.record(endpoint, time.perf_counter() - started, response.status_code)
+        return response
 
     def get_match(self):
         """
         Gets the next match in queue
         """
         try:
-            next_match_response = requests.post(
+            next_match_response = self._request(
+                "matches",
+                "POST",
                 self.API_MATCHES_URL,
                 headers={"Authorization": "Token " + self.API_TOKEN},
             )
-        except ConnectionError:
+        except requests.ConnectionError:
             logger.error(f"AC {self._ac_id}: Failed to retrieve game. Connection to website failed.")
             return None
 
@@ -79,7 +103,9 @@ class AiArenaWebACApi:
         if replay_file_stream:
             file_list["replay_file"] = replay_file_stream
 
-        post = requests.post(
+        post = self._request(
+            "results",
+            "POST",
             self.API_RESULTS_URL,
             files=file_list,
             data=payload,
@@ -90,7 +116,7 @@ class AiArenaWebACApi:
     def download_map(self, map_url: str, to_path: str) -> bool:
         success = False
         try:
-            r = requests.get(map_url)
+            r = self._request("map", "GET", map_url)
 
             with open(to_path, "wb") as map_file:
                 map_file.write(r.content)
@@ -102,22 +128,77 @@ class AiArenaWebACApi:
         return success
 
     def download_bot_zip(self, bot_zip_url: str, to_path: str):
-        r = requests.get(bot_zip_url, headers={"Authorization": "Token " + self.API_TOKEN})
+        r = self._request("bot_zip", "GET", bot_zip_url, headers={"Authorization": "Token " + self.API_TOKEN})
         with open(to_path, "wb") as bot_zip:
             bot_zip.write(r.content)
 
     def download_bot_data(self, bot_data_url: str, to_path: str):
-        r = requests.get(bot_data_url, headers={"Authorization": "Token " + self.API_TOKEN})
+        r = self._request("bot_data", "GET", bot_data_url, headers={"Authorization": "Token " + self.API_TOKEN})
         with open(to_path, "wb") as bot_data_zip:
             bot_data_zip.write(r.content)
 
+    def set_status(self, status: str) -> bool:
+        """
+        Reports the arena client's status
+        """
+        try:
+            response = self._request(
+                "set_status",
+                "POST",
+                self.API_SET_STATUS_URL,
+                data={"status": status},
+                headers={"Authorization": "Token " + self.API_TOKEN},
+            )
+        except requests.ConnectionError:
+            logger.error(f"AC {self._ac_id}: Failed to set status. Connection to website failed.")
+            return False
+
+        if response.status_code >= 400:
+            logger.error(f"AC {self._ac_id}: Failed to set status. Status code: {response.status_code}.")
+            return False
+        return True
+
 
 class MockArenaClient:
-    def __init__(self, ac_id: str, webserver_url: str, api_token: str, working_dir: str):
+    RESULT_TYPES = ["Player1Win", "Player2Win", "Tie"]
+    FAILURE_RESULT_TYPES = [
+        "InitializationError",
+        "Error",
+        "Player1Crash",
+        "Player2Crash",
+        "Player1TimeOut",
+        "Player2TimeOut",
+    ]
+
+    def __init__(
+        self,
+        ac_id: str,
+        webserver_url: str,
+        api_token: str,
+        working_dir: str,
+        recorder=None,
+        timeout: float = None,
+        match_duration: tuple[float, float] = (0, 0),
+        failure_rate: float = 0,
+        upload_size: int = None,
+        report_status: bool = False,
+    ):
+        """
+        :param recorder: Passed on to AiArenaWebACApi, to record each request's latency.
+        :param timeout: The timeout in seconds for each request.
+        :param match_duration: The range, in seconds, from which each match's duration is randomly picked.
+        :param failure_rate: The proportion of matches which end in a crash, time out or error.
+        :param upload_size: If supplied, the size in bytes of each bot data, log and replay file uploaded with a result.
+        :param report_status: Whether to report the arena client's status as it plays each match.
+        """
         self._ac_id = ac_id
         self._webserver_url = webserver_url
-        self._api = AiArenaWebACApi(self._ac_id, webserver_url, api_token)
+        self._api = AiArenaWebACApi(self._ac_id, webserver_url, api_token, recorder=recorder, timeout=timeout)
         self._working_dir = working_dir
+        self._match_duration = match_duration
+        self._failure_rate = failure_rate
+        self._upload_size = upload_size
+        self._report_status = report_status
 
     def run_matches(self, num_matches: int):
         for x in range(num_matches):
@@ -143,6 +224,7 @@ class MockArenaClient:
 
         next_match_id = match["id"]
         logger.info(f"AC {self._ac_id}: Next match: {next_match_id}")
+        self._set_status("starting_game")
 
         # Download map
         logger.info(f"AC {self._ac_id}: Downloading map {match['map']['name']}")
@@ -155,8 +237,16 @@ class MockArenaClient:
             logger.error(f"AC {self._ac_id}: Failed to download bot files.")
             return False
 
+        self._set_status("playing_game")
         result = self._mock_match_activity()
-        return self._submit_result(match, result, random.randint(1, 80640))
+        self._set_status("submitting_result")
+        success = self._submit_result(match, result, random.randint(1, 80640))
+        self._set_status("idle")
+        return success
+
+    def _set_status(self, status: str):
+        if self._report_status:
+            self._api.set_status(status)
 
     def _clean_working_dir(self):
         # Iterate over the files in the folder and delete them
@@ -175,14 +265,27 @@ class MockArenaClient:
         return self._download_bot_files(match["bot1"], "1") and self._download_bot_files(match["bot2"], "2")
 
     def _mock_match_activity(self) -> str:
-        # todo: determine result
-        # todo: log stuff to bot data & AC log
+        time.sleep(random.uniform(*self._match_duration))
 
-        # Create a fake replay file
-        with open(os.path.join(self._working_dir, "replay.SC2Replay"), "w") as f:
-            f.write("This is a mock replay")
-
-        return "Tie"
+        if self._upload_size is None:
+            # Create a fake replay file
+            with open(os.path.join(self._working_dir, "replay.SC2Replay"), "w") as f:
+                f.write("This is a mock replay")
+        else:
+            for file_name in [
+                "replay.SC2Replay",
+                "bot1-data.zip",
+                "bot1-log.zip",
+                "bot2-data.zip",
+                "bot2-log.zip",
+                "ac-log.zip",
+            ]:
+                with open(os.path.join(self._working_dir, file_name), "wb") as f:
+                    f.write(random.randbytes(self._upload_size))
+
+        if random.random() < self._failure_rate:
+            return random.choice(MockArenaClient.FAILURE_RESULT_TYPES)
+        return random.choice(MockArenaClient.RESULT_TYPES)
 
     def _submit_result(self, match, result_type, game_steps):
         success = True
@@ -1,20 +1,31 @@
+import hashlib
 import io
 import json
+from datetime import timedelta
+from unittest.mock import patch
 
 from django.conf import settings
 from django.db.models import Sum
 from django.test import TransactionTestCase
+from django.utils import timezone
 
 import jsonschema
 from constance import config
 from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
 
-from aiarena.core.api import Matches
+from aiarena.api.arenaclient.common.serializers import MatchSerializer
+from aiarena.api.arenaclient.common.views import MatchViewSet
+from aiarena.core.api import BotStatistics, Matches
 from aiarena.core.models import (
     ArenaClient,
+    ArenaClientStatus,
+    ArenaClientStatusTime,
     Bot,
     BotCrashLimitAlert,
     Competition,
+    CompetitionBotDurationStats,
+    CompetitionBotRollupStats,
     CompetitionParticipation,
     Map,
     Match,
@@ -416,6 +427,67 @@ class ResultsTestCase(LoggedInMixin, TransactionTestCase):
                 TestAssetPaths.test_bot_datas["bot2"][data_index]["hash"], Bot.objects.get(id=bot1.id).bot_data_md5hash
             )
 
+    def test_create_result_after_commit_failure(self):
+        self.test_client.login(self.staffUser1)
+        comp = self._create_game_mode_and_open_competition()
+        self._create_map_for_competition("test_map", comp.id)
+        self._create_active_bot_for_competition(comp.id, self.regularUser1, "bot1")
+        self._create_active_bot_for_competition(comp.id, self.regularUser1, "bot2", BotRace.zerg())
+
+        response = self._post_to_matches()
+        self.assertEqual(response.status_code, 201)
+        match_id = response.data["id"]
+
+        # the result is stored before the ranks are updated, so a failure to update them shouldn't fail the request
+        with patch("aiarena.core.api.Ladders.update_leaderboard_ranks", side_effect=Exception("Ranks failed")):
+            with self.assertLogs("django.db.backends.base", "ERROR"):
+                response = self._post_to_results(match_id, "Player1Win")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Result.objects.filter(match_id=match_id).exists())
+
+    def test_create_result_race_mismatch(self):
+        self.test_client.login(self.staffUser1)
+        comp = self._create_game_mode_and_open_competition()
+        self._create_map_for_competition("test_map", comp.id)
+        self._create_active_bot_for_competition(comp.id, self.regularUser1, "bot1")
+        self._create_active_bot_for_competition(comp.id, self.regularUser1, "bot2", BotRace.zerg())
+
+        response = self._post_to_matches()
+        self.assertEqual(response.status_code, 201)
+        match_id = response.data["id"]
+
+        response = self._post_to_results(match_id, "Player1RaceMismatch")
+        self.assertEqual(response.status_code, 201, f"{response.status_code} {response.data}")
+
+        def _stats():
+            return (
+                list(
+                    CompetitionBotRollupStats.objects.order_by("bot").values(
+                        "bot", "match_count", "win_count", "loss_count", "tie_count", "crash_count"
+                    )
+                ),
+                list(
+                    CompetitionBotDurationStats.objects.order_by("bot").values(
+                        "bot", "win_count", "loss_count", "tie_count", "crash_count"
+                    )
+                ),
+            )
+
+        # the bot with the wrong race loses
+        loser = CompetitionParticipation.objects.get(
+            competition=comp, bot__matchparticipation__match_id=match_id, bot__matchparticipation__participant_number=1
+        )
+        updated_stats = _stats()
+        self.assertIn(
+            {"bot": loser.id, "match_count": 1, "win_count": 0, "loss_count": 1, "tie_count": 0, "crash_count": 0},
+            updated_stats[0],
+        )
+
+        # the stats updated with the result should match a recalculation
+        for sp in CompetitionParticipation.objects.filter(competition=comp):
+            BotStatistics.recalculate_stats(sp)
+        self.assertEqual(updated_stats, _stats())
+
     def test_create_result_bot_not_in_match(self):
         self.test_client.login(self.staffUser1)
 
@@ -1207,6 +1279,154 @@ class SetStatusTestCase(LoggedInMixin, TransactionTestCase):
     def test_set_status(self):
         return self.client.post("/api/arenaclient/set-status/", {"status": "idle"})
 
+    def test_status_history(self):
+        start = timezone.now().replace(minute=40, second=0, microsecond=0) - timedelta(hours=2)
+        with patch("django.utils.timezone.now", return_value=start):
+            response = self.client.post("/api/arenaclient/set-status/", {"status": "idle"})
+        self.assertEqual(response.status_code, 201)
+        with patch("django.utils.timezone.now", return_value=start + timedelta(minutes=30)):
+            self.client.post("/api/arenaclient/set-status/", {"status": "playing_game"})
+        with patch("django.utils.timezone.now", return_value=start + timedelta(minutes=45)):
+            response = self.client.post("/api/arenaclient/set-status/", {"status": "idle"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {"status": "idle"})
+
+        # only the latest status is kept
+        status = ArenaClientStatus.objects.get()
+        self.assertEqual(status.status, "idle")
+        self.assertEqual(status.logged_at, start + timedelta(minutes=45))
+
+        # the time spent in each status is split across the hours it was spent in
+        hour = start.replace(minute=0)
+        self.assertEqual(
+            set(ArenaClientStatusTime.objects.values_list("hour", "status", "seconds")),
+            {
+                (hour, "idle", 20 * 60),
+                (hour + timedelta(hours=1), "idle", 10 * 60),
+                (hour + timedelta(hours=1), "playing_game", 15 * 60),
+            },
+        )
+        self.assertEqual(
+            ArenaClientStatusTime.get_utilisation(),
+            {"idle": 30 * 60, "starting_game": 0, "playing_game": 15 * 60, "submitting_result": 0},
+        )
+
+        response = self.client.get("/api/arena-clients/")
+        self.assertEqual(response.data["results"][0]["status"], "idle")
+
+    def test_status_history_after_long_gap(self):
+        now = timezone.now().replace(minute=30, second=0, microsecond=0)
+
+        # an arena client which stops reporting is only credited with its status until a match would time out
+        with patch("django.utils.timezone.now", return_value=now - timedelta(hours=5)):
+            self.client.post("/api/arenaclient/set-status/", {"status": "playing_game"})
+        with patch("django.utils.timezone.now", return_value=now):
+            self.client.post("/api/arenaclient/set-status/", {"status": "idle"})
+        self.assertEqual(
+            ArenaClientStatusTime.objects.aggregate(seconds=Sum("seconds"))["seconds"],
+            config.TIMEOUT_MATCHES_AFTER.total_seconds(),
+        )
+
+        # time older than the retention period isn't recorded
+        ArenaClientStatusTime.objects.all().delete()
+        ArenaClientStatus.objects.update(logged_at=now - timedelta(days=90))
+        with patch("django.utils.timezone.now", return_value=now):
+            response = self.client.post("/api/arenaclient/set-status/", {"status": "playing_game"})
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(ArenaClientStatusTime.objects.exists())
+
+
+class DownloadTestCase(MatchReadyMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.get(username="arenaclient1"))
+        response = self._post_to_matches()
+        self.assertEqual(response.status_code, 201)
+        self.match = response.data
+
+    def _get_content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_download_zip(self):
+        url = f"/api/arenaclient/matches/{self.match['id']}/1/zip/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = f'"{self.match["bot1"]["bot_zip_md5hash"]}"'
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        content = self._get_content(response)
+        self.assertEqual(int(response["Content-Length"]), len(content))
+        self.assertEqual(hashlib.md5(content).hexdigest(), self.match["bot1"]["bot_zip_md5hash"])
+
+        # a client which already has the file doesn't download it again
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+        # resuming an interrupted download
+        response = self.client.get(url, HTTP_RANGE="bytes=10-", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-{len(content) - 1}/{len(content)}")
+        self.assertEqual(self._get_content(response), content[10:])
+        response = self.client.get(url, HTTP_RANGE="bytes=5-9")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self._get_content(response), content[5:10])
+        response = self.client.get(url, HTTP_RANGE="bytes=-4")
+        self.assertEqual(self._get_content(response), content[-4:])
+
+        # the file changed since the download started, so all of it is sent
+        response = self.client.get(url, HTTP_RANGE="bytes=10-", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._get_content(response), content)
+
+        response = self.client.get(url, HTTP_RANGE=f"bytes={len(content)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(content)}")
+
+    def test_download_data(self):
+        response = self.client.get(f"/api/arenaclient/matches/{self.match['id']}/2/data/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["ETag"], f'"{self.match["bot2"]["bot_data_md5hash"]}"')
+        self.assertEqual(hashlib.md5(self._get_content(response)).hexdigest(), self.match["bot2"]["bot_data_md5hash"])
+
+    def test_download_map(self):
+        url = f"/api/arenaclient/matches/{self.match['id']}/map/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        map = Match.objects.get(id=self.match["id"]).map
+        self.assertEqual(response["ETag"], f'"{map.file_hash}"')
+        with map.file.open("rb") as map_file:
+            self.assertEqual(self._get_content(response), map_file.read())
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{map.file_hash}"')
+        self.assertEqual(response.status_code, 304)
+
+        # maps without a stored hash fall back to their modified time
+        Map.objects.update(file_hash=None)
+        response = self.client.get(url)
+        self.assertNotIn("ETag", response)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+
+class MatchSerializationTestCase(MatchReadyMixin, TransactionTestCase):
+    def test_match_serialization_query_budget(self):
+        self.client.force_login(User.objects.get(username="arenaclient1"))
+        response = self._post_to_matches()
+        self.assertEqual(response.status_code, 201)
+
+        request = APIRequestFactory().post("/api/arenaclient/matches/")
+        # one query for the match, its participations, bots, races and map, plus one for the map's competitions
+        with self.assertNumQueries(2):
+            match, participations = MatchViewSet().load_match(response.data["id"])
+            data = MatchSerializer(
+                match, context={"request": request, "participations": {p.bot_id: p for p in participations}}
+            ).data
+        self.assertEqual(data, response.data)
+        self.assertIsNotNone(data["bot2"]["bot_data"])
+        self.assertEqual(data["map"]["competitions"], list(match.map.competitions.values_list("id", flat=True)))
+
 
 class ArenaClientCompatibilityTestCase(MatchReadyMixin, TransactionTestCase):
     """
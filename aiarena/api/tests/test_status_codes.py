@@ -37,6 +37,10 @@ class ApiReadPublicPagesTestCase(FullDataSetMixin, TransactionTestCase):
         response = self.client.get("/api/")
         self.assertEqual(response.status_code, 200)
 
+    def test_get_api_arena_clients_page(self):
+        response = self.client.get("/api/arena-clients/")
+        self.assertEqual(response.status_code, 200)
+
     def test_get_api_bots_page(self):
         response = self.client.get("/api/bots/")
         self.assertEqual(response.status_code, 200)
@@ -89,6 +93,10 @@ class ApiReadPublicPagesTestCase(FullDataSetMixin, TransactionTestCase):
         response = self.client.get("/api/news/")
         self.assertEqual(response.status_code, 200)
 
+    def test_get_api_recent_results_page(self):
+        response = self.client.get("/api/recent-results/")
+        self.assertEqual(response.status_code, 200)
+
     def test_get_api_results_page(self):
         response = self.client.get("/api/results/")
         self.assertEqual(response.status_code, 200)
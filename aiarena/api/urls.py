@@ -10,6 +10,7 @@ router = DefaultRouter()
 
 router.register(r"auth", publicapi_views.AuthViewSet, basename="api_auth")
 
+router.register(r"arena-clients", publicapi_views.ArenaClientViewSet, basename="api_arena_client")
 router.register(r"bots", publicapi_views.BotViewSet, basename="api_bot")
 router.register(r"bot-races", publicapi_views.BotRaceViewSet, basename="api_bot_race")
 router.register(r"competitions", publicapi_views.CompetitionViewSet, basename="api_competition")
@@ -39,6 +40,7 @@ router.register(
     publicapi_views.PatreonUnlinkedDiscordUIDViewSet,
     basename="api_patreon_unlinked_discord_uids",
 )
+router.register(r"recent-results", publicapi_views.RecentResultViewSet, basename="api_recent_result")
 router.register(r"results", publicapi_views.ResultViewSet, basename="api_result")
 router.register(r"rounds", publicapi_views.RoundViewSet, basename="api_round")
 router.register(r"users", publicapi_views.UserViewSet, basename="api_user")
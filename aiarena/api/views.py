@@ -18,7 +18,10 @@ from rest_framework.viewsets import ViewSet
 
 from aiarena.api import serializers as api_serializers
 from aiarena.api.view_filters import BotFilter, MatchFilter, MatchParticipationFilter, ResultFilter
+from aiarena.core.api import RecentResultsFeed
 from aiarena.core.models import (
+    ArenaClient,
+    ArenaClientThroughput,
     Bot,
     Competition,
     CompetitionBotMapStats,
@@ -75,6 +78,14 @@ class AuthViewSet(ViewSet):
 # Allowing filtering/etc on sensitive fields could leak information.
 # Serializer fields are also manually specified so new private fields don't accidentally get leaked.
 
+arena_client_include_fields = (
+    "id",
+    "username",
+    "owner",
+    "trusted",
+    "is_active",
+    "submitted_result_count",
+)
 bot_include_fields = (
     "id",
     "user",
@@ -342,6 +353,55 @@ user_include_fields = (
 )
 
 
+# !ATTENTION! IF YOU CHANGE THE API ANNOUNCE IT TO USERS
+
+
+class ArenaClientSerializer(serializers.ModelSerializer):
+    status = serializers.CharField(source="status.status", default=None, read_only=True)
+    status_logged_at = serializers.DateTimeField(source="status.logged_at", default=None, read_only=True)
+    result_count_1h = serializers.SerializerMethodField()
+
+    def get_result_count_1h(self, obj):
+        return self.context["result_counts"].get(obj.id, (0, 0))[0]
+
+    result_count_24h = serializers.SerializerMethodField()
+
+    def get_result_count_24h(self, obj):
+        return self.context["result_counts"].get(obj.id, (0, 0))[1]
+
+    class Meta:
+        model = ArenaClient
+        fields = arena_client_include_fields + (
+            "status",
+            "status_logged_at",
+            "result_count_1h",
+            "result_count_24h",
+        )
+
+
+# !ATTENTION! IF YOU CHANGE THE API ANNOUNCE IT TO USERS
+
+
+class ArenaClientViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Arena client fleet status view
+    """
+
+    queryset = ArenaClient.objects.select_related("status")
+    serializer_class = ArenaClientSerializer
+
+    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filterset_fields = arena_client_include_fields
+    search_fields = arena_client_include_fields
+    ordering_fields = arena_client_include_fields
+
+    def get_serializer_context(self):
+        # The throughput of the whole fleet is read in one query, rather than once per arena client
+        context = super().get_serializer_context()
+        context["result_counts"] = ArenaClientThroughput.get_result_counts()
+        return context
+
+
 # !ATTENTION! IF YOU CHANGE THE API ANNOUNCE IT TO USERS
 # This is out of order, because it's used by the BotSerializer
 class TrophySerializer(serializers.ModelSerializer):
@@ -957,6 +1017,23 @@ class ResultViewSet(viewsets.ReadOnlyModelViewSet):
 # !ATTENTION! IF YOU CHANGE THE API ANNOUNCE IT TO USERS
 
 
+class RecentResultViewSet(ViewSet):
+    """
+    Summaries of the most recent results, newest first. Served from memory, so suitable for polling.
+    Use the limit parameter to return fewer than the maximum of 200 results.
+    """
+
+    def list(self, request):
+        try:
+            limit = min(int(request.query_params.get("limit", RecentResultsFeed.SIZE)), RecentResultsFeed.SIZE)
+        except ValueError:
+            return Response({"limit": "Must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(RecentResultsFeed.get(max(limit, 0)))
+
+
+# !ATTENTION! IF YOU CHANGE THE API ANNOUNCE IT TO USERS
+
+
 class RoundSerializer(serializers.ModelSerializer):
     class Meta:
         model = Round
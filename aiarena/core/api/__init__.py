@@ -1,7 +1,11 @@
 # ruff: noqa: F401
 from .bot_statistics import BotStatistics
 from .bots import Bots
+from .competition_history import CompetitionHistory
 from .competitions import Competitions
 from .ladders import Ladders
 from .maps import Maps
 from .matches import Matches
+from .page_cache import PageCache
+from .recent_results import RecentResultsFeed
+from .site_stats import SiteStats
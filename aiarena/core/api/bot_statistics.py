@@ -1,12 +1,20 @@
-from django.db import connection
-from django.db.models import Max
+from django.db.models import Count, F, FloatField, Max, OuterRef, Q, QuerySet, Subquery, Sum
+from django.db.models.functions import Cast, Least
 
 from django_pglocks import advisory_lock
 
 from aiarena.core.api.internal.statistics.elo_graphs_generator import EloGraphsGenerator
-from aiarena.core.models import CompetitionParticipation, Map, Match, MatchParticipation, Result
-from aiarena.core.models.competition_bot_map_stats import CompetitionBotMapStats
-from aiarena.core.models.competition_bot_matchup_stats import CompetitionBotMatchupStats
+from aiarena.core.api.internal.statistics.stats_timings import StatsTimings
+from aiarena.core.api.ladders import Ladders
+from aiarena.core.models import (
+    CompetitionBotDurationStats,
+    CompetitionBotMapStats,
+    CompetitionBotMatchupStats,
+    CompetitionBotRollupStats,
+    CompetitionParticipation,
+    MatchParticipation,
+    Result,
+)
 
 
 class BotStatistics:
@@ -15,63 +23,96 @@ class BotStatistics:
         """This method updates a bot's existing stats based on a single result.
         This can be done much quicker that regenerating a bot's entire set of stats"""
 
-        if result.type not in BotStatistics._ignored_result_types and bot.competition.indepth_bot_statistics_enabled:
+        if result.type not in BotStatistics._ignored_result_types:
             with advisory_lock(f"stats_lock_competitionparticipation_{bot.id}") as acquired:
                 if not acquired:
                     raise Exception(
                         "Could not acquire lock on bot statistics for competition participation " + str(bot.id)
                     )
-                BotStatistics._update_global_statistics(bot, result)
-                BotStatistics._update_matchup_stats(bot, opponent, result)
-                BotStatistics._update_map_stats(bot, result)
+                outcome = BotStatistics._get_outcome_counts(bot, result)
+
+                # The win rate vs duration graph is rendered for every competition
+                BotStatistics._update_rollup_stats(bot, opponent, result, outcome)
+                BotStatistics._update_duration_stats(bot, result, outcome)
+
+                if bot.competition.indepth_bot_statistics_enabled:
+                    BotStatistics._update_global_statistics(bot, outcome)
+                    BotStatistics._update_matchup_stats(bot, opponent, outcome)
+                    BotStatistics._update_map_stats(bot, result, outcome)
 
     @staticmethod
-    def recalculate_stats(sp: CompetitionParticipation):
-        """This method entirely recalculates a bot's set of stats."""
+    def recalculate_stats(sp: CompetitionParticipation, timings: StatsTimings = None):
+        """This method entirely recalculates a bot's set of stats.
+        If timings is supplied, the time spent in each phase is recorded on it."""
+        timings = timings or StatsTimings()
 
         with advisory_lock(f"stats_lock_competitionparticipation_{sp.id}") as acquired:
             if not acquired:
                 raise Exception(f"Could not acquire lock on bot statistics for competition participation  {str(sp.id)}")
 
-            BotStatistics._recalculate_global_statistics(sp)
+            with timings.phase(StatsTimings.AGGREGATION):
+                # All the other stats are aggregated from the rollup stats
+                BotStatistics._recalculate_rollup_stats(sp)
 
-            if sp.competition.indepth_bot_statistics_enabled:
-                BotStatistics._recalculate_matchup_stats(sp)
-                BotStatistics._recalculate_map_stats(sp)
+                # The graphs generated along with the global statistics are rendered from the duration stats
+                BotStatistics._recalculate_duration_stats(sp)
+                Ladders.update_elo_trend(sp)
+                BotStatistics._recalculate_global_statistics(sp, timings)
+
+                if sp.competition.indepth_bot_statistics_enabled:
+                    BotStatistics._recalculate_matchup_stats(sp)
+                    BotStatistics._recalculate_map_stats(sp)
 
     # ignore these result types for the purpose of statistics generation
     _ignored_result_types = ["MatchCancelled", "InitializationError", "Error"]
 
+    # How a bot's participation in a result is counted, from the outcome stored on the participation.
+    # Both the incremental updates and the recalculation count with these, so they always agree.
+    _outcome_filters = {
+        "win_count": Q(result="win"),
+        "loss_count": Q(result="loss"),
+        "tie_count": Q(result="tie"),
+        "crash_count": Q(result="loss", result_cause__in=MatchParticipation.CRASH_CAUSES),
+    }
+
     @staticmethod
-    def _recalculate_global_statistics(sp: CompetitionParticipation):
-        sp.match_count = (
-            MatchParticipation.objects.filter(
-                bot=sp.bot, match__result__isnull=False, match__round__competition=sp.competition
-            )
-            .exclude(match__result__type__in=BotStatistics._ignored_result_types)
-            .count()
+    def _get_outcome_counts(sp: CompetitionParticipation, result: Result) -> dict:
+        """The amount the result adds to each of the participation's counts."""
+        outcome = MatchParticipation.objects.filter(match_id=result.match_id, bot_id=sp.bot_id).aggregate(
+            **{count: Count("id", filter=condition) for count, condition in BotStatistics._outcome_filters.items()}
         )
+        if not (outcome["win_count"] or outcome["loss_count"] or outcome["tie_count"]):
+            raise Exception(f"Unexpected result type: {result.type}")
+        return outcome
+
+    @staticmethod
+    def _add_outcome_counts(stats, outcome: dict):
+        """Adds the result's outcome to the stats' counts."""
+        stats.match_count += 1
+        for count, amount in outcome.items():
+            setattr(stats, count, getattr(stats, count) + amount)
+
+    @staticmethod
+    def _update_percentages(stats):
+        stats.win_perc = stats.win_count / stats.match_count * 100
+        stats.loss_perc = stats.loss_count / stats.match_count * 100
+        stats.tie_perc = stats.tie_count / stats.match_count * 100
+        stats.crash_perc = stats.crash_count / stats.match_count * 100
+
+    @staticmethod
+    def _recalculate_global_statistics(sp: CompetitionParticipation, timings: StatsTimings):
+        totals = BotStatistics._aggregate_rollup_stats(sp).aggregate(**BotStatistics._rollup_totals)
+        sp.match_count = totals["match_count"] or 0
         if sp.match_count != 0:
-            sp.win_count = MatchParticipation.objects.filter(
-                bot=sp.bot, result="win", match__round__competition=sp.competition
-            ).count()
+            sp.win_count = totals["win_count"]
             sp.win_perc = sp.win_count / sp.match_count * 100
 
             if sp.competition.indepth_bot_statistics_enabled:
-                sp.loss_count = MatchParticipation.objects.filter(
-                    bot=sp.bot, result="loss", match__round__competition=sp.competition
-                ).count()
+                sp.loss_count = totals["loss_count"]
                 sp.loss_perc = sp.loss_count / sp.match_count * 100
-                sp.tie_count = MatchParticipation.objects.filter(
-                    bot=sp.bot, result="tie", match__round__competition=sp.competition
-                ).count()
+                sp.tie_count = totals["tie_count"]
                 sp.tie_perc = sp.tie_count / sp.match_count * 100
-                sp.crash_count = MatchParticipation.objects.filter(
-                    bot=sp.bot,
-                    result="loss",
-                    result_cause__in=["crash", "timeout", "initialization_failure"],
-                    match__round__competition=sp.competition,
-                ).count()
+                sp.crash_count = totals["crash_count"]
                 sp.crash_perc = sp.crash_count / sp.match_count * 100
 
                 sp.highest_elo = (
@@ -81,55 +122,60 @@ class BotStatistics:
                     .exclude(match__result__type__in=BotStatistics._ignored_result_types)
                     .aggregate(Max("resultant_elo"))["resultant_elo__max"]
                 )
-                BotStatistics.generate_graphs(sp)
+                BotStatistics.generate_graphs(sp, timings)
         sp.save()
 
     @staticmethod
-    def generate_graphs(sp: CompetitionParticipation):
-        graph1, graph2, graph3 = EloGraphsGenerator(sp).generate()
-        if graph1 is not None:
-            sp.elo_graph.save("elo.png", graph1, False)
-        if graph2 is not None:
-            sp.elo_graph_update_plot.save("elo_update_plot.png", graph2, False)
-        if graph3 is not None:
-            sp.winrate_vs_duration_graph.save("winrate_vs_duration.png", graph3, False)
+    def generate_graphs(sp: CompetitionParticipation, timings: StatsTimings = None) -> bool:
+        """Renders and uploads the participation's graphs, unless the data they are rendered from is unchanged
+        since the last time they were generated.
+        Returns whether the graphs were rendered."""
+        timings = timings or StatsTimings()
+        with timings.phase(StatsTimings.AGGREGATION):
+            fingerprint = BotStatistics._get_graphs_fingerprint(sp)
+            if fingerprint == sp.graphs_fingerprint:
+                return False
+
+        with timings.phase(StatsTimings.RENDERING):
+            graph1, graph2, graph3 = EloGraphsGenerator(sp).generate()
+        with timings.phase(StatsTimings.UPLOAD):
+            if graph1 is not None:
+                sp.elo_graph.save("elo.png", graph1, False)
+            if graph2 is not None:
+                sp.elo_graph_update_plot.save("elo_update_plot.png", graph2, False)
+            if graph3 is not None:
+                sp.winrate_vs_duration_graph.save("winrate_vs_duration.png", graph3, False)
+            sp.graphs_fingerprint = fingerprint
+            sp.save(
+                update_fields=["elo_graph", "elo_graph_update_plot", "winrate_vs_duration_graph", "graphs_fingerprint"]
+            )
+        return True
 
     @staticmethod
-    def _update_global_statistics(sp: CompetitionParticipation, result: Result):
-        sp.match_count += 1
-
-        if result.has_winner:
-            if sp.bot == result.winner:
-                sp.win_count += 1
-                if sp.highest_elo is None or sp.highest_elo < sp.elo:
-                    sp.highest_elo = sp.elo
-            else:
-                sp.loss_count += 1
-
-                if MatchParticipation.objects.get(match=result.match, bot=sp.bot).crashed:
-                    sp.crash_count += 1
-
-                # Special case to match a full recalc:
-                # Set highest_elo isn't already - this will only trigger on a loss or tie
-                # This is easier than changing the way the full recalc determines this figure
-                if sp.highest_elo is None:
-                    sp.highest_elo = sp.elo
+    def _get_graphs_fingerprint(sp: CompetitionParticipation) -> str:
+        """The graphs change when a result is added or removed for the participation, when the ELOs they're drawn
+        from are rewritten (such as by an ELO recalculation or an admin edit), or when the bot is updated
+        (which moves the update line)."""
+        results = MatchParticipation.objects.filter(
+            bot_id=sp.bot_id, match__round__competition_id=sp.competition_id, match__result__isnull=False
+        ).aggregate(count=Count("id"), last_result_id=Max("match__result__id"), elo_sum=Sum("resultant_elo"))
+        return (
+            f"{results['count']}:{results['last_result_id']}:{results['elo_sum']}:{sp.bot.bot_zip_updated.isoformat()}"
+        )
 
-        elif result.is_tie:
-            sp.tie_count += 1
+    @staticmethod
+    def _update_global_statistics(sp: CompetitionParticipation, outcome: dict):
+        BotStatistics._add_outcome_counts(sp, outcome)
+        BotStatistics._update_percentages(sp)
 
+        if outcome["win_count"]:
+            if sp.highest_elo is None or sp.highest_elo < sp.elo:
+                sp.highest_elo = sp.elo
+        elif sp.highest_elo is None:
             # Special case to match a full recalc:
             # Set highest_elo isn't already - this will only trigger on a loss or tie
             # This is easier than changing the way the full recalc determines this figure
-            if sp.highest_elo is None:
-                sp.highest_elo = sp.elo
-        else:
-            raise Exception("Unexpected result type: %s", result.type)
-
-        sp.win_perc = sp.win_count / sp.match_count * 100
-        sp.loss_perc = sp.loss_count / sp.match_count * 100
-        sp.tie_perc = sp.tie_count / sp.match_count * 100
-        sp.crash_perc = sp.crash_count / sp.match_count * 100
+            sp.highest_elo = sp.elo
 
         # TODO: implement caching so that this runs quick enough to include in this job
         # BotStatistics._generate_graphs(sp)
@@ -139,214 +185,159 @@ class BotStatistics:
     @staticmethod
     def _recalculate_matchup_stats(sp: CompetitionParticipation):
         CompetitionBotMatchupStats.objects.filter(bot=sp).delete()
-
-        for competition_participation in CompetitionParticipation.objects.filter(competition=sp.competition).exclude(
-            bot=sp.bot
-        ):
-            with connection.cursor() as cursor:
-                match_count = BotStatistics._calculate_matchup_count(cursor, competition_participation, sp)
-                if match_count > 0:
-                    matchup_stats = CompetitionBotMatchupStats.objects.get_or_create(
-                        bot=sp, opponent=competition_participation
-                    )[0]
-
-                    matchup_stats.match_count = match_count
-                    matchup_stats.win_count = BotStatistics._calculate_matchup_win_count(
-                        cursor, competition_participation, sp
-                    )
-                    matchup_stats.win_perc = matchup_stats.win_count / matchup_stats.match_count * 100
-
-                    matchup_stats.loss_count = BotStatistics._calculate_matchup_loss_count(
-                        cursor, competition_participation, sp
-                    )
-                    matchup_stats.loss_perc = matchup_stats.loss_count / matchup_stats.match_count * 100
-
-                    matchup_stats.tie_count = BotStatistics._calculate_matchup_tie_count(
-                        cursor, competition_participation, sp
-                    )
-                    matchup_stats.tie_perc = matchup_stats.tie_count / matchup_stats.match_count * 100
-
-                    matchup_stats.crash_count = BotStatistics._calculate_matchup_crash_count(
-                        cursor, competition_participation, sp
-                    )
-                    matchup_stats.crash_perc = matchup_stats.crash_count / matchup_stats.match_count * 100
-
-                    matchup_stats.save()
+        CompetitionBotMatchupStats.objects.bulk_create(
+            [
+                CompetitionBotMatchupStats(bot=sp, opponent_id=totals.pop("opponent"), **totals)
+                for totals in BotStatistics._aggregate_rollup_stats(sp, "opponent")
+            ]
+        )
 
     @staticmethod
-    def _update_matchup_stats(bot: CompetitionParticipation, opponent: CompetitionParticipation, result: Result):
+    def _update_matchup_stats(bot: CompetitionParticipation, opponent: CompetitionParticipation, outcome: dict):
         matchup_stats = CompetitionBotMatchupStats.objects.get_or_create(bot=bot, opponent=opponent)[0]
-
-        matchup_stats.match_count += 1
-
-        if result.has_winner:
-            if bot.bot == result.winner:
-                matchup_stats.win_count += 1
-            else:
-                matchup_stats.loss_count += 1
-
-                if MatchParticipation.objects.get(match=result.match, bot=bot.bot).crashed:
-                    matchup_stats.crash_count += 1
-        elif result.is_tie:
-            matchup_stats.tie_count += 1
-        else:
-            raise Exception("Unexpected result type: %s", result.type)
-
-        matchup_stats.win_perc = matchup_stats.win_count / matchup_stats.match_count * 100
-        matchup_stats.loss_perc = matchup_stats.loss_count / matchup_stats.match_count * 100
-        matchup_stats.tie_perc = matchup_stats.tie_count / matchup_stats.match_count * 100
-        matchup_stats.crash_perc = matchup_stats.crash_count / matchup_stats.match_count * 100
-
+        BotStatistics._add_outcome_counts(matchup_stats, outcome)
+        BotStatistics._update_percentages(matchup_stats)
         matchup_stats.save()
 
     @staticmethod
     def _recalculate_map_stats(sp: CompetitionParticipation):
-        competition_matches = Match.objects.filter(round__competition_id=sp.competition.id).select_related("map")
-        maps = Map.objects.filter(id__in=competition_matches.values_list("map_id", flat=True))
-
-        # purge existing stats entries for all maps
         CompetitionBotMapStats.objects.filter(bot=sp).delete()
-
-        for map in maps:
-            with connection.cursor() as cursor:
-                match_count = BotStatistics._calculate_map_count(cursor, map, sp)
-                if match_count > 0:
-                    map_stats = CompetitionBotMapStats.objects.create(bot=sp, map=map)
-                    map_stats.match_count = match_count
-
-                    map_stats.win_count = BotStatistics._calculate_map_win_count(cursor, map, sp)
-                    map_stats.win_perc = map_stats.win_count / map_stats.match_count * 100
-
-                    map_stats.loss_count = BotStatistics._calculate_map_loss_count(cursor, map, sp)
-                    map_stats.loss_perc = map_stats.loss_count / map_stats.match_count * 100
-
-                    map_stats.tie_count = BotStatistics._calculate_map_tie_count(cursor, map, sp)
-                    map_stats.tie_perc = map_stats.tie_count / map_stats.match_count * 100
-
-                    map_stats.crash_count = BotStatistics._calculate_map_crash_count(cursor, map, sp)
-                    map_stats.crash_perc = map_stats.crash_count / map_stats.match_count * 100
-
-                    map_stats.save()
+        CompetitionBotMapStats.objects.bulk_create(
+            [
+                CompetitionBotMapStats(bot=sp, map_id=totals.pop("map"), **totals)
+                for totals in BotStatistics._aggregate_rollup_stats(sp, "map")
+            ]
+        )
 
     @staticmethod
-    def _update_map_stats(bot: CompetitionParticipation, result: Result):
-        map_stats = CompetitionBotMapStats.objects.get_or_create(bot=bot, map=result.match.map)[0]
-        map_stats.match_count += 1
-
-        if result.has_winner:
-            if bot.bot == result.winner:
-                map_stats.win_count += 1
-            else:
-                map_stats.loss_count += 1
-
-                if MatchParticipation.objects.get(match=result.match, bot=bot.bot).crashed:
-                    map_stats.crash_count += 1
-        elif result.is_tie:
-            map_stats.tie_count += 1
-        else:
-            raise Exception("Unexpected result type: %s", result.type)
-
-        map_stats.win_perc = map_stats.win_count / map_stats.match_count * 100
-        map_stats.loss_perc = map_stats.loss_count / map_stats.match_count * 100
-        map_stats.tie_perc = map_stats.tie_count / map_stats.match_count * 100
-        map_stats.crash_perc = map_stats.crash_count / map_stats.match_count * 100
-
+    def _update_map_stats(bot: CompetitionParticipation, result: Result, outcome: dict):
+        map_stats = CompetitionBotMapStats.objects.get_or_create(bot=bot, map_id=result.match.map_id)[0]
+        BotStatistics._add_outcome_counts(map_stats, outcome)
+        BotStatistics._update_percentages(map_stats)
         map_stats.save()
 
     @staticmethod
-    def _run_single_column_query(cursor, query, params):
-        cursor.execute(query, params)
-        row = cursor.fetchone()
-        return row[0]
-
-    @staticmethod
-    def _calculate_matchup_data(cursor, competition_participation, sp, query):
-        return BotStatistics._run_single_column_query(
-            cursor,
-            """
-                    select count(cm.id) as count
-                    from core_match cm
-                    inner join core_matchparticipation bot_p on cm.id = bot_p.match_id
-                    inner join core_matchparticipation opponent_p on cm.id = opponent_p.match_id
-                    inner join core_round cr on cm.round_id = cr.id
-                    inner join core_competition cs on cr.competition_id = cs.id
-                    where cs.id = %s -- make sure it's part of the current competition
-                    and bot_p.bot_id = %s
-                    and opponent_p.bot_id = %s
-                    and """
-            + query,
-            [sp.competition_id, sp.bot_id, competition_participation.bot_id],
+    def _recalculate_duration_stats(sp: CompetitionParticipation):
+        CompetitionBotDurationStats.objects.filter(bot=sp).delete()
+        CompetitionBotDurationStats.objects.bulk_create(
+            [
+                CompetitionBotDurationStats(
+                    bot=sp,
+                    duration_minutes=totals["duration_minutes"],
+                    win_count=totals["win_count"],
+                    # crashes aren't counted as losses in the duration stats
+                    loss_count=totals["loss_count"] - totals["crash_count"],
+                    crash_count=totals["crash_count"],
+                    tie_count=totals["tie_count"],
+                )
+                for totals in BotStatistics._aggregate_rollup_stats(sp, "duration_minutes")
+            ]
         )
 
     @staticmethod
-    def _calculate_matchup_count(cursor, competition_participation, sp):
-        return BotStatistics._calculate_matchup_data(
-            cursor, competition_participation, sp, "bot_p.result is not null and bot_p.result != 'none'"
-        )
+    def _update_duration_stats(bot: CompetitionParticipation, result: Result, outcome: dict):
+        duration_stats = CompetitionBotDurationStats.objects.get_or_create(
+            bot=bot, duration_minutes=CompetitionBotDurationStats.get_duration_minutes(result.game_steps)
+        )[0]
+        duration_stats.win_count += outcome["win_count"]
+        # crashes aren't counted as losses in the duration stats
+        duration_stats.loss_count += outcome["loss_count"] - outcome["crash_count"]
+        duration_stats.crash_count += outcome["crash_count"]
+        duration_stats.tie_count += outcome["tie_count"]
+        duration_stats.save()
+
+    # The totals aggregated from the rollup stats by each of the bot's other stats
+    _rollup_totals = {
+        "match_count": Sum("match_count"),
+        "win_count": Sum("win_count"),
+        "loss_count": Sum("loss_count"),
+        "tie_count": Sum("tie_count"),
+        "crash_count": Sum("crash_count"),
+    }
 
     @staticmethod
-    def _calculate_matchup_win_count(cursor, competition_participation, sp):
-        return BotStatistics._calculate_matchup_data(cursor, competition_participation, sp, "bot_p.result = 'win'")
+    def _aggregate_rollup_stats(sp: CompetitionParticipation, *group_by: str) -> QuerySet:
+        """The participation's rollup stats totals, grouped by the specified fields.
+        Percentages are included for the totals of each group."""
+        rollup_stats = CompetitionBotRollupStats.objects.filter(bot=sp)
+        if not group_by:
+            return rollup_stats
+        return (
+            rollup_stats.values(*group_by)
+            .annotate(**BotStatistics._rollup_totals)
+            .annotate(
+                **{
+                    f"{count}_perc": Cast(F(f"{count}_count"), FloatField()) / F("match_count") * 100
+                    for count in ["win", "loss", "tie", "crash"]
+                }
+            )
+            .order_by(*group_by)
+        )
 
     @staticmethod
-    def _calculate_matchup_loss_count(cursor, competition_participation, sp):
-        return BotStatistics._calculate_matchup_data(cursor, competition_participation, sp, "bot_p.result = 'loss'")
+    def get_opponent_race_stats(sp: CompetitionParticipation) -> QuerySet:
+        """The participation's results against each of the races its opponents play."""
+        return BotStatistics._aggregate_rollup_stats(sp, "opponent__bot__plays_race__label")
 
     @staticmethod
-    def _calculate_matchup_tie_count(cursor, competition_participation, sp):
-        return BotStatistics._calculate_matchup_data(cursor, competition_participation, sp, "bot_p.result = 'tie'")
+    def _recalculate_rollup_stats(sp: CompetitionParticipation):
+        CompetitionBotRollupStats.objects.filter(bot=sp).delete()
 
-    @staticmethod
-    def _calculate_matchup_crash_count(cursor, competition_participation, sp):
-        return BotStatistics._calculate_matchup_data(
-            cursor,
-            competition_participation,
-            sp,
-            """bot_p.result = 'loss'
-                                                     and bot_p.result_cause in ('crash', 'timeout', 'initialization_failure')""",
+        opponent_participations = dict(
+            CompetitionParticipation.objects.filter(competition_id=sp.competition_id).values_list("bot_id", "id")
         )
-
-    @staticmethod
-    def _calculate_map_data(cursor, map, sp, query):
-        return BotStatistics._run_single_column_query(
-            cursor,
-            """
-                    select count(cm.id) as count
-                    from core_match cm
-                    inner join core_matchparticipation bot_p on cm.id = bot_p.match_id
-                    inner join core_map map on cm.map_id = map.id
-                    inner join core_round cr on cm.round_id = cr.id
-                    inner join core_competition cs on cr.competition_id = cs.id
-                    where cs.id = %s -- make sure it's part of the current competition
-                    and map.id = %s
-                    and bot_p.bot_id = %s
-                    and """
-            + query,
-            [sp.competition_id, map.id, sp.bot_id],
+        bucket_steps = CompetitionBotDurationStats.GAME_STEPS_PER_MINUTE * CompetitionBotDurationStats.BUCKET_MINUTES
+        rollup_rows = (
+            MatchParticipation.objects.filter(
+                bot_id=sp.bot_id, match__result__isnull=False, match__round__competition_id=sp.competition_id
+            )
+            .exclude(match__result__type__in=BotStatistics._ignored_result_types)
+            .annotate(
+                opponent_bot_id=Subquery(
+                    MatchParticipation.objects.filter(match_id=OuterRef("match_id"))
+                    .exclude(participant_number=OuterRef("participant_number"))
+                    .values("bot_id")[:1]
+                ),
+                duration_minutes=Least(
+                    # integer division, so this is floored
+                    F("match__result__game_steps") / bucket_steps * CompetitionBotDurationStats.BUCKET_MINUTES,
+                    CompetitionBotDurationStats.MAX_DURATION_MINUTES,
+                ),
+            )
+            .values("opponent_bot_id", "match__map_id", "duration_minutes")
+            .annotate(
+                match_count=Count("id"),
+                **{count: Count("id", filter=condition) for count, condition in BotStatistics._outcome_filters.items()},
+            )
+            .order_by()
+        )
+        CompetitionBotRollupStats.objects.bulk_create(
+            [
+                CompetitionBotRollupStats(
+                    bot=sp,
+                    opponent_id=opponent_participations[row["opponent_bot_id"]],
+                    map_id=row["match__map_id"],
+                    duration_minutes=row["duration_minutes"],
+                    match_count=row["match_count"],
+                    win_count=row["win_count"],
+                    loss_count=row["loss_count"],
+                    tie_count=row["tie_count"],
+                    crash_count=row["crash_count"],
+                )
+                for row in rollup_rows
+            ],
+            batch_size=1000,
         )
 
     @staticmethod
-    def _calculate_map_count(cursor, map, sp):
-        return BotStatistics._calculate_map_data(cursor, map, sp, "bot_p.result is not null and bot_p.result != 'none'")
-
-    @staticmethod
-    def _calculate_map_win_count(cursor, map, sp):
-        return BotStatistics._calculate_map_data(cursor, map, sp, "bot_p.result = 'win'")
-
-    @staticmethod
-    def _calculate_map_loss_count(cursor, map, sp):
-        return BotStatistics._calculate_map_data(cursor, map, sp, "bot_p.result = 'loss'")
-
-    @staticmethod
-    def _calculate_map_tie_count(cursor, map, sp):
-        return BotStatistics._calculate_map_data(cursor, map, sp, "bot_p.result = 'tie'")
-
-    @staticmethod
-    def _calculate_map_crash_count(cursor, map, sp):
-        return BotStatistics._calculate_map_data(
-            cursor,
-            map,
-            sp,
-            """bot_p.result = 'loss'
-                                                 and bot_p.result_cause in ('crash', 'timeout', 'initialization_failure')""",
-        )
+    def _update_rollup_stats(
+        bot: CompetitionParticipation, opponent: CompetitionParticipation, result: Result, outcome: dict
+    ):
+        rollup_stats = CompetitionBotRollupStats.objects.get_or_create(
+            bot=bot,
+            opponent=opponent,
+            map_id=result.match.map_id,
+            duration_minutes=CompetitionBotDurationStats.get_duration_minutes(result.game_steps),
+        )[0]
+        BotStatistics._add_outcome_counts(rollup_stats, outcome)
+        rollup_stats.save()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import io
+import re
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from aiarena.core.models import MatchParticipation
+
+
+if TYPE_CHECKING:
+    import pandas
+    import pyarrow
+
+
+class CompetitionHistory:
+    """
+    Columnar export of a competition's match history, for offline analytics.
+
+    Each participation in a competition's finished matches is exported as a row of a Parquet dataset in the media
+    storage, partitioned by competition. Exports are incremental - each one appends a part file containing the
+    results submitted since the previous export, keyed by result id.
+    Analysts should load the exported history via CompetitionHistory.load rather than querying the database.
+    """
+
+    STORAGE_DIRECTORY = "competition-history"
+    ROWS_PER_PART = 100000
+    # Results are only exported once they're this old, so that a result which committed after one with a
+    # higher id doesn't get skipped.
+    EXPORT_DELAY = timedelta(minutes=10)
+
+    # Exported column name -> the MatchParticipation field it's read from. This must be in the same order as schema()
+    # and start with the result id.
+    COLUMNS = {
+        "result_id": "match__result__id",
+        "result_type": "match__result__type",
+        "result_created": "match__result__created",
+        "game_steps": "match__result__game_steps",
+        "winner_id": "match__result__winner_id",
+        "match_id": "match_id",
+        "round_id": "match__round_id",
+        "map": "match__map__name",
+        "match_started": "match__started",
+        "participant_number": "participant_number",
+        "bot_id": "bot_id",
+        "bot_name": "bot__name",
+        "starting_elo": "starting_elo",
+        "resultant_elo": "resultant_elo",
+        "elo_change": "elo_change",
+        "result": "result",
+        "result_cause": "result_cause",
+        "avg_step_time": "avg_step_time",
+    }
+
+    _PART_NAME_PATTERN = re.compile(r"^part-(?P<first_result_id>\d+)-(?P<last_result_id>\d+)\.parquet$")
+
+    @staticmethod
+    def schema() -> pyarrow.Schema:
+        import pyarrow as pa
+
+        return pa.schema(
+            [
+                ("result_id", pa.int64()),
+                ("result_type", pa.string()),
+                ("result_created", pa.timestamp("us", tz="UTC")),
+                ("game_steps", pa.int64()),
+                ("winner_id", pa.int64()),
+                ("match_id", pa.int64()),
+                ("round_id", pa.int64()),
+                ("map", pa.string()),
+                ("match_started", pa.timestamp("us", tz="UTC")),
+                ("participant_number", pa.int16()),
+                ("bot_id", pa.int64()),
+                ("bot_name", pa.string()),
+                ("starting_elo", pa.int16()),
+                ("resultant_elo", pa.int16()),
+                ("elo_change", pa.int16()),
+                ("result", pa.string()),
+                ("result_cause", pa.string()),
+                ("avg_step_time", pa.float64()),
+            ]
+        )
+
+    @staticmethod
+    def export(competition_id: int) -> int:
+        """Appends the competition's results submitted since the last export. Returns the number of rows exported."""
+        rows = (
+            MatchParticipation.objects.filter(
+                match__round__competition_id=competition_id,
+                match__result__id__gt=CompetitionHistory.get_last_exported_result_id(competition_id),
+                match__result__created__lt=timezone.now() - CompetitionHistory.EXPORT_DELAY,
+            )
+            .order_by("match__result__id", "participant_number")
+            .values_list(*CompetitionHistory.COLUMNS.values())
+            .iterator(chunk_size=2000)
+        )
+
+        exported = 0
+        part = []
+        for row in rows:
+            # Parts only ever end between results, so that a result's participations are always exported together
+            if len(part) >= CompetitionHistory.ROWS_PER_PART and row[0] != part[-1][0]:
+                CompetitionHistory._write_part(competition_id, part)
+                exported += len(part)
+                part = []
+            part.append(row)
+        if part:
+            CompetitionHistory._write_part(competition_id, part)
+            exported += len(part)
+        return exported
+
+    @staticmethod
+    def load(competition_id: int, columns: list[str] = None) -> pandas.DataFrame:
+        """Loads the competition's exported history into a DataFrame, with one row per match participation."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tables = []
+        for part_name in CompetitionHistory._list_parts(competition_id):
+            with default_storage.open(CompetitionHistory._part_path(competition_id, part_name)) as file:
+                tables.append(pq.read_table(file, columns=columns))
+        if tables:
+            table = pa.concat_tables(tables)
+        else:
+            table = CompetitionHistory.schema().empty_table()
+            if columns is not None:
+                table = table.select(columns)
+        return table.to_pandas()
+
+    @staticmethod
+    def get_last_exported_result_id(competition_id: int) -> int:
+        last_result_ids = [
+            int(CompetitionHistory._PART_NAME_PATTERN.match(part_name).group("last_result_id"))
+            for part_name in CompetitionHistory._list_parts(competition_id)
+        ]
+        return max(last_result_ids, default=0)
+
+    @staticmethod
+    def _directory(competition_id: int) -> str:
+        # Hive style partitioning, so the whole export can also be read as a single dataset
+        return f"{CompetitionHistory.STORAGE_DIRECTORY}/competition_id={competition_id}"
+
+    @staticmethod
+    def _part_path(competition_id: int, part_name: str) -> str:
+        return f"{CompetitionHistory._directory(competition_id)}/{part_name}"
+
+    @staticmethod
+    def _list_parts(competition_id: int) -> list[str]:
+        try:
+            _, file_names = default_storage.listdir(CompetitionHistory._directory(competition_id))
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in file_names if CompetitionHistory._PART_NAME_PATTERN.match(name))
+
+    @staticmethod
+    def _write_part(competition_id: int, rows: list[tuple]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = CompetitionHistory.schema()
+        columns = list(zip(*rows))
+        table = pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+        )
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer)
+
+        # Zero padded, so the part names sort in export order
+        part_name = f"part-{rows[0][0]:012d}-{rows[-1][0]:012d}.parquet"
+        default_storage.save(CompetitionHistory._part_path(competition_id, part_name), ContentFile(buffer.getvalue()))
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.db import transaction
+
+from aiarena.core.models import Competition, CompetitionParticipation, Match, MatchParticipation, Result
+from aiarena.core.utils import Elo
+
+
+ELO = Elo(settings.ELO_K)
+
+
+class EloReplayEngine:
+    """
+    Recalculates a competition's ELOs by replaying all of its results in the order they were submitted.
+
+    Results are streamed from a server-side cursor and the ELOs are replayed in memory,
+    so only the final figures are written back, in batches, inside a single transaction.
+    """
+
+    BATCH_SIZE = 2000
+
+    # (has_winner, winner_participant_number) for each result type
+    _RESULT_TYPE_OUTCOMES = {
+        result_type: (Result(type=result_type).has_winner, Result(type=result_type).winner_participant_number)
+        for result_type, _ in Result.TYPES
+    }
+
+    def __init__(self, competition: Competition, progress_callback=None):
+        self.competition = competition
+        self.progress_callback = progress_callback
+
+    def run(self) -> int:
+        """Replays the competition's results and returns the number of matches replayed."""
+        with transaction.atomic():
+            participations = list(
+                CompetitionParticipation.objects.filter(competition=self.competition).only("id", "bot_id")
+            )
+            # ELOs are held in a compact array, indexed by the position of the bot's participation
+            participation_index = {sp.bot_id: index for index, sp in enumerate(participations)}
+            elos = [settings.ELO_START_VALUE] * len(participations)
+
+            match_count = Match.objects.filter(round__competition=self.competition, result__isnull=False).count()
+
+            pending_updates = []
+            replayed = 0
+            for p1, p2, result_type in self._stream_matches():
+                p1_index = participation_index[p1["bot_id"]]
+                p2_index = participation_index[p2["bot_id"]]
+                p1_starting_elo, p2_starting_elo = elos[p1_index], elos[p2_index]
+
+                self._apply_result(elos, result_type, p1_index, p2_index)
+
+                pending_updates.append(
+                    MatchParticipation(
+                        id=p1["id"], resultant_elo=elos[p1_index], elo_change=elos[p1_index] - p1_starting_elo
+                    )
+                )
+                pending_updates.append(
+                    MatchParticipation(
+                        id=p2["id"], resultant_elo=elos[p2_index], elo_change=elos[p2_index] - p2_starting_elo
+                    )
+                )
+                if len(pending_updates) >= self.BATCH_SIZE:
+                    MatchParticipation.objects.bulk_update(pending_updates, ["resultant_elo", "elo_change"])
+                    pending_updates = []
+
+                replayed += 1
+                if self.progress_callback is not None:
+                    self.progress_callback(replayed, match_count)
+
+            MatchParticipation.objects.bulk_update(pending_updates, ["resultant_elo", "elo_change"])
+
+            for sp, elo in zip(participations, elos):
+                sp.elo = elo
+            CompetitionParticipation.objects.bulk_update(participations, ["elo"], batch_size=self.BATCH_SIZE)
+            # The participations' graphs are drawn from the ELOs, so they need to be rendered again
+            CompetitionParticipation.objects.filter(competition=self.competition).update(graphs_fingerprint="")
+
+        return replayed
+
+    def _stream_matches(self):
+        """Yields the two participations and the result type of each of the competition's finished matches,
+        in the order the results were submitted."""
+        rows = (
+            MatchParticipation.objects.filter(match__round__competition=self.competition, match__result__isnull=False)
+            .order_by("match__result__created", "match__result__id", "participant_number")
+            .values("id", "match_id", "bot_id", "match__result__type")
+            .iterator(chunk_size=self.BATCH_SIZE)
+        )
+        for p1, p2 in zip(rows, rows):
+            if p1["match_id"] != p2["match_id"]:
+                raise Exception(f"Match {p1['match_id']} does not have exactly 2 participants.")
+            yield p1, p2, p1["match__result__type"]
+
+    @classmethod
+    def _apply_result(cls, elos: list, result_type: str, p1_index: int, p2_index: int):
+        """Mirrors Result.adjust_elo"""
+        has_winner, winner_participant_number = cls._RESULT_TYPE_OUTCOMES[result_type]
+        if has_winner:
+            if winner_participant_number == 1:
+                winner_index, loser_index = p1_index, p2_index
+            else:
+                winner_index, loser_index = p2_index, p1_index
+            delta = int(round(ELO.calculate_elo_delta(elos[winner_index], elos[loser_index], 1.0)))
+            elos[winner_index] += delta
+            elos[loser_index] -= delta
+        elif result_type == "Tie":
+            delta = int(round(ELO.calculate_elo_delta(elos[p1_index], elos[p2_index], 0.5)))
+            elos[p1_index] += delta
+            elos[p2_index] -= delta
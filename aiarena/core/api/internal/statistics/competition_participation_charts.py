@@ -0,0 +1,151 @@
+import json
+from datetime import datetime
+
+from django.core.cache import cache
+
+from constance import config
+from pytz import utc
+
+from aiarena.core.api.internal.statistics.elo_graphs_generator import EloGraphsGenerator
+from aiarena.core.models import CompetitionParticipation
+from aiarena.core.utils import lttb_downsample
+
+
+class CompetitionParticipationCharts:
+    """
+    Builds the chart payloads displayed on a bot's competition stats page.
+
+    These are built from the bot's entire match history, so they're cached per participation and
+    invalidated whenever a result for the participation is applied.
+    """
+
+    # ELO series longer than this are downsampled so the page stays small
+    ELO_CHART_MAX_POINTS = 1000
+
+    @staticmethod
+    def get(sp: CompetitionParticipation) -> dict:
+        cache_key = CompetitionParticipationCharts._cache_key(sp.id)
+        charts = cache.get(cache_key)
+        if charts is None:
+            charts = CompetitionParticipationCharts._build(sp)
+            cache.set(cache_key, charts, config.BOT_STATS_CHARTS_CACHE_TIME)
+        return charts
+
+    @staticmethod
+    def invalidate(*sp_ids: int):
+        cache.delete_many([CompetitionParticipationCharts._cache_key(sp_id) for sp_id in sp_ids])
+
+    @staticmethod
+    def get_update_line_datetime(sp: CompetitionParticipation, charts: dict) -> datetime:
+        """The most recent of the bot's last update and its first result in the competition."""
+        earliest_result_datetime = charts["earliest_result_datetime"]
+        if earliest_result_datetime is not None:
+            return max(earliest_result_datetime, sp.bot.bot_zip_updated)
+        return sp.bot.bot_zip_updated
+
+    @staticmethod
+    def _cache_key(sp_id: int) -> str:
+        return f"competition_participation_{sp_id}_charts"
+
+    @staticmethod
+    def _build(sp: CompetitionParticipation) -> dict:
+        generator = EloGraphsGenerator(sp)
+        earliest_result_datetime = generator.get_earliest_result_datetime(sp.bot_id, sp.competition_id)[0][0]
+        if earliest_result_datetime is not None:
+            earliest_result_datetime = (
+                utc.normalize(earliest_result_datetime)
+                if earliest_result_datetime.tzinfo
+                else utc.localize(earliest_result_datetime)
+            )
+        return {
+            "elo_chart_data": CompetitionParticipationCharts._build_elo_chart_data(
+                generator._get_elo_data(sp.bot, sp.competition_id)
+            ),
+            "winrate_chart_data": CompetitionParticipationCharts._build_winrate_chart_data(
+                generator._get_winrate_data()
+            ),
+            "earliest_result_datetime": earliest_result_datetime,
+        }
+
+    @staticmethod
+    def _build_elo_chart_data(elo_data) -> str:
+        points = lttb_downsample(
+            [(elo[2].timestamp() * 1000, elo[1]) for elo in elo_data],
+            CompetitionParticipationCharts.ELO_CHART_MAX_POINTS,
+        )
+        return json.dumps(
+            {
+                "title": "ELO over time",
+                "data": {
+                    "datasets": [
+                        {
+                            "label": "ELO",
+                            "backgroundColor": "#86c232",
+                            "borderColor": "#86c232",
+                            "data": [{"x": x, "y": y} for x, y in points],
+                        }
+                    ],
+                },
+            },
+            default=str,
+        )
+
+    @staticmethod
+    def _build_winrate_chart_data(winrate_data) -> str:
+        winrate_data_with_total = [(x[0], x[1], x[2], x[3], x[4], (x[1] + x[2] + x[3] + x[4])) for x in winrate_data]
+        labels = [f"{winrate[0]}-{winrate[0]+5}" for winrate in winrate_data_with_total]
+        if len(labels) > 0:
+            if labels[-1] == "30-35":
+                labels[-1] = "30+"
+        datasets = []
+        # Wins
+        datasets.append(
+            {
+                "label": "Wins",
+                "data": [x[1] for x in winrate_data_with_total],
+                "backgroundColor": "#86C232",
+                "extraLabels": [str(round((x[1] / x[5] if x[5] else 0) * 100)) + "%" for x in winrate_data_with_total],
+                "datalabels": {"align": "center", "anchor": "center"},
+            }
+        )
+
+        # Losses
+        datasets.append(
+            {
+                "label": "Losses",
+                "data": [x[2] for x in winrate_data_with_total],
+                "backgroundColor": "#D20044",
+                "extraLabels": [str(round((x[2] / x[5] if x[5] else 0) * 100)) + "%" for x in winrate_data_with_total],
+                "datalabels": {"align": "center", "anchor": "center"},
+            }
+        )
+
+        # Crashes
+        datasets.append(
+            {
+                "label": "Crashes",
+                "data": [x[3] for x in winrate_data_with_total],
+                "backgroundColor": "#AAAAAA",
+                "extraLabels": [str(round((x[3] / x[5] if x[5] else 0) * 100)) + "%" for x in winrate_data_with_total],
+                "datalabels": {"align": "center", "anchor": "center"},
+            }
+        )
+
+        # Ties
+        datasets.append(
+            {
+                "label": "Ties",
+                "data": [x[4] for x in winrate_data_with_total],
+                "backgroundColor": "#DFCE00",
+                "extraLabels": [str(round((x[4] / x[5] if x[5] else 0) * 100)) + "%" for x in winrate_data_with_total],
+                "datalabels": {"align": "center", "anchor": "center"},
+            }
+        )
+
+        return json.dumps(
+            {
+                "title": "Result vs Match Duration",
+                "data": {"labels": labels, "datasets": datasets},
+            },
+            default=str,
+        )
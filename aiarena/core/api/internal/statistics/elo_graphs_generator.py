@@ -3,18 +3,21 @@ from datetime import datetime
 
 from django.db import connection
 
-import matplotlib
-import matplotlib.dates as mdates
-import matplotlib.patheffects as path_effects
-import matplotlib.pyplot as plt
-import pandas as pd
 from pytz import utc
 
-from aiarena.core.models import Bot, CompetitionParticipation
+from aiarena.core.models import Bot, CompetitionBotDurationStats, CompetitionParticipation
 
 
-# Use the AGG backend - https://matplotlib.org/stable/users/explain/figure/backends.html#static-backends
-matplotlib.use("agg")
+# matplotlib and pandas are slow to import and memory hungry, so they are only imported once a graph is actually
+# rendered, rather than by every process that imports this module.
+def _pyplot():
+    import matplotlib
+
+    # Use the AGG backend - https://matplotlib.org/stable/users/explain/figure/backends.html#static-backends
+    matplotlib.use("agg")
+    import matplotlib.pyplot as plt
+
+    return plt
 
 
 class EloGraphsGenerator:
@@ -23,7 +26,7 @@ class EloGraphsGenerator:
 
     def generate(self) -> (io.BytesIO, io.BytesIO, io.BytesIO):
         graph1, graph2 = self._generate_elo_graph(self.sp.bot, self.sp.competition_id)
-        graph3 = self._generate_winrate_graph(self.sp.bot.id, self.sp.competition_id)
+        graph3 = self._generate_winrate_graph()
         return graph1, graph2, graph3
 
     def _generate_elo_graph(self, bot: Bot, competition_id: int):
@@ -46,50 +49,30 @@ class EloGraphsGenerator:
             return max(update_date, bot.bot_zip_updated)
         return bot.bot_zip_updated
 
-    def _generate_winrate_graph(self, bot_id: int, competition_id: int):
-        df = self._get_winrate_dataframe(bot_id, competition_id)
+    def _generate_winrate_graph(self):
+        df = self._get_winrate_dataframe()
         if not df.empty:
             df.columns = ["Duration (Minutes)", "Wins", "Losses", "Crashes", "Ties"]
             return self._generate_winrate_plot_images(df)
         else:
             return None
 
-    def _get_winrate_dataframe(self, bot_id, competition_id):
-        return pd.DataFrame(self._get_winrate_data(bot_id, competition_id))
+    def _get_winrate_dataframe(self):
+        import pandas as pd
 
-    def _get_winrate_data(self, bot_id, competition_id):
-        # this does not distinct between competitions
-        with connection.cursor() as cursor:
-            query = f"""
-                select duration_minutes,
-                    count(CASE WHEN is_winner THEN 1 END) as wins,
-                    count(CASE WHEN is_loser THEN 1 END) as losses,
-                    count(CASE WHEN is_crasher THEN 1 END) as crashes,
-                    count(CASE WHEN is_tied THEN 1 END) as ties
-                from
-                    (select
-                        (cp.result = 'win') as is_winner,
-                        (cp.result = 'loss' and cp.result_cause != 'crash') as is_loser,
-                        (cp.result_cause = 'crash') as is_crasher,
-                        (cp.result = 'tie') as is_tied,
-                        CASE WHEN floor(cr.game_steps/((22.4*60)*5))*5 > 30 THEN 30 ELSE floor(cr.game_steps/((22.4*60)*5))*5 END as duration_minutes
-                    from core_matchparticipation cp
-                        inner join core_result cr on cp.match_id = cr.match_id
-                        left join core_bot cb on cp.bot_id = cb.id
-                        left join core_match cm on cp.match_id = cm.id
-                        left join core_round crnd on cm.round_id = crnd.id
-                        left join core_competition cc on crnd.competition_id = cc.id
-                    where bot_id = {bot_id}
-                        and competition_id = {competition_id}) matches
-                    group by duration_minutes
-                    order by duration_minutes
-                """
-            cursor.execute(query)
-            stats_vs_duration = cursor.fetchall()
+        return pd.DataFrame(self._get_winrate_data())
 
-        return stats_vs_duration
+    def _get_winrate_data(self):
+        return list(
+            CompetitionBotDurationStats.objects.filter(bot_id=self.sp.id)
+            .order_by("duration_minutes")
+            .values_list("duration_minutes", "win_count", "loss_count", "crash_count", "tie_count")
+        )
 
     def _generate_winrate_plot_images(self, df):
+        import matplotlib.patheffects as path_effects
+
+        plt = _pyplot()
         plot1 = io.BytesIO()
 
         durations = df["Duration (Minutes)"].map(lambda x: str(x) + " - " + str(x + 5))
@@ -178,6 +161,8 @@ class EloGraphsGenerator:
         return plot1
 
     def _get_elo_dataframe(self, bot, competition_id):
+        import pandas as pd
+
         return pd.DataFrame(self._get_elo_data(bot, competition_id))
 
     def _get_elo_data(self, bot, competition_id):
@@ -222,6 +207,9 @@ class EloGraphsGenerator:
             return cursor.fetchall()
 
     def _generate_elo_plot_images(self, df, update_date: datetime):
+        import matplotlib.dates as mdates
+
+        plt = _pyplot()
         plot1 = io.BytesIO()
         plot2 = io.BytesIO()
 
@@ -0,0 +1,42 @@
+import time
+from contextlib import contextmanager
+
+
+class StatsTimings:
+    """Accumulates the time spent in each phase of bot statistics generation.
+
+    Phases may be nested - time spent in an inner phase is not counted towards the outer one."""
+
+    AGGREGATION = "aggregation"
+    RENDERING = "rendering"
+    UPLOAD = "upload"
+
+    PHASES = [AGGREGATION, RENDERING, UPLOAD]
+
+    def __init__(self):
+        self.totals = dict.fromkeys(self.PHASES, 0.0)
+        self._nested_time_stack = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        self._nested_time_stack.append(0.0)
+        try:
+            yield
+        finally:
+            nested_time = self._nested_time_stack.pop()
+            elapsed = time.perf_counter() - start
+            self.totals[name] += elapsed - nested_time
+            if self._nested_time_stack:
+                self._nested_time_stack[-1] += elapsed
+
+    def add(self, totals: dict):
+        for name, seconds in totals.items():
+            self.totals[name] += seconds
+
+    def __str__(self):
+        return (
+            f"aggregation: {self.totals[self.AGGREGATION]:.2f}s, "
+            f"rendering: {self.totals[self.RENDERING]:.2f}s, "
+            f"storage upload: {self.totals[self.UPLOAD]:.2f}s"
+        )
@@ -1,8 +1,11 @@
 import logging
 
-from django.db.models import Case, Max, When
+from django.db.models import Case, F, Max, Sum, When
 
-from aiarena.core.models import Competition, CompetitionParticipation, Match, Round
+from constance import config
+from django_pglocks import advisory_lock
+
+from aiarena.core.models import Competition, CompetitionParticipation, Match, MatchParticipation, Round
 
 
 logger = logging.getLogger(__name__)
@@ -27,7 +30,8 @@ class Ladders:
                     default="match_count",
                 ),
             )
-            .order_by("ranked_division_num", "-capped_match_count", "-elo")
+            # id breaks ties, so that the ranking is stable
+            .order_by("ranked_division_num", "-capped_match_count", "-elo", "id")
         )
 
     @staticmethod
@@ -40,6 +44,50 @@ class Ladders:
             )
         return participants if amount is None else participants[:amount]
 
+    @staticmethod
+    def get_competition_leaderboard(competition: Competition, amount=None, include_placements=False):
+        """Equivalent to get_competition_ranked_participants, but ordered by the leaderboard snapshot.
+        Participants that haven't been ranked yet fall back to the live ranking, after those that have."""
+        participants = Ladders.get_competition_ranked_participants(competition, include_placements=include_placements)
+        participants = participants.order_by(F("leaderboard_rank").asc(nulls_last=True), *participants.query.order_by)
+        return participants if amount is None else participants[:amount]
+
+    @staticmethod
+    def update_leaderboard_ranks(competition: Competition):
+        """Snapshots the current ranking of the competition's participants.
+        Only participants whose rank has changed are written."""
+        with advisory_lock(f"leaderboard_lock_competition_{competition.id}") as acquired:
+            if not acquired:
+                raise Exception(f"Could not acquire lock on leaderboard for competition {competition.id}")
+
+            ranked = Ladders._get_competition_participants(competition).filter(active=True)
+            changed = [
+                CompetitionParticipation(id=participant_id, leaderboard_rank=rank)
+                for rank, (participant_id, leaderboard_rank) in enumerate(
+                    ranked.values_list("id", "leaderboard_rank"), start=1
+                )
+                if leaderboard_rank != rank
+            ]
+            CompetitionParticipation.objects.bulk_update(changed, ["leaderboard_rank"], batch_size=500)
+            CompetitionParticipation.objects.filter(
+                competition=competition, active=False, leaderboard_rank__isnull=False
+            ).update(leaderboard_rank=None)
+
+    @staticmethod
+    def update_elo_trend(sp: CompetitionParticipation):
+        sp.elo_trend = (
+            MatchParticipation.objects.filter(
+                bot_id=sp.bot_id,
+                elo_change__isnull=False,
+                match__requested_by__isnull=True,
+                match__round__competition_id=sp.competition_id,
+            )
+            .order_by("-match__started")[: config.ELO_TREND_N_MATCHES]
+            .aggregate(Sum("elo_change"))["elo_change__sum"]
+            or 0
+        )
+        CompetitionParticipation.objects.filter(id=sp.id).update(elo_trend=sp.elo_trend)
+
     # TODO: remove after the new one is known working
     @staticmethod
     def get_competition_last_round_participants_legacy(competition: Competition, amount=None):
@@ -1,8 +1,11 @@
 import logging
 import random
 
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import Count
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
 from constance import config
@@ -10,6 +13,7 @@ from rest_framework.exceptions import APIException
 
 from aiarena.core.api import Bots
 from aiarena.core.api.competitions import Competitions
+from aiarena.core.api.ladders import Ladders
 from aiarena.core.api.maps import Maps
 from aiarena.core.exceptions import (
     CompetitionClosing,
@@ -36,6 +40,73 @@ logger = logging.getLogger(__name__)
 
 
 class Matches:
+    # The queue is refreshed whenever a match starts or finishes, so this only bounds how stale it can get
+    QUEUE_CACHE_TIME = 30
+    _QUEUE_CACHE_KEY = "match_queue"
+
+    @staticmethod
+    def get_queue() -> tuple[list[Match], list[Round]]:
+        """
+        Returns the unfinished requested matches and the incomplete rounds, with each round's unfinished matches
+        attached as its "matches" attribute. Each match's participations are attached as its "participants"
+        attribute.
+        """
+        queue = cache.get(Matches._QUEUE_CACHE_KEY)
+        if queue is None:
+            queue = Matches._build_queue()
+            cache.set(Matches._QUEUE_CACHE_KEY, queue, Matches.QUEUE_CACHE_TIME)
+        return queue
+
+    @staticmethod
+    def invalidate_queue():
+        cache.delete(Matches._QUEUE_CACHE_KEY)
+
+    @staticmethod
+    def _build_queue() -> tuple[list[Match], list[Round]]:
+        # Load every unfinished match's participations along with their match in a single query,
+        # then group them into matches and rounds.
+        participations = (
+            MatchParticipation.objects.filter(match__result__isnull=True)
+            .filter(Q(match__round__isnull=True) | Q(match__round__complete=False))
+            .select_related(
+                "bot", "match", "match__map", "match__assigned_to", "match__round", "match__round__competition"
+            )
+            .only(
+                "participant_number",
+                "bot__name",
+                "match__started",
+                "match__map__name",
+                "match__assigned_to__username",
+                "match__assigned_to__type",
+                "match__round__number",
+                "match__round__competition__name",
+            )
+            .order_by(
+                F("match__round_id").asc(nulls_first=True),
+                F("match__started").asc(nulls_last=True),
+                "match_id",
+                "participant_number",
+            )
+        )
+
+        requested_matches = []
+        rounds = {}
+        matches = {}
+        for participation in participations:
+            match = matches.get(participation.match_id)
+            if match is None:
+                match = matches[participation.match_id] = participation.match
+                match.participants = []
+                if match.round is None:
+                    requested_matches.append(match)
+                else:
+                    round = rounds.setdefault(match.round_id, match.round)
+                    if not hasattr(round, "matches"):
+                        round.matches = []
+                    round.matches.append(match)
+            match.participants.append(participation)
+        return requested_matches, list(rounds.values())
+
     @staticmethod
     def cancel(match_id):
         try:
@@ -310,6 +381,7 @@ class Matches:
                 updated_participants, ["division_num", "in_placements", "match_count"]
             )
         competition.save()
+        Ladders.update_leaderboard_ranks(competition)
 
         # Get updated participants
         active_participants = CompetitionParticipation.objects.only("id", "division_num", "bot").filter(
@@ -394,3 +466,10 @@ class Matches:
                 raise APIException("Failed to start match. There might not be any available participants.")
             else:
                 return match
+
+
+@receiver(post_save, sender=Match)
+@receiver(post_save, sender=Result)
+def invalidate_match_queue(sender, instance, **kwargs):
+    # Matches are saved when they're created and started. Results finish them.
+    transaction.on_commit(Matches.invalidate_queue, robust=True)
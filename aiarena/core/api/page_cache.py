@@ -0,0 +1,215 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+
+from constance import config
+
+from aiarena.core.models import Bot, Competition, CompetitionParticipation, Match, News, Result, Round
+
+
+class PageCache:
+    """
+    Caches the rendered public pages served to anonymous visitors.
+
+    Each cached view depends on one or more invalidation groups, whose current versions form part of the page's
+    cache key. When an event changes the content of a group - a result being submitted, a round being generated,
+    a bot being updated or news being posted - the group's version is bumped, so the pages depending upon it
+    are re-rendered on their next request.
+    """
+
+    _KEY_PREFIX = "page_cache"
+    _VIEWS_KEY = "page_cache_metrics_views"
+
+    @staticmethod
+    def is_cacheable_request(request: HttpRequest) -> bool:
+        from django.contrib.messages import get_messages
+
+        # Pending messages would be rendered into the page, so it can't be shared.
+        return (
+            request.method in ("GET", "HEAD") and not request.user.is_authenticated and len(get_messages(request)) == 0
+        )
+
+    @staticmethod
+    def get_key(view_name: str, groups: list[str], request: HttpRequest) -> str:
+        versions = "-".join(str(version) for version in PageCache._get_versions(groups))
+        path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return f"{PageCache._KEY_PREFIX}_{view_name}_{versions}_{path_hash}"
+
+    @staticmethod
+    def get(view_name: str, key: str) -> HttpResponse | None:
+        response = cache.get(key)
+        if response is not None:
+            PageCache._count(view_name, "hits")
+        else:
+            PageCache._count(view_name, "misses")
+        return response
+
+    @staticmethod
+    def set(key: str, request: HttpRequest, response: HttpResponse):
+        # Responses which set cookies, including those which rendered a CSRF token, are specific to the visitor.
+        if (
+            response.status_code != 200
+            or response.streaming
+            or response.cookies
+            or request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        ):
+            return
+        cache.set(key, response, config.PAGE_CACHE_TIME)
+
+    @staticmethod
+    def invalidate(*groups: str):
+        for group in groups:
+            try:
+                cache.incr(PageCache._version_key(group))
+            except ValueError:  # no pages have been cached for the group
+                pass
+
+    @staticmethod
+    def get_metrics() -> dict[str, tuple[int, int]]:
+        """Returns the number of cache hits and misses for each view."""
+        view_names = sorted(cache.get(PageCache._VIEWS_KEY, set()))
+        counts = cache.get_many(
+            [PageCache._metric_key(view_name, metric) for view_name in view_names for metric in ("hits", "misses")]
+        )
+        return {
+            view_name: (
+                counts.get(PageCache._metric_key(view_name, "hits"), 0),
+                counts.get(PageCache._metric_key(view_name, "misses"), 0),
+            )
+            for view_name in view_names
+        }
+
+    @staticmethod
+    def reset_metrics():
+        view_names = cache.get(PageCache._VIEWS_KEY, set())
+        cache.delete_many(
+            [PageCache._metric_key(view_name, metric) for view_name in view_names for metric in ("hits", "misses")]
+        )
+
+    @staticmethod
+    def _get_versions(groups: list[str]) -> list[int]:
+        keys = [PageCache._version_key(group) for group in groups]
+        versions = cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                # Start from the current time rather than 0, so that if a version is evicted from the cache,
+                # pages cached under its previous values aren't served again.
+                version = time.time_ns()
+                if not cache.add(key, version, None):
+                    version = cache.get(key, version)
+                versions[key] = version
+        return [versions[key] for key in keys]
+
+    @staticmethod
+    def _count(view_name: str, metric: str):
+        key = PageCache._metric_key(view_name, metric)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, None)
+            view_names = cache.get(PageCache._VIEWS_KEY, set())
+            if view_name not in view_names:
+                cache.set(PageCache._VIEWS_KEY, view_names | {view_name}, None)
+
+    @staticmethod
+    def _version_key(group: str) -> str:
+        return f"{PageCache._KEY_PREFIX}_version_{group}"
+
+    @staticmethod
+    def _metric_key(view_name: str, metric: str) -> str:
+        return f"{PageCache._KEY_PREFIX}_metrics_{view_name}_{metric}"
+
+
+# Domain events which invalidate the cached pages.
+# Invalidation waits until the changes are committed, so a page can't be re-cached with the old content.
+# The changes are stored by then, so a failure to invalidate is logged rather than failing the request.
+
+# The fields displayed on the cached pages, of the models which are also saved with every result.
+# Bots are saved with each result to store their new bot data and file hashes, and participations to store their
+# new stats, so their saves only invalidate pages when a displayed field changes.
+# The result itself invalidates the pages displaying its competition's stats.
+_DISPLAYED_FIELDS = {
+    Bot: ["name", "user_id", "plays_race_id", "type"],
+    CompetitionParticipation: ["active"],
+}
+_DISPLAYED_FIELDS_CHANGED = "displayed_fields_changed"
+
+
+@receiver(pre_save, sender=Bot)
+@receiver(pre_save, sender=CompetitionParticipation)
+def track_displayed_fields(sender, instance, update_fields=None, **kwargs):
+    fields = _DISPLAYED_FIELDS[sender]
+    if instance.pk is None:
+        changed = True
+    elif update_fields is not None and set(update_fields).isdisjoint(
+        fields + [field.removesuffix("_id") for field in fields]
+    ):
+        changed = False
+    else:
+        stored = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+        changed = stored != tuple(getattr(instance, field) for field in fields)
+    # A model can be saved again while handling its save, so a change is kept until it has been handled
+    setattr(instance, _DISPLAYED_FIELDS_CHANGED, getattr(instance, _DISPLAYED_FIELDS_CHANGED, False) or changed)
+
+
+def _displayed_fields_changed(instance) -> bool:
+    return instance.__dict__.pop(_DISPLAYED_FIELDS_CHANGED, False)
+
+
+@receiver(post_save, sender=Result)
+def invalidate_pages_on_result(sender, instance, created, **kwargs):
+    if created:
+
+        def invalidate():
+            competition_id = (
+                Match.objects.filter(id=instance.match_id).values_list("round__competition_id", flat=True).first()
+            )
+            groups = ["index", "recent_results", "match_queue"]
+            if competition_id is not None:
+                groups.append(f"competition_{competition_id}")
+            PageCache.invalidate(*groups)
+
+        transaction.on_commit(invalidate, robust=True)
+
+
+@receiver(post_save, sender=Round)
+def invalidate_pages_on_round(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: PageCache.invalidate("index", "match_queue", f"competition_{instance.competition_id}"), robust=True
+    )
+
+
+@receiver(post_save, sender=Match)
+def invalidate_pages_on_match(sender, instance, **kwargs):
+    transaction.on_commit(lambda: PageCache.invalidate("match_queue"), robust=True)
+
+
+@receiver(post_save, sender=Bot)
+def invalidate_pages_on_bot(sender, instance, **kwargs):
+    if _displayed_fields_changed(instance):
+        # Bots are displayed on every competition's page
+        transaction.on_commit(lambda: PageCache.invalidate("bot_list", "index", "competition"), robust=True)
+
+
+@receiver(post_save, sender=Competition)
+def invalidate_pages_on_competition(sender, instance, **kwargs):
+    transaction.on_commit(lambda: PageCache.invalidate("index", f"competition_{instance.id}"), robust=True)
+
+
+@receiver(post_save, sender=CompetitionParticipation)
+def invalidate_pages_on_competition_participation(sender, instance, **kwargs):
+    if _displayed_fields_changed(instance):
+        transaction.on_commit(
+            lambda: PageCache.invalidate("index", f"competition_{instance.competition_id}"), robust=True
+        )
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def invalidate_pages_on_news(sender, instance, **kwargs):
+    transaction.on_commit(lambda: PageCache.invalidate("index"), robust=True)
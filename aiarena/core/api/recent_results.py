@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Prefetch
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from django_pglocks import advisory_lock
+
+from aiarena.core.api.page_cache import PageCache
+from aiarena.core.models import MatchParticipation, Result
+
+
+class RecentResultsFeed:
+    """
+    Summaries of the most recently submitted results, kept in the cache as a bounded buffer.
+
+    Results are summarized and appended to the buffer as they're committed, so the recent results page and API are
+    served without querying the database. The buffer is only rebuilt from the database when it's missing from the
+    cache. Appends and rebuilds are serialized with an advisory lock, so concurrent appends can't overwrite each other.
+    """
+
+    SIZE = 200
+    # Bots may be renamed after their results are summarized, so the buffer is periodically rebuilt
+    CACHE_TIME = 60 * 60
+
+    _CACHE_KEY = "recent_results_feed"
+    _LOCK = "recent_results_feed_lock"
+
+    @staticmethod
+    def get(limit: int = None) -> list[dict]:
+        """Returns the summaries of the most recent results, newest first."""
+        summaries = cache.get(RecentResultsFeed._CACHE_KEY)
+        if summaries is None:
+            with advisory_lock(RecentResultsFeed._LOCK):
+                summaries = cache.get(RecentResultsFeed._CACHE_KEY)
+                if summaries is None:
+                    summaries = RecentResultsFeed._summarize(
+                        Result.objects.order_by("-created", "-id")[: RecentResultsFeed.SIZE]
+                    )
+                    cache.set(RecentResultsFeed._CACHE_KEY, summaries, RecentResultsFeed.CACHE_TIME)
+        # Replay URLs may be signed and expire, so they're generated as the summaries are read
+        return [
+            {
+                **summary,
+                "replay_file_url": default_storage.url(summary["replay_file"]) if summary["replay_file"] else None,
+            }
+            for summary in summaries[:limit]
+        ]
+
+    @staticmethod
+    def append(result_id: int):
+        """Appends a result to the buffer. Should only be called once the result has been committed."""
+        with advisory_lock(RecentResultsFeed._LOCK):
+            summaries = cache.get(RecentResultsFeed._CACHE_KEY)
+            if summaries is None:  # the next rebuild will include the result
+                return
+            summaries = [summary for summary in summaries if summary["id"] != result_id]
+            summaries += RecentResultsFeed._summarize(Result.objects.filter(id=result_id))
+            # Results don't necessarily commit in the order they were created
+            summaries.sort(key=lambda summary: (summary["created"], summary["id"]), reverse=True)
+            cache.set(RecentResultsFeed._CACHE_KEY, summaries[: RecentResultsFeed.SIZE], RecentResultsFeed.CACHE_TIME)
+        # The page may have been re-cached from the buffer since the result was committed
+        PageCache.invalidate("recent_results")
+
+    @staticmethod
+    def _summarize(results) -> list[dict]:
+        results = (
+            results.select_related("match")
+            .only("type", "created", "game_steps", "replay_file", "winner", "match__id", "match__requested_by")
+            .prefetch_related(
+                Prefetch(
+                    "match__matchparticipation_set",
+                    MatchParticipation.objects.select_related("bot")
+                    .only("match_id", "participant_number", "elo_change", "bot__name")
+                    .order_by("participant_number"),
+                    to_attr="participants",
+                )
+            )
+        )
+        return [
+            {
+                "id": result.id,
+                "match": result.match.id,
+                "created": result.created,
+                "type": result.type,
+                "game_steps": result.game_steps,
+                "game_time_formatted": result.game_time_formatted,
+                "replay_file": result.replay_file.name or None,
+                "requested": result.match.requested_by_id is not None,
+                "winner": result.winner_id,
+                "participants": [
+                    {
+                        "participant_number": participant.participant_number,
+                        "bot": participant.bot_id,
+                        "bot_name": participant.bot.name,
+                        "elo_change": participant.elo_change,
+                    }
+                    for participant in result.match.participants
+                ],
+            }
+            for result in results
+        ]
+
+
+@receiver(post_save, sender=Result)
+def append_recent_result(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: RecentResultsFeed.append(instance.id), robust=True)
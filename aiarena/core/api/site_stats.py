@@ -0,0 +1,158 @@
+import random
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+
+from pytz import utc
+
+from aiarena.core.models import Result, User
+
+
+class SiteStats:
+    """
+    The site wide figures displayed on every page.
+
+    Recent result counts are kept as a rolling window of per-minute counters in the cache, which are incremented as
+    results are created. The counters are periodically re-seeded from the database, so any increments lost to cache
+    evictions or races are corrected. Figures derived from users are cached until a user is saved.
+    """
+
+    # How often the counters are re-seeded from the database
+    SEED_TIMEOUT = 60 * 60
+    # How long the summed counts are cached before being re-summed from the counters
+    COUNTS_TIMEOUT = 30
+    USERS_TIMEOUT = 60 * 60
+
+    _SEEDED_KEY = "site_stats_results_seeded"
+    _COUNTS_KEY = "site_stats_result_counts"
+    _ARENACLIENT_COUNT_KEY = "site_stats_arenaclient_count"
+    _SUPPORTER_POOL_KEY = "site_stats_supporter_pool"
+
+    # The last hour is counted in minute buckets and the last day in hour buckets, to keep the number of keys small.
+    # (bucket size in minutes, number of buckets in the window, bucket key prefix)
+    _MINUTE_BUCKETS = (1, 60, "site_stats_results_minute")
+    _HOUR_BUCKETS = (60, 24, "site_stats_results_hour")
+
+    @staticmethod
+    def record_result(created: datetime):
+        """Counts a newly created result. Should only be called once the result has been committed."""
+        # Until the counters are seeded, the seeding query will include this result.
+        if cache.get(SiteStats._SEEDED_KEY) is None:
+            return
+        minute = SiteStats._minute(created)
+        for buckets in (SiteStats._MINUTE_BUCKETS, SiteStats._HOUR_BUCKETS):
+            key = SiteStats._bucket_key(buckets, minute)
+            cache.add(key, 0, SiteStats._bucket_timeout(buckets))
+            try:
+                cache.incr(key)
+            except ValueError:  # the bucket was evicted in the meantime - the next seed will correct it
+                pass
+
+    @staticmethod
+    def get_result_counts() -> tuple[int, int]:
+        """Returns the number of results created in the last hour and in the last 24 hours."""
+        counts = cache.get(SiteStats._COUNTS_KEY)
+        if counts is None:
+            now = timezone.now()
+            if cache.get(SiteStats._SEEDED_KEY) is None:
+                bucket_counts = SiteStats._seed(now)
+            else:
+                bucket_counts = cache.get_many(
+                    [
+                        key
+                        for buckets in (SiteStats._MINUTE_BUCKETS, SiteStats._HOUR_BUCKETS)
+                        for key in SiteStats._window_keys(buckets, now)
+                    ]
+                )
+            counts = (
+                SiteStats._sum_window(SiteStats._MINUTE_BUCKETS, now, bucket_counts),
+                SiteStats._sum_window(SiteStats._HOUR_BUCKETS, now, bucket_counts),
+            )
+            cache.set(SiteStats._COUNTS_KEY, counts, SiteStats.COUNTS_TIMEOUT)
+        return counts
+
+    @staticmethod
+    def get_arenaclient_count() -> int:
+        count = cache.get(SiteStats._ARENACLIENT_COUNT_KEY)
+        if count is None:
+            count = User.objects.filter(type="ARENA_CLIENT", is_active=True).count()
+            cache.set(SiteStats._ARENACLIENT_COUNT_KEY, count, SiteStats.USERS_TIMEOUT)
+        return count
+
+    @staticmethod
+    def random_supporter() -> User | None:
+        """Picks a random supporter from a cached pool, rather than ordering the users table randomly."""
+        pool = cache.get(SiteStats._SUPPORTER_POOL_KEY)
+        if pool is None:
+            pool = list(User.objects.only("id", "username", "type").exclude(patreon_level="none"))
+            cache.set(SiteStats._SUPPORTER_POOL_KEY, pool, SiteStats.USERS_TIMEOUT)
+        return random.choice(pool) if pool else None
+
+    @staticmethod
+    def invalidate_users():
+        cache.delete_many([SiteStats._ARENACLIENT_COUNT_KEY, SiteStats._SUPPORTER_POOL_KEY])
+
+    @staticmethod
+    def _seed(now: datetime) -> dict[str, int]:
+        """Re-counts the window's results in the database and overwrites the counters with them."""
+        bucket_counts = {
+            key: 0
+            for buckets in (SiteStats._MINUTE_BUCKETS, SiteStats._HOUR_BUCKETS)
+            for key in SiteStats._window_keys(buckets, now)
+        }
+        oldest_hour = SiteStats._minute(now) // 60 - SiteStats._HOUR_BUCKETS[1]
+        for row in (
+            Result.objects.filter(created__gte=datetime.fromtimestamp(oldest_hour * 60 * 60, tz=utc))
+            .annotate(minute=TruncMinute("created"))
+            .values("minute")
+            .annotate(count=Count("id"))
+        ):
+            minute = SiteStats._minute(row["minute"])
+            for buckets in (SiteStats._MINUTE_BUCKETS, SiteStats._HOUR_BUCKETS):
+                key = SiteStats._bucket_key(buckets, minute)
+                if key in bucket_counts:
+                    bucket_counts[key] += row["count"]
+
+        for buckets in (SiteStats._MINUTE_BUCKETS, SiteStats._HOUR_BUCKETS):
+            window_keys = SiteStats._window_keys(buckets, now)
+            cache.set_many({key: bucket_counts[key] for key in window_keys}, SiteStats._bucket_timeout(buckets))
+        cache.set(SiteStats._SEEDED_KEY, True, SiteStats.SEED_TIMEOUT)
+        return bucket_counts
+
+    @staticmethod
+    def _sum_window(buckets: tuple, now: datetime, bucket_counts: dict[str, int]) -> int:
+        """Sums the buckets covering the window ending now. The oldest bucket only partly overlaps the window, so only
+        the overlapping proportion of it is counted."""
+        bucket_minutes, _, _ = buckets
+        keys = SiteStats._window_keys(buckets, now)
+        oldest_bucket_overlap = 1 - (now.timestamp() / 60 % bucket_minutes) / bucket_minutes
+        total = sum(bucket_counts.get(key, 0) for key in keys[1:])
+        return total + round(bucket_counts.get(keys[0], 0) * oldest_bucket_overlap)
+
+    @staticmethod
+    def _window_keys(buckets: tuple, now: datetime) -> list[str]:
+        """The keys of the buckets covering the window ending now, oldest first."""
+        bucket_minutes, window_buckets, _ = buckets
+        current_bucket = SiteStats._minute(now) // bucket_minutes
+        return [
+            SiteStats._bucket_key(buckets, bucket * bucket_minutes)
+            for bucket in range(current_bucket - window_buckets, current_bucket + 1)
+        ]
+
+    @staticmethod
+    def _bucket_key(buckets: tuple, minute: int) -> str:
+        bucket_minutes, _, key_prefix = buckets
+        return f"{key_prefix}_{minute // bucket_minutes}"
+
+    @staticmethod
+    def _bucket_timeout(buckets: tuple) -> int:
+        # Long enough for a bucket to outlive the window
+        bucket_minutes, window_buckets, _ = buckets
+        return (window_buckets + 2) * bucket_minutes * 60
+
+    @staticmethod
+    def _minute(moment: datetime) -> int:
+        return int(moment.timestamp()) // 60
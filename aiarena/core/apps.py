@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.AutoField"
     name = "aiarena.core"
+
+    def ready(self):
+        # connect the API's signal receivers
+        import aiarena.core.api  # noqa: F401
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
 
+from aiarena.core.s3_helpers import delete_files
+
 
 class BaseFileCleanupCommand(BaseCommand):
     _DEFAULT_DAYS_LOOKBACK = 30
@@ -10,6 +12,13 @@ class BaseFileCleanupCommand(BaseCommand):
             type=int,
             help=f"Number of days into the past to start cleaning from. Default is {self._DEFAULT_DAYS_LOOKBACK}.",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Clean up records in batches of this size, deleting their files in bulk. "
+            "Records are otherwise cleaned up one at a time. "
+            "An interrupted run can be resumed by running it again.",
+        )
         parser.add_argument("--verbose", action="store_true", help="Output information with each action.")
 
     def handle(self, *args, **options):
@@ -17,7 +26,34 @@ class BaseFileCleanupCommand(BaseCommand):
             days = options["days"]
         else:
             days = self._DEFAULT_DAYS_LOOKBACK
-        self._perform_cleanup(days, options["verbose"])
+        self._perform_cleanup(days, options["verbose"], options["batch_size"])
 
-    def _perform_cleanup(self, days, verbose):
+    def _perform_cleanup(self, days, verbose, batch_size=None):
         raise NotImplementedError("This method must be implemented in a subclass.")
+
+    def _iterate_batches(self, queryset, batch_size: int, file_fields: list[str], verbose):
+        """
+        Yields the records to clean in batches, after deleting their files in bulk.
+
+        The records are paged by id rather than by offset, so later batches are as quick to select as earlier ones.
+        Each batch is yielded as a dict of record id to the file fields which were deleted, omitting records for which
+        any file failed to be deleted. Records which are cleaned are expected to no longer match the queryset.
+        """
+        model = queryset.model
+        last_id = 0
+        while True:
+            records = list(queryset.filter(id__gt=last_id).order_by("id").values_list("id", *file_fields)[:batch_size])
+            if not records:
+                return
+            last_id = records[-1][0]
+
+            cleaned = {record[0]: [field for field, name in zip(file_fields, record[1:]) if name] for record in records}
+            failed_ids = set()
+            for index, field in enumerate(file_fields, start=1):
+                names = {record[index]: record[0] for record in records if record[index]}
+                for name in delete_files(model._meta.get_field(field).storage, list(names)):
+                    self.stdout.write(f"WARNING: Failed to delete {name}.")
+                    failed_ids.add(names[name])
+            if verbose:
+                self.stdout.write(f"Deleted the files of {len(records) - len(failed_ids)} records up to id {last_id}.")
+            yield {record_id: fields for record_id, fields in cleaned.items() if record_id not in failed_ids}
@@ -12,13 +12,21 @@ class Command(BaseFileCleanupCommand):
 
     _DEFAULT_DAYS_LOOKBACK = 30
 
-    def _perform_cleanup(self, days, verbose):
+    def _perform_cleanup(self, days, verbose, batch_size=None):
         self.stdout.write(f"Cleaning up match logfiles starting from {days} days into the past...")
         self.stdout.write("Gathering records to clean...")
         participants = MatchParticipation.objects.exclude(match_log="").filter(
             match__result__created__lt=timezone.now() - timedelta(days=days)
         )
         self.stdout.write(f"{participants.count()} records gathered.")
+        if batch_size is not None:
+            cleanup_count = 0
+            for batch in self._iterate_batches(participants, batch_size, ["match_log"], verbose):
+                MatchParticipation.objects.filter(id__in=batch).update(match_log="", match_log_has_been_cleaned=True)
+                cleanup_count += len(batch)
+            self.stdout.write(f"Cleaned up {cleanup_count} logfiles.")
+            return
+
         cleanup_count = 0
         for participant in participants:
             with transaction.atomic():
@@ -1,6 +1,7 @@
 from datetime import timedelta
 
 from django.db import transaction
+from django.db.models import Case, F, Value, When
 from django.utils import timezone
 
 from aiarena.core.management.commands.basefilecleanupcommand import BaseFileCleanupCommand
@@ -12,7 +13,7 @@ class Command(BaseFileCleanupCommand):
 
     _DEFAULT_DAYS_LOOKBACK = 30
 
-    def _perform_cleanup(self, days, verbose):
+    def _perform_cleanup(self, days, verbose, batch_size=None):
         self.stdout.write(f"Cleaning up result files starting from {days} days into the past...")
         self.stdout.write("Gathering records to clean...")
         # exclude results if that have neither a replay file nor an arena client log file
@@ -20,6 +21,13 @@ class Command(BaseFileCleanupCommand):
             created__lt=timezone.now() - timedelta(days=days)
         )
         self.stdout.write(f"{results.count()} records gathered.")
+        if batch_size is not None:
+            replays_cleaned_count, ac_logs_cleaned_count = self._perform_batched_cleanup(results, batch_size, verbose)
+            self.stdout.write(
+                f"Cleaned up {replays_cleaned_count} replays and {ac_logs_cleaned_count} arena client logs."
+            )
+            return
+
         replays_cleaned_count = ac_logs_cleaned_count = 0
         for result in results:
             with transaction.atomic():
@@ -42,3 +50,23 @@ class Command(BaseFileCleanupCommand):
                         f"WARNING: Match {result.match_id} had no files to clean up even though it should have."
                     )
         self.stdout.write(f"Cleaned up {replays_cleaned_count} replays and {ac_logs_cleaned_count} arena client logs.")
+
+    def _perform_batched_cleanup(self, results, batch_size, verbose):
+        replays_cleaned_count = ac_logs_cleaned_count = 0
+        for batch in self._iterate_batches(results, batch_size, ["replay_file", "arenaclient_log"], verbose):
+            replay_ids = [result_id for result_id, fields in batch.items() if "replay_file" in fields]
+            ac_log_ids = [result_id for result_id, fields in batch.items() if "arenaclient_log" in fields]
+            # Only results which had a file are marked as having had it cleaned, as with Result.clean_replay_file
+            Result.objects.filter(id__in=batch).update(
+                replay_file="",
+                arenaclient_log="",
+                replay_file_has_been_cleaned=Case(
+                    When(id__in=replay_ids, then=Value(True)), default=F("replay_file_has_been_cleaned")
+                ),
+                arenaclient_log_has_been_cleaned=Case(
+                    When(id__in=ac_log_ids, then=Value(True)), default=F("arenaclient_log_has_been_cleaned")
+                ),
+            )
+            replays_cleaned_count += len(replay_ids)
+            ac_logs_cleaned_count += len(ac_log_ids)
+        return replays_cleaned_count, ac_logs_cleaned_count
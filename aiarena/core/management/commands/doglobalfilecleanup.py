@@ -8,6 +8,6 @@ class Command(BaseFileCleanupCommand):
 
     _DEFAULT_DAYS_LOOKBACK = 30
 
-    def _perform_cleanup(self, days, verbose):
-        call_command("cleanupresultfiles", days=days, verbosity=verbose)
-        call_command("cleanupmatchlogfiles", days=days, verbosity=verbose)
+    def _perform_cleanup(self, days, verbose, batch_size=None):
+        call_command("cleanupresultfiles", days=days, verbosity=verbose, batch_size=batch_size)
+        call_command("cleanupmatchlogfiles", days=days, verbosity=verbose, batch_size=batch_size)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from django_pglocks import advisory_lock
+
+from aiarena.core.api import CompetitionHistory
+from aiarena.core.models import Competition
+
+
+class Command(BaseCommand):
+    help = (
+        "Appends the results submitted since the last export to each competition's columnar (Parquet) history "
+        "in the media storage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--competitionid",
+            type=int,
+            help="The competition id to export. If this isn't supplied all open competitions will be exported",
+        )
+        parser.add_argument("--allcompetitions", action="store_true", help="Export all competitions")
+
+    def handle(self, *args, **options):
+        if options["allcompetitions"]:
+            competitions = Competition.objects.all()
+        elif options["competitionid"]:
+            competitions = Competition.objects.filter(id=options["competitionid"])
+        else:
+            competitions = Competition.objects.filter(status__in=["open", "closing"])
+
+        for competition in competitions:
+            with advisory_lock(f"history_export_lock_competition_{competition.id}", wait=False) as acquired:
+                if not acquired:
+                    self.stdout.write(f"Competition {competition.id} is already being exported - skipping.")
+                    continue
+                exported = CompetitionHistory.export(competition.id)
+                self.stdout.write(f"Exported {exported} rows for competition {competition.id}.")
+
+        self.stdout.write("Done")
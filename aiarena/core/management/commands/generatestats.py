@@ -1,12 +1,31 @@
+import multiprocessing
+import time
+from contextlib import nullcontext
+
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
+from django.db import connections, transaction
 
 from django_pglocks import advisory_lock
 
+from aiarena.core.api import Ladders
 from aiarena.core.api.bot_statistics import BotStatistics
+from aiarena.core.api.internal.statistics.stats_timings import StatsTimings
 from aiarena.core.models import Competition, CompetitionParticipation
 
 
+def _generate_participation_stats(args):
+    """Worker entry point for --workers.
+    Each worker process opens its own database connection on first use."""
+    sp_id, graphs_only = args
+    timings = StatsTimings()
+    sp = CompetitionParticipation.objects.select_related("bot", "competition").get(id=sp_id)
+    if graphs_only:
+        BotStatistics.generate_graphs(sp, timings)
+    else:
+        BotStatistics.recalculate_stats(sp, timings)
+    return sp.bot_id, timings.totals
+
+
 class Command(BaseCommand):
     help = "Runs the generate stats db routine to generate bot stats."
 
@@ -36,6 +55,12 @@ class Command(BaseCommand):
             action="store_true",
             help="Generate only ELO graphs. Not valid with --finalize. ",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes to split each competition's participations across. Default is 1.",
+        )
 
     def handle(self, *args, **options):
         if options["allcompetitions"]:
@@ -53,29 +78,42 @@ class Command(BaseCommand):
         if graphs_only and finalize:
             raise CommandError("--graphsonly is not valid with --finalize")
 
-        bot_id = options["botid"]
-        if bot_id is not None:
-            # only process competitions this bot was present for.
-            competitions = competitions.filter(participations__bot_id=bot_id)
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers must be at least 1")
 
-        self.stdout.write(f"looping {len(competitions)} Competitions")
-        for competition in competitions:
-            if finalize:
-                self.stdout.write(f"Finalizing stats for competition {competition.id}...")
-                with transaction.atomic():
-                    # This lock will be held for a long time.
-                    # This is considered acceptable as we only finalize old competitions,
-                    # so no matches should be running. We also need all bot stats data to be successfully
-                    # regenerated before we can finalize the competition, else it could end up finalized in a corrupted
-                    # state.
-                    competition.lock_me()
-                    self._run_generate_stats(competition, finalize=True)
-            else:
-                self._run_generate_stats(competition, graphs_only=graphs_only)
+        if workers > 1:
+            # The workers are forked before this process uses the database, so that none of them share its connection
+            # (and with it the advisory locks held below).
+            connections.close_all()
+            pool = multiprocessing.get_context("fork").Pool(workers)
+        else:
+            pool = None
+
+        with pool or nullcontext():
+            bot_id = options["botid"]
+            if bot_id is not None:
+                # only process competitions this bot was present for.
+                competitions = competitions.filter(participations__bot_id=bot_id)
+
+            self.stdout.write(f"looping {len(competitions)} Competitions")
+            for competition in competitions:
+                if finalize:
+                    self.stdout.write(f"Finalizing stats for competition {competition.id}...")
+                    with transaction.atomic():
+                        # This lock will be held for a long time.
+                        # This is considered acceptable as we only finalize old competitions,
+                        # so no matches should be running. We also need all bot stats data to be successfully
+                        # regenerated before we can finalize the competition, else it could end up finalized in a
+                        # corrupted state.
+                        competition.lock_me()
+                        self._run_generate_stats(competition, pool, finalize=True)
+                else:
+                    self._run_generate_stats(competition, pool, graphs_only=graphs_only)
 
         self.stdout.write("Done")
 
-    def _run_generate_stats(self, competition, finalize=False, graphs_only=False):
+    def _run_generate_stats(self, competition, pool, finalize=False, graphs_only=False):
         if not competition.statistics_finalized:
             if finalize:
                 competition.statistics_finalized = True
@@ -83,11 +121,22 @@ class Command(BaseCommand):
             with advisory_lock(f"stats_lock_competition_{competition.id}") as acquired:
                 if not acquired:
                     raise Exception(f"Could not acquire lock on bot statistics for competition {str(competition.id)}")
-                for sp in CompetitionParticipation.objects.filter(competition_id=competition.id):
-                    self.stdout.write(f"Generating current competition stats for bot {sp.bot_id}...")
-                    if graphs_only:
-                        BotStatistics.generate_graphs(sp)
-                    else:
-                        BotStatistics.recalculate_stats(sp)
+                start = time.perf_counter()
+                timings = StatsTimings()
+                sp_ids = CompetitionParticipation.objects.filter(competition_id=competition.id).values_list(
+                    "id", flat=True
+                )
+                tasks = [(sp_id, graphs_only) for sp_id in sp_ids]
+                if pool is None:
+                    results = map(_generate_participation_stats, tasks)
+                else:
+                    results = pool.imap_unordered(_generate_participation_stats, tasks)
+                for bot_id, sp_timings in results:
+                    self.stdout.write(f"Generated current competition stats for bot {bot_id}.")
+                    timings.add(sp_timings)
+                Ladders.update_leaderboard_ranks(competition)
+                self.stdout.write(
+                    f"Competition {competition.id} stats generated in {time.perf_counter() - start:.2f}s ({timings})"
+                )
         else:
             self.stdout.write(f"WARNING: Skipping competition {competition.id} - stats already finalized.")
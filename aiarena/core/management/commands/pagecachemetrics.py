@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from aiarena.core.api import PageCache
+
+
+class Command(BaseCommand):
+    help = "Displays the page cache's hit and miss counts for each cached view."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Reset the counts after displaying them.")
+
+    def handle(self, *args, **options):
+        metrics = PageCache.get_metrics()
+        if not metrics:
+            self.stdout.write("No page cache metrics have been recorded.")
+        for view_name, (hits, misses) in metrics.items():
+            hit_rate = hits / (hits + misses) * 100 if hits + misses else 0
+            self.stdout.write(f"{view_name}: {hits} hits, {misses} misses ({hit_rate:.1f}% hit rate)")
+
+        if options["reset"]:
+            PageCache.reset_metrics()
+            self.stdout.write("Metrics reset.")
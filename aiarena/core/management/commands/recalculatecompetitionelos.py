@@ -1,14 +1,16 @@
-from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from aiarena.core.models import Competition, CompetitionParticipation, Match, MatchParticipation
+from aiarena.core.api import Ladders
+from aiarena.core.api.internal.elo_replay_engine import EloReplayEngine
+from aiarena.core.api.internal.statistics.competition_participation_charts import CompetitionParticipationCharts
+from aiarena.core.models import Competition, CompetitionParticipation
 
 
 class Command(BaseCommand):
     help = (
         "Recalculates a competition's ELOs based on all matches for that competition. "
-        "This can take a VERY long time. "
-        "WARNING: This is not protected by a lock or transaction. "
+        "This can take a long time. "
+        "WARNING: This is not protected by a lock. "
         "Ensure no other processes are affecting this competition while this job runs."
     )
 
@@ -21,59 +23,18 @@ class Command(BaseCommand):
         self.stdout.write(f"Competition id {target_competition.id} located.")
         competition_participants = CompetitionParticipation.objects.filter(competition=target_competition)
         self.stdout.write(f"{competition_participants.count()} competition participants located.")
-        matches = (
-            Match.objects.filter(round__competition=target_competition, result__isnull=False)
-            .prefetch_related("matchparticipation_set", "result")
-            .order_by("result__created")
-        )
-
-        self.stdout.write(f"{matches.count()} matches located.")
-
-        self.stdout.write("Resetting all ELOs to starting ELO...", ending="\r")
-        for participant in competition_participants:
-            participant.elo = settings.ELO_START_VALUE
-            participant.save()
-        self.stdout.write("Resetting all ELOs to starting ELO...done")
 
         self.stdout.write("Recalculating all match ELOs...0%", ending="\r")
-        count: int = 0
-        for match in matches:
-            count += 1
-            p1: MatchParticipation = match.participant1
-            p2: MatchParticipation = match.participant2
-
-            # Starting ELO
-            p1_starting_elo = p1.competition_participant.elo
-            p2_starting_elo = p2.competition_participant.elo
-            initial_elo_sum = p1_starting_elo + p2_starting_elo
-
-            match.result.adjust_elo()
-            p1.competition_participant.refresh_from_db()
-            p2.competition_participant.refresh_from_db()
-
-            # Resultant ELO
-            p1.resultant_elo = p1.competition_participant.elo
-            p2.resultant_elo = p2.competition_participant.elo
-            resultant_elo_sum = p1.resultant_elo + p2.resultant_elo
+        match_count = EloReplayEngine(target_competition, progress_callback=self._write_progress).run()
+        self.stdout.write(f"Recalculating all match ELOs...done. {match_count} matches replayed.")
 
-            # ELO change
-            p1.elo_change = p1.resultant_elo - p1_starting_elo
-            p2.elo_change = p2.resultant_elo - p2_starting_elo
-
-            p1.save()
-            p2.save()
-
-            if initial_elo_sum != resultant_elo_sum:
-                self.stdout.write(
-                    f"ERROR: Initial and resultant ELO sum mismatch: "
-                    f"Match {match.id}. "
-                    f"initial_elo_sum: {initial_elo_sum}. "
-                    f"resultant_elo_sum: {resultant_elo_sum}. "
-                    f"participant1.elo_change: {p1.elo_change}. "
-                    f"participant2.elo_change: {p2.elo_change}"
-                )
-
-            self.stdout.write(f"Recalculating all match ELOs...{count/matches.count()*100}%", ending="\r")
-
-        self.stdout.write("Recalculating all match ELOs...done")
+        for sp in competition_participants.only("id", "bot_id", "competition_id"):
+            Ladders.update_elo_trend(sp)
+        Ladders.update_leaderboard_ranks(target_competition)
+        CompetitionParticipationCharts.invalidate(*competition_participants.values_list("id", flat=True))
         self.stdout.write("Job finished!")
+
+    def _write_progress(self, replayed, total):
+        # only report whole percentages, so large competitions don't flood the output
+        if replayed * 100 // total != (replayed - 1) * 100 // total:
+            self.stdout.write(f"Recalculating all match ELOs...{replayed * 100 // total}%", ending="\r")
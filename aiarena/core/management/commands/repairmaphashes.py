@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from aiarena.core.models import Map
+
+
+class Command(BaseCommand):
+    help = "Calculates the hashes of map files which are missing or don't match."
+
+    def handle(self, *args, **options):
+        self.stdout.write("Repairing hashes...")
+        for map in Map.objects.all():
+            if map.update_file_hash():
+                self.stdout.write(f"{map.name} - MISMATCH - REPAIRED")
+        self.stdout.write("Done.")
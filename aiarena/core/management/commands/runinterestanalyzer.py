@@ -1,10 +1,12 @@
 from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
 from django.utils import timezone
 
 from constance import config
+from django_pglocks import advisory_lock
 
 from aiarena.core.match_interest_analyzer import MatchInterestAnalyzer
-from aiarena.core.models import Match
+from aiarena.core.models import MatchParticipation, Result
 
 
 class Command(BaseCommand):
@@ -12,22 +14,81 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("num_matches", type=int, default=1, help="The number of matches to analyze")
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only analyze matches that haven't been analyzed yet. If another incremental run is already in "
+            "progress, this run is skipped.",
+        )
+        parser.add_argument(
+            "--batchsize",
+            type=int,
+            default=1000,
+            help="The number of matches to load and analyze at a time. Default is 1000.",
+        )
 
     def handle(self, *args, **options):
         num_matches = options["num_matches"]
-
-        self.stdout.write(f"Analyzing {num_matches} matches...")
+        batch_size = options["batchsize"]
 
         analyzer = MatchInterestAnalyzer(config.ELO_DIFF_RATING_MODIFIER, config.COMBINED_ELO_RATING_DIVISOR)
 
         # if a result has a round, it's a ladder match
-        for i, match in enumerate(Match.objects.filter(round__isnull=False).order_by("-result__created")):
-            match.result.interest_rating = analyzer.rate_match(match)
-            match.result.date_interest_rating_calculated = timezone.now()
-            match.result.save()
-            self.stdout.write(f"Match {match.id} analyzed")
+        results = Result.objects.filter(match__round__isnull=False).order_by("-created")
+
+        if options["incremental"]:
+            with advisory_lock("interest_analyzer_incremental", wait=False) as acquired:
+                if not acquired:
+                    self.stdout.write("Another incremental analysis is in progress - skipping.")
+                    return
+                self.stdout.write(f"Analyzing up to {num_matches} unanalyzed matches...")
+                # Each batch is rated before the next is fetched, so the filter excludes the previous batches.
+                analyzed = 0
+                while analyzed < num_matches:
+                    batch_analyzed = self._analyze_batch(
+                        analyzer,
+                        results.filter(date_interest_rating_calculated__isnull=True),
+                        0,
+                        min(batch_size, num_matches - analyzed),
+                    )
+                    if batch_analyzed == 0:
+                        break
+                    analyzed += batch_analyzed
+        else:
+            self.stdout.write(f"Analyzing {num_matches} matches...")
+            analyzed = 0
+            while analyzed < num_matches:
+                batch_analyzed = self._analyze_batch(
+                    analyzer, results, analyzed, min(batch_size, num_matches - analyzed)
+                )
+                if batch_analyzed == 0:
+                    break
+                analyzed += batch_analyzed
+
+        self.stdout.write(f"Analysis finished. {analyzed} matches analyzed.")
+
+    def _analyze_batch(self, analyzer: MatchInterestAnalyzer, results, offset: int, limit: int) -> int:
+        """Rates a batch of results using a single query to load them and a single bulk update to save them."""
+        participations = MatchParticipation.objects.filter(match_id=OuterRef("match_id"))
+        batch = list(
+            results.annotate(
+                participant1_starting_elo=Subquery(participations.filter(participant_number=1).values("starting_elo")),
+                participant2_starting_elo=Subquery(participations.filter(participant_number=2).values("starting_elo")),
+            ).only("id", "match_id", "type")[offset : offset + limit]
+        )
+        if not batch:
+            return 0
 
-            if i >= num_matches - 1:
-                break
+        ratings = analyzer.rate_matches(
+            [result.type for result in batch],
+            [result.participant1_starting_elo for result in batch],
+            [result.participant2_starting_elo for result in batch],
+        )
+        now = timezone.now()
+        for result, rating in zip(batch, ratings):
+            result.interest_rating = float(rating)
+            result.date_interest_rating_calculated = now
+        Result.objects.bulk_update(batch, ["interest_rating", "date_interest_rating_calculated"])
 
-        self.stdout.write("Analysis finished.")
+        self.stdout.write(f"{len(batch)} matches analyzed")
+        return len(batch)
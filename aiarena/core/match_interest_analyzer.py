@@ -1,8 +1,20 @@
 import math
 
+import numpy as np
+
 from aiarena.core.models import Match
 
 
+# Result types for matches that fully played out - any other match we consider not interesting.
+RATEABLE_RESULT_TYPES = [
+    "Player1Win",
+    "Player2Win",
+    "Player1Surrender",
+    "Player2Surrender",
+]
+PARTICIPANT1_WIN_RESULT_TYPES = ["Player1Win", "Player2Surrender"]
+
+
 class MatchInterestAnalyzer:
     def __init__(self, elo_diff_rating_modifier: float, combined_elo_rating_divisor: int):
         self.elo_diff_rating_modifier = elo_diff_rating_modifier
@@ -12,12 +24,7 @@ class MatchInterestAnalyzer:
         """Attempts to rate the match based on how "interesting" it is."""
 
         # Any match that didn't fully play out we consider not interesting.
-        if match.result.type not in [
-            "Player1Win",
-            "Player2Win",
-            "Player1Surrender",
-            "Player2Surrender",
-        ]:
+        if match.result.type not in RATEABLE_RESULT_TYPES:
             return -1.0
 
         # prefer higher ELO matches
@@ -33,3 +40,28 @@ class MatchInterestAnalyzer:
 
         # average them out
         return (elo_height_rating + elo_difference_rating) / 2
+
+    def rate_matches(self, result_types, participant1_starting_elos, participant2_starting_elos) -> np.ndarray:
+        """Vectorised version of rate_match, for rating a batch of matches at once.
+
+        Matches missing a participant's starting ELO can't be rated, so they're considered not interesting."""
+        result_types = np.asarray(result_types, dtype=object)
+        p1_elos = np.asarray(participant1_starting_elos, dtype=float)
+        p2_elos = np.asarray(participant2_starting_elos, dtype=float)
+
+        rateable = np.isin(result_types, RATEABLE_RESULT_TYPES) & ~np.isnan(p1_elos) & ~np.isnan(p2_elos)
+        # Only compute ratings for the rateable matches, so missing ELOs don't produce NaN warnings.
+        p1_elos = np.where(rateable, p1_elos, 0)
+        p2_elos = np.where(rateable, p2_elos, 0)
+
+        # prefer higher ELO matches
+        avg_elos = (p1_elos + p2_elos) / 2
+        elo_height_ratings = 1 / (1 + np.exp(avg_elos / self.combined_elo_rating_divisor)) - 0.5
+
+        # avoid large elo differences unless it's an upset
+        participant1_won = np.isin(result_types, PARTICIPANT1_WIN_RESULT_TYPES)
+        upset = np.where(participant1_won, p1_elos < p2_elos, p2_elos < p1_elos)
+        elo_difference_ratings = np.where(upset, 0.0, self.elo_diff_rating_modifier ** np.abs(p1_elos - p2_elos) - 1)
+
+        # average them out
+        return np.where(rateable, (elo_height_ratings + elo_difference_ratings) / 2, -1.0)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0073_auto_20231019_1411"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="competitionparticipation",
+            name="graphs_fingerprint",
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2 on 2026-10-18 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0074_competitionparticipation_graphs_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="result",
+            index=models.Index(
+                condition=models.Q(("date_interest_rating_calculated__isnull", True)),
+                fields=["created"],
+                name="result_interest_unrated_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2 on 2026-10-18 22:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0075_result_interest_unrated_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompetitionBotDurationStats",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("duration_minutes", models.PositiveSmallIntegerField()),
+                ("win_count", models.IntegerField(blank=True, default=0)),
+                ("loss_count", models.IntegerField(blank=True, default=0)),
+                ("crash_count", models.IntegerField(blank=True, default=0)),
+                ("tie_count", models.IntegerField(blank=True, default=0)),
+                (
+                    "bot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="competition_duration_stats",
+                        to="core.competitionparticipation",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("bot", "duration_minutes")},
+            },
+        ),
+        # Populate the stats from the existing results
+        migrations.RunSQL(
+            """
+    insert into core_competitionbotdurationstats
+        (bot_id, duration_minutes, win_count, loss_count, crash_count, tie_count)
+    select csp.id,
+           least(floor(cr.game_steps / (22.4 * 60 * 5)) * 5, 30),
+           count(*) filter (where mp.result = 'win'),
+           count(*) filter (where mp.result = 'loss' and mp.result_cause is distinct from 'crash'),
+           count(*) filter (where mp.result_cause = 'crash'),
+           count(*) filter (where mp.result = 'tie')
+    from core_matchparticipation mp
+    join core_result cr on cr.match_id = mp.match_id
+    join core_match cm on cm.id = mp.match_id
+    join core_round crnd on crnd.id = cm.round_id
+    join core_competition cc on cc.id = crnd.competition_id
+    join core_competitionparticipation csp on csp.competition_id = cc.id and csp.bot_id = mp.bot_id
+    where cr.type not in ('MatchCancelled', 'InitializationError', 'Error')
+    group by csp.id, 2
+    """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.2 on 2026-10-18 23:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0076_competitionbotdurationstats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompetitionBotRollupStats",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("duration_minutes", models.PositiveSmallIntegerField()),
+                ("match_count", models.IntegerField(blank=True, default=0)),
+                ("win_count", models.IntegerField(blank=True, default=0)),
+                ("loss_count", models.IntegerField(blank=True, default=0)),
+                ("tie_count", models.IntegerField(blank=True, default=0)),
+                ("crash_count", models.IntegerField(blank=True, default=0)),
+                (
+                    "bot",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="competition_rollup_stats",
+                        to="core.competitionparticipation",
+                    ),
+                ),
+                ("map", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="core.map")),
+                (
+                    "opponent",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.competitionparticipation",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("bot", "opponent", "map", "duration_minutes")},
+            },
+        ),
+        # Populate the rollup stats from the existing results
+        migrations.RunSQL(
+            """
+    insert into core_competitionbotrollupstats
+        (bot_id, opponent_id, map_id, duration_minutes, match_count, win_count, loss_count, tie_count, crash_count)
+    select csp.id,
+           opponent_csp.id,
+           cm.map_id,
+           least(cr.game_steps / (1344 * 5) * 5, 30),
+           count(*),
+           count(*) filter (where mp.result = 'win'),
+           count(*) filter (where mp.result = 'loss'),
+           count(*) filter (where mp.result = 'tie'),
+           count(*) filter (where mp.result = 'loss'
+                            and mp.result_cause in ('crash', 'timeout', 'initialization_failure'))
+    from core_matchparticipation mp
+    join core_matchparticipation opponent_mp
+        on opponent_mp.match_id = mp.match_id and opponent_mp.participant_number != mp.participant_number
+    join core_result cr on cr.match_id = mp.match_id
+    join core_match cm on cm.id = mp.match_id
+    join core_round crnd on crnd.id = cm.round_id
+    join core_competitionparticipation csp
+        on csp.competition_id = crnd.competition_id and csp.bot_id = mp.bot_id
+    join core_competitionparticipation opponent_csp
+        on opponent_csp.competition_id = crnd.competition_id and opponent_csp.bot_id = opponent_mp.bot_id
+    where cr.type not in ('MatchCancelled', 'InitializationError', 'Error')
+    group by csp.id, opponent_csp.id, cm.map_id, 4
+    """,
+            migrations.RunSQL.noop,
+        ),
+        # The duration stats now count timeouts and initialization failures as crashes, like the other stats
+        migrations.RunSQL(
+            """
+    delete from core_competitionbotdurationstats;
+    insert into core_competitionbotdurationstats
+        (bot_id, duration_minutes, win_count, loss_count, crash_count, tie_count)
+    select bot_id,
+           duration_minutes,
+           sum(win_count),
+           sum(loss_count) - sum(crash_count),
+           sum(crash_count),
+           sum(tie_count)
+    from core_competitionbotrollupstats
+    group by bot_id, duration_minutes
+    """,
+            migrations.RunSQL.noop,
+        ),
+    ]
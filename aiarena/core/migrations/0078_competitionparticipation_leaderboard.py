@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0077_competitionbotrollupstats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="competitionparticipation",
+            name="elo_trend",
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="competitionparticipation",
+            name="leaderboard_rank",
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="competitionparticipation",
+            index=models.Index(fields=["competition", "leaderboard_rank"], name="core_compet_competi_5a1cd0_idx"),
+        ),
+    ]
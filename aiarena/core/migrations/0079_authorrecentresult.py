@@ -0,0 +1,59 @@
+# Generated by Django 4.2 on 2026-10-19 00:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0078_competitionparticipation_leaderboard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthorRecentResult",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created", models.DateTimeField()),
+                (
+                    "result",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="core.result"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recent_results",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="authorrecentresult",
+            index=models.Index(fields=["user", "-created"], name="core_author_user_id_ff25f2_idx"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="authorrecentresult",
+            unique_together={("user", "result")},
+        ),
+        # Backfill each author's feed with their latest 25 results
+        migrations.RunSQL(
+            """
+        insert into core_authorrecentresult (user_id, result_id, created)
+        select user_id, result_id, created from (
+            select user_id, result_id, created,
+                   row_number() over (partition by user_id order by created desc, result_id desc) as position
+            from (
+                select distinct cb.user_id, cr.id as result_id, cr.created
+                from core_result cr
+                join core_matchparticipation cmp on cmp.match_id = cr.match_id
+                join core_bot cb on cb.id = cmp.bot_id
+            ) author_results
+        ) ranked_results
+        where position <= 25
+        """,
+            migrations.RunSQL.noop,
+        ),
+    ]
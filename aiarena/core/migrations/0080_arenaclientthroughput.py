@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-19 01:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0079_authorrecentresult"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="arenaclient",
+            name="submitted_result_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name="ArenaClientThroughput",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("minute", models.DateTimeField()),
+                ("result_count", models.PositiveIntegerField(default=0)),
+                (
+                    "arenaclient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="throughput", to="core.arenaclient"
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("arenaclient", "minute")},
+            },
+        ),
+        # Backfill the arena clients' lifetime counts and their last 24 hours of throughput
+        migrations.RunSQL(
+            """
+        update core_arenaclient
+        set submitted_result_count = result_counts.result_count
+        from (
+            select submitted_by_id, count(*) as result_count
+            from core_result
+            group by submitted_by_id
+        ) result_counts
+        where result_counts.submitted_by_id = core_arenaclient.user_ptr_id;
+
+        insert into core_arenaclientthroughput (arenaclient_id, minute, result_count)
+        select cr.submitted_by_id, date_trunc('minute', cr.created), count(*)
+        from core_result cr
+        join core_arenaclient ac on ac.user_ptr_id = cr.submitted_by_id
+        where cr.created >= now() - interval '24 hours'
+        group by cr.submitted_by_id, date_trunc('minute', cr.created);
+        """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0080_arenaclientthroughput"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="map",
+            name="file_hash",
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2 on 2026-10-19 01:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0081_map_file_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArenaClientStatusTime",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("hour", models.DateTimeField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("idle", "Idle"),
+                            ("starting_game", "Starting Game"),
+                            ("playing_game", "In Game"),
+                            ("submitting_result", "Submitting Result"),
+                        ],
+                        max_length=17,
+                    ),
+                ),
+                ("seconds", models.FloatField(default=0)),
+                (
+                    "arenaclient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="status_times", to="core.arenaclient"
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("arenaclient", "hour", "status")},
+            },
+        ),
+        # Aggregate the last 30 days of status history into hours, attributing the time between each status and the
+        # next to the earlier status, up to the default match timeout of an hour. Then keep only each arena client's
+        # latest status
+        migrations.RunSQL(
+            """
+        insert into core_arenaclientstatustime (arenaclient_id, hour, status, seconds)
+        select s.arenaclient_id,
+               h.hour,
+               s.status,
+               sum(extract(epoch from least(s.ended_at, h.hour + interval '1 hour') - greatest(s.logged_at, h.hour)))
+        from (
+            select arenaclient_id, status, logged_at, least(next_logged_at, logged_at + interval '1 hour') as ended_at
+            from (
+                select arenaclient_id, status, logged_at,
+                       lead(logged_at) over (partition by arenaclient_id order by logged_at, id) as next_logged_at
+                from core_arenaclientstatus
+                where logged_at >= now() - interval '30 days'
+            ) statuses
+            where next_logged_at is not null
+        ) s
+        cross join lateral generate_series(date_trunc('hour', s.logged_at), s.ended_at, interval '1 hour') as h(hour)
+        where h.hour < s.ended_at
+        group by s.arenaclient_id, h.hour, s.status;
+
+        delete from core_arenaclientstatus
+        where id not in (
+            select distinct on (arenaclient_id) id
+            from core_arenaclientstatus
+            order by arenaclient_id, logged_at desc, id desc
+        );
+        """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="arenaclientstatus",
+            name="arenaclient",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE, related_name="status", to="core.arenaclient"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="arenaclientstatus",
+            name="logged_at",
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,11 +1,16 @@
 # ruff: noqa: F401
 from .arena_client import ArenaClient
 from .arena_client_status import ArenaClientStatus
+from .arena_client_status_time import ArenaClientStatusTime
+from .arena_client_throughput import ArenaClientThroughput
+from .author_recent_result import AuthorRecentResult
 from .bot import Bot
 from .bot_crash_limit_alert import BotCrashLimitAlert
 from .competition import Competition
+from .competition_bot_duration_stats import CompetitionBotDurationStats
 from .competition_bot_map_stats import CompetitionBotMapStats
 from .competition_bot_matchup_stats import CompetitionBotMatchupStats
+from .competition_bot_rollup_stats import CompetitionBotRollupStats
 from .competition_participation import CompetitionParticipation
 from .game import Game
 from .game_mode import GameMode
@@ -28,11 +33,16 @@ from .website_user import WebsiteUser
 __all__ = [
     "ArenaClient",
     "ArenaClientStatus",
+    "ArenaClientStatusTime",
+    "ArenaClientThroughput",
+    "AuthorRecentResult",
     "Bot",
     "BotCrashLimitAlert",
     "Competition",
+    "CompetitionBotDurationStats",
     "CompetitionBotMapStats",
     "CompetitionBotMatchupStats",
+    "CompetitionBotRollupStats",
     "CompetitionParticipation",
     "Game",
     "GameMode",
@@ -15,6 +15,8 @@ class ArenaClient(User):
     """Whether this Arena Client is trusted. Only trusted Arena Clients are used to run ladder games."""
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="arenaclients")
     """The user that owns this ArenaClient"""
+    submitted_result_count = models.PositiveIntegerField(default=0, editable=False)
+    """The number of results this ArenaClient has submitted. See ArenaClientThroughput"""
 
     class Meta:
         verbose_name = "ArenaClient"
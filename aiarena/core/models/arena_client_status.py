@@ -1,6 +1,7 @@
 import logging
 
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 from . import ArenaClient
 
@@ -9,15 +10,40 @@ logger = logging.getLogger(__name__)
 
 
 class ArenaClientStatus(models.Model):
+    """The latest status logged by an ArenaClient.
+
+    Each ArenaClient has at most one status, which is replaced as new statuses are logged. The time spent in each
+    status is kept in ArenaClientStatusTime."""
+
     STATUS_TYPES = (
         ("idle", "Idle"),
         ("starting_game", "Starting Game"),
         ("playing_game", "In Game"),
         ("submitting_result", "Submitting Result"),
     )
-    arenaclient = models.ForeignKey(ArenaClient, on_delete=models.CASCADE, related_name="statuses")
+    arenaclient = models.OneToOneField(ArenaClient, on_delete=models.CASCADE, related_name="status")
     """The ArenaClient this status pertains to."""
     status = models.CharField(max_length=17, choices=STATUS_TYPES)
     """The running status of the ArenaClient."""
-    logged_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    logged_at = models.DateTimeField(default=timezone.now, db_index=True)
     """The datetime this status was logged at."""
+
+    def __str__(self):
+        return f"{self.arenaclient} - {self.status}"
+
+    @staticmethod
+    def set_status(arenaclient: ArenaClient, status: str) -> "ArenaClientStatus":
+        """Replaces the arena client's status, recording the time spent in its previous status."""
+        from .arena_client_status_time import ArenaClientStatusTime
+
+        now = timezone.now()
+        with transaction.atomic():
+            current, created = ArenaClientStatus.objects.select_for_update().get_or_create(
+                arenaclient=arenaclient, defaults={"status": status, "logged_at": now}
+            )
+            if not created:
+                ArenaClientStatusTime.record(arenaclient, current.status, current.logged_at, now)
+                current.status = status
+                current.logged_at = now
+                current.save(update_fields=["status", "logged_at"])
+        return current
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from constance import config
+
+from .arena_client import ArenaClient
+from .arena_client_status import ArenaClientStatus
+
+
+class ArenaClientStatusTime(models.Model):
+    """The time an arena client spent in a status within an hour.
+
+    This is recorded as the arena client's status changes, so the fleet's utilisation can be read without keeping
+    every status it logged. Times older than RETENTION are deleted as new hours are created."""
+
+    RETENTION = timedelta(days=30)
+
+    arenaclient = models.ForeignKey(ArenaClient, on_delete=models.CASCADE, related_name="status_times")
+    hour = models.DateTimeField()
+    """The start of the hour the time was spent in."""
+    status = models.CharField(max_length=17, choices=ArenaClientStatus.STATUS_TYPES)
+    seconds = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.arenaclient} - {self.hour} - {self.status}"
+
+    @staticmethod
+    def record(arenaclient: ArenaClient, status: str, start, end):
+        """Records the time an arena client spent in a status, split across the hours it spans.
+
+        An arena client which stops reporting its status is assumed to be offline once a match would have timed out,
+        so no more than TIMEOUT_MATCHES_AFTER is credited to a status and the rest of the time is left unattributed.
+        Time older than RETENTION isn't recorded."""
+        end = min(end, start + config.TIMEOUT_MATCHES_AFTER)
+        start = max(start, timezone.now() - ArenaClientStatusTime.RETENTION)
+        hour = start.replace(minute=0, second=0, microsecond=0)
+        while hour < end:
+            next_hour = hour + timedelta(hours=1)
+            seconds = (min(end, next_hour) - max(start, hour)).total_seconds()
+            status_time, created = ArenaClientStatusTime.objects.get_or_create(
+                arenaclient=arenaclient, hour=hour, status=status, defaults={"seconds": seconds}
+            )
+            if created:
+                # At most once per hour and status per arena client, so the table stays small without a separate
+                # clean up job
+                ArenaClientStatusTime.objects.filter(
+                    arenaclient=arenaclient, hour__lt=hour - ArenaClientStatusTime.RETENTION
+                ).delete()
+            else:
+                ArenaClientStatusTime.objects.filter(id=status_time.id).update(seconds=F("seconds") + seconds)
+            hour = next_hour
+
+    @staticmethod
+    def get_utilisation(hours: int = 24, arenaclient_ids: list[int] = None) -> dict[str, float]:
+        """Returns the seconds spent in each status by arena clients, over the last number of hours.
+        This includes the current hour, so far as it has been recorded."""
+        status_times = ArenaClientStatusTime.objects.filter(
+            hour__gte=timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours - 1)
+        )
+        if arenaclient_ids is not None:
+            status_times = status_times.filter(arenaclient_id__in=arenaclient_ids)
+        seconds = dict(status_times.values("status").annotate(total=Sum("seconds")).values_list("status", "total"))
+        return {status: seconds.get(status, 0) for status, _ in ArenaClientStatus.STATUS_TYPES}
+
+    class Meta:
+        unique_together = (("arenaclient", "hour", "status"),)
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import F, Q, Sum
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .arena_client import ArenaClient
+from .result import Result
+
+
+class ArenaClientThroughput(models.Model):
+    """The number of results an arena client submitted within a minute.
+
+    These are counted as results are submitted, so an arena client's recent throughput can be read without
+    counting its results. Counts older than WINDOW are deleted as new ones are created."""
+
+    WINDOW = timedelta(hours=24)
+
+    arenaclient = models.ForeignKey(ArenaClient, on_delete=models.CASCADE, related_name="throughput")
+    minute = models.DateTimeField()
+    """The start of the minute the results were submitted in."""
+    result_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.arenaclient} - {self.minute}"
+
+    @staticmethod
+    def record_result(result: Result):
+        """Counts a result submitted by an arena client. Results submitted by other users, such as admins cancelling
+        matches, aren't counted."""
+        if not ArenaClient.objects.filter(pk=result.submitted_by_id).update(
+            submitted_result_count=F("submitted_result_count") + 1
+        ):
+            return
+
+        minute = result.created.replace(second=0, microsecond=0)
+        throughput, created = ArenaClientThroughput.objects.get_or_create(
+            arenaclient_id=result.submitted_by_id, minute=minute, defaults={"result_count": 1}
+        )
+        if created:
+            # At most once a minute per arena client, so the table stays small without a separate clean up job
+            ArenaClientThroughput.objects.filter(
+                arenaclient_id=result.submitted_by_id, minute__lt=minute - ArenaClientThroughput.WINDOW
+            ).delete()
+        else:
+            ArenaClientThroughput.objects.filter(id=throughput.id).update(result_count=F("result_count") + 1)
+
+    @staticmethod
+    def get_result_counts(arenaclient_ids: list[int] = None) -> dict[int, tuple[int, int]]:
+        """Returns the number of results each arena client submitted in the last hour and in the last 24 hours.
+        Arena clients which submitted no results in that time are omitted."""
+        now = timezone.now()
+        throughput = ArenaClientThroughput.objects.filter(minute__gte=now - timedelta(hours=24))
+        if arenaclient_ids is not None:
+            throughput = throughput.filter(arenaclient_id__in=arenaclient_ids)
+        return {
+            row["arenaclient_id"]: (row["result_count_1h"] or 0, row["result_count_24h"])
+            for row in throughput.values("arenaclient_id").annotate(
+                result_count_1h=Sum("result_count", filter=Q(minute__gte=now - timedelta(hours=1))),
+                result_count_24h=Sum("result_count"),
+            )
+        }
+
+    class Meta:
+        unique_together = (("arenaclient", "minute"),)
+
+
+@receiver(post_save, sender=Result)
+def post_save_arena_client_throughput(sender, instance, created, **kwargs):
+    if created:
+        ArenaClientThroughput.record_result(instance)
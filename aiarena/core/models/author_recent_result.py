@@ -0,0 +1,50 @@
+from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .bot import Bot
+from .result import Result
+from .user import User
+
+
+class AuthorRecentResult(models.Model):
+    """One of the most recent results of an author's bots, as listed on the author's page.
+
+    Only the latest FEED_LENGTH results of each author are kept, so the page can read them with a single indexed
+    query rather than joining and sorting the author's entire match history."""
+
+    FEED_LENGTH = 25
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recent_results")
+    result = models.ForeignKey(Result, on_delete=models.CASCADE, related_name="+")
+    created = models.DateTimeField()
+    """A copy of the result's created time, so the feed can be ordered without joining the result."""
+
+    def __str__(self):
+        return f"{self.user} - {self.result}"
+
+    @staticmethod
+    def add_result(result: Result):
+        """Appends the result to the feeds of the authors of its bots, then trims those feeds back to FEED_LENGTH."""
+        user_ids = set(
+            Bot.objects.filter(matchparticipation__match_id=result.match_id).values_list("user_id", flat=True)
+        )
+        AuthorRecentResult.objects.bulk_create(
+            [AuthorRecentResult(user_id=user_id, result=result, created=result.created) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+        for user_id in user_ids:
+            feed = AuthorRecentResult.objects.filter(user_id=user_id)
+            feed.exclude(
+                id__in=feed.order_by("-created", "-id").values("id")[: AuthorRecentResult.FEED_LENGTH]
+            ).delete()
+
+    class Meta:
+        unique_together = (("user", "result"),)
+        indexes = [models.Index(fields=["user", "-created"])]
+
+
+@receiver(post_save, sender=Result)
+def post_save_author_recent_result(sender, instance, created, **kwargs):
+    if created:
+        AuthorRecentResult.add_result(instance)
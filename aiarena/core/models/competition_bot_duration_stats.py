@@ -0,0 +1,41 @@
+from django.db import models
+
+from .competition_participation import CompetitionParticipation
+
+
+class CompetitionBotDurationStats(models.Model):
+    """A bot's results in a competition, bucketed by match duration.
+    This is the data behind the bot's win rate vs duration graph."""
+
+    GAME_STEPS_PER_MINUTE = 1344  # 22.4 game steps per second
+    BUCKET_MINUTES = 5
+    MAX_DURATION_MINUTES = 30
+    """Matches longer than this are counted in the final bucket."""
+
+    bot = models.ForeignKey(
+        CompetitionParticipation, on_delete=models.CASCADE, related_name="competition_duration_stats"
+    )
+    duration_minutes = models.PositiveSmallIntegerField()
+    """The start of the bucket's duration range"""
+    win_count = models.IntegerField(default=0, blank=True)
+    loss_count = models.IntegerField(default=0, blank=True)
+    """Losses that weren't crashes - unlike the other stats, crashes aren't also counted as losses here,
+    so that the bucket's counts can be stacked in the graph."""
+    crash_count = models.IntegerField(default=0, blank=True)
+    """Losses due to a crash, timeout or initialization failure."""
+    tie_count = models.IntegerField(default=0, blank=True)
+
+    @staticmethod
+    def get_duration_minutes(game_steps: int) -> int:
+        """The bucket a match of this many game steps falls into"""
+        bucket_steps = CompetitionBotDurationStats.GAME_STEPS_PER_MINUTE * CompetitionBotDurationStats.BUCKET_MINUTES
+        return min(
+            game_steps // bucket_steps * CompetitionBotDurationStats.BUCKET_MINUTES,
+            CompetitionBotDurationStats.MAX_DURATION_MINUTES,
+        )
+
+    def __str__(self):
+        return f"{self.bot} - {self.duration_minutes} minutes"
+
+    class Meta:
+        unique_together = (("bot", "duration_minutes"),)
@@ -0,0 +1,29 @@
+from django.db import models
+
+from .competition_participation import CompetitionParticipation
+from .map import Map
+
+
+class CompetitionBotRollupStats(models.Model):
+    """A bot's results in a competition, broken down by opponent, map and match duration.
+
+    This is the finest grained breakdown of a bot's results - the bot's other statistics (global, matchup, map and
+    duration) are all aggregated from it, as can any other slice of the results, such as by opponent race."""
+
+    bot = models.ForeignKey(CompetitionParticipation, on_delete=models.CASCADE, related_name="competition_rollup_stats")
+    opponent = models.ForeignKey(CompetitionParticipation, on_delete=models.CASCADE, related_name="+")
+    map = models.ForeignKey(Map, on_delete=models.CASCADE)
+    duration_minutes = models.PositiveSmallIntegerField()
+    """The start of the duration bucket. See CompetitionBotDurationStats.get_duration_minutes"""
+    match_count = models.IntegerField(default=0, blank=True)
+    win_count = models.IntegerField(default=0, blank=True)
+    loss_count = models.IntegerField(default=0, blank=True)
+    tie_count = models.IntegerField(default=0, blank=True)
+    crash_count = models.IntegerField(default=0, blank=True)
+    """Losses due to a crash, timeout or initialization failure. These are also counted as losses."""
+
+    def __str__(self):
+        return f"{self.bot} vs {self.opponent} on {self.map} - {self.duration_minutes} minutes"
+
+    class Meta:
+        unique_together = (("bot", "opponent", "map", "duration_minutes"),)
@@ -45,6 +45,8 @@ class CompetitionParticipation(models.Model, LockableModelMixin):
     elo_graph = models.FileField(upload_to=elo_graph_upload_to, blank=True, null=True)
     elo_graph_update_plot = PrivateFileField(upload_to=elo_graph_update_plot_upload_to, blank=True, null=True)
     winrate_vs_duration_graph = models.FileField(upload_to=winrate_vs_duration_graph_upload_to, blank=True, null=True)
+    # Identifies the data the graphs above were last rendered from, so unchanged graphs can be skipped.
+    graphs_fingerprint = models.CharField(max_length=100, blank=True, editable=False)
     highest_elo = models.IntegerField(blank=True, null=True)
     slug = models.SlugField(max_length=255, blank=True)
     active = models.BooleanField(default=True)
@@ -57,6 +59,15 @@ class CompetitionParticipation(models.Model, LockableModelMixin):
     DEFAULT_DIVISION = 0
     division_num = models.IntegerField(default=DEFAULT_DIVISION, validators=[MinValueValidator(DEFAULT_DIVISION)])
     in_placements = models.BooleanField(default=True)
+    leaderboard_rank = models.PositiveIntegerField(blank=True, null=True, editable=False)
+    """The participant's position on the competition's leaderboard, or None if it's inactive.
+    This is a snapshot, maintained by Ladders.update_leaderboard_ranks."""
+    elo_trend = models.IntegerField(blank=True, null=True, editable=False)
+    """The ELO gained or lost over the participant's most recent ELO_TREND_N_MATCHES ladder matches.
+    This is a snapshot, maintained by Ladders.update_elo_trend."""
+
+    class Meta:
+        indexes = [models.Index(fields=["competition", "leaderboard_rank"])]
 
     def validate_unique(self, exclude=None):
         if self.active:
@@ -1,8 +1,10 @@
 from django.db import models
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 
 from aiarena.core.models.competition import Competition
 from aiarena.core.models.game_mode import GameMode
-from aiarena.core.s3_helpers import is_s3_file
+from aiarena.core.utils import calculate_md5_django_filefield
 
 
 def map_file_upload_to(instance, filename):
@@ -19,20 +21,24 @@ class Map(models.Model):
     """Whether this map is enabled for play.
      Note that when this is set to false, it doesn't necessarily mean that the map isn't in a competition's map pool.
      In this way the map could still be used for matches."""
+    file_hash = models.CharField(max_length=32, editable=False, blank=True, null=True)
+    """The MD5 hash of the map file, so arena clients can check whether their cached copy is current.
+    This is updated whenever the map is saved."""
 
     def __str__(self):
         return self.name
 
-    @property
-    def file_hash(self):
-        # if the file is stored on S3, then return it's ETAG
-        if is_s3_file(self.file):
-            path_prefix = self.file.storage.location
-            hash = self.file.storage.bucket.Object(path_prefix + self.file.name).e_tag
-            return self.remove_quotes(hash)
-        else:
-            return None
-
-    def remove_quotes(self, etag):
-        # [1:-1] is to remove the quotes from the ETAG
-        return etag[1:-1]
+    def update_file_hash(self) -> bool:
+        """Re-calculates the file's hash, returning whether it changed."""
+        file_hash = calculate_md5_django_filefield(self.file) if self.file else None
+        if self.file_hash == file_hash:
+            return False
+        self.file_hash = file_hash
+        Map.objects.filter(id=self.id).update(file_hash=file_hash)
+        return True
+
+
+@receiver(post_save, sender=Map)
+def post_save_map(sender, instance, **kwargs):
+    # The file is only saved to the storage once the map is saved, so it's hashed afterwards
+    instance.update_file_hash()
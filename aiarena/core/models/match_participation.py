@@ -32,6 +32,8 @@ class MatchParticipation(models.Model, LockableModelMixin):
         ("error", "Error"),
         # There was an unspecified error running the match (this should only be paired with a 'none' result)
     )
+    # The causes of a loss which count as the bot crashing
+    CRASH_CAUSES = ["crash", "timeout", "initialization_failure"]
     match = models.ForeignKey(Match, on_delete=models.CASCADE)
     participant_number = models.PositiveSmallIntegerField(db_index=True)
     bot = models.ForeignKey(Bot, on_delete=models.PROTECT)
@@ -64,7 +66,7 @@ class MatchParticipation(models.Model, LockableModelMixin):
 
     @property
     def crashed(self):
-        return self.result == "loss" and self.result_cause in ["crash", "timeout", "initialization_failure"]
+        return self.result == "loss" and self.result_cause in MatchParticipation.CRASH_CAUSES
 
     @property
     def triggered_a_crash_limit_alert(self):
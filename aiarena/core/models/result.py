@@ -3,7 +3,9 @@ import time
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from django.utils.functional import cached_property
 
 from ..utils import Elo
@@ -77,6 +79,16 @@ class Result(models.Model, LockableModelMixin):
     arenaclient_log_has_been_cleaned = models.BooleanField(default=False)
     """This is set to true when the arena log file is deleted by the cleanup job."""
 
+    class Meta:
+        indexes = [
+            # Supports the incremental interest analysis, which only looks at results that haven't been rated yet
+            models.Index(
+                fields=["created"],
+                condition=models.Q(date_interest_rating_calculated__isnull=True),
+                name="result_interest_unrated_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.created.__str__() + " " + str(self.type) + " " + str(self.duration_seconds)
 
@@ -250,3 +262,11 @@ class Result(models.Model, LockableModelMixin):
         sp1.save()
         sp2.elo -= delta
         sp2.save()
+
+
+@receiver(post_save, sender=Result)
+def post_save_result(sender, instance, created, **kwargs):
+    if created:
+        from aiarena.core.api import SiteStats  # avoid circular reference
+
+        transaction.on_commit(lambda: SiteStats.record_result(instance.created), robust=True)
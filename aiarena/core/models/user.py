@@ -1,8 +1,8 @@
 import logging
 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-from django.db.models.signals import pre_save
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
@@ -137,12 +137,6 @@ class User(AbstractUser, LockableModelMixin):
         """
         return self.has_donated
 
-    @staticmethod
-    def random_supporter():
-        # todo: apparently order_by('?') is really slow
-        # https://stackoverflow.com/questions/962619/how-to-pull-a-random-record-using-djangos-orm#answer-962672
-        return User.objects.only("id", "username", "type").exclude(patreon_level="none").order_by("?").first()
-
     @property
     def is_arenaclient(self):
         from .arena_client import ArenaClient  # avoid circular reference
@@ -167,3 +161,14 @@ class User(AbstractUser, LockableModelMixin):
 def pre_save_user(sender, instance, **kwargs):
     if not instance.is_websiteuser:
         instance.set_unusable_password()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_site_stats(sender, instance, update_fields=None, **kwargs):
+    # Logins only update last_login, which none of the site stats depend upon
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    from aiarena.core.api import SiteStats  # avoid circular reference
+
+    transaction.on_commit(SiteStats.invalidate_users, robust=True)
@@ -1,4 +1,12 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+
+
 AWS_S3_STORAGE_CLASSES = ["PrivateS3BotoStorage", "S3Boto3Storage"]
+# The most keys S3 allows to be deleted in a single request
+S3_DELETE_OBJECTS_MAX_KEYS = 1000
 
 
 def is_s3_file(file):
@@ -26,3 +34,49 @@ def get_file_url_s3_hack(file, file_name):
         return get_file_s3_url_with_content_disposition(file, file_name)
     else:
         return file.url
+
+
+def get_cached_file_s3_url_with_content_disposition(file, file_name):
+    """
+    Returns a pre-signed URL to a file with a content disposition header set, as per
+    get_file_s3_url_with_content_disposition. Signing a URL is relatively expensive, so it's cached for half the
+    URL's lifetime, leaving whoever receives a cached URL at least half its lifetime to use it.
+    """
+    cache_time = file.storage.querystring_expire // 2
+    key = "s3_url_" + hashlib.md5(f"{file.storage.bucket_name}/{file.name}/{file_name}".encode()).hexdigest()
+    url = cache.get(key)
+    if url is None:
+        url = get_file_s3_url_with_content_disposition(file, file_name)
+        cache.set(key, url, cache_time)
+    return url
+
+
+def delete_files(storage, names: list[str], threads: int = 8) -> list[str]:
+    """
+    Deletes many files from a storage at once. Files stored on S3 are deleted up to 1000 per request, while files
+    on other storages are deleted concurrently.
+    Returns the names of the files which couldn't be deleted.
+    """
+    if storage.__class__.__name__ in AWS_S3_STORAGE_CLASSES:
+        from storages.utils import clean_name
+
+        failed = []
+        for start in range(0, len(names), S3_DELETE_OBJECTS_MAX_KEYS):
+            # Keys are normalized the same way the storage's delete method does
+            keys = {
+                storage._normalize_name(clean_name(name)): name
+                for name in names[start : start + S3_DELETE_OBJECTS_MAX_KEYS]
+            }
+            response = storage.bucket.delete_objects(Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True})
+            failed += [keys[error["Key"]] for error in response.get("Errors", [])]
+        return failed
+
+    def delete(name):
+        try:
+            storage.delete(name)
+        except Exception:
+            return name
+        return None
+
+    with ThreadPoolExecutor(threads) as executor:
+        return [name for name in executor.map(delete, names) if name is not None]
@@ -25,7 +25,12 @@ def celery_exception_test():
 
 @app.task(ignore_result=True)
 def doglobalfilecleanup():
-    management.call_command("doglobalfilecleanup", days=90)
+    management.call_command("doglobalfilecleanup", days=90, batch_size=1000)
+
+
+@app.task(ignore_result=True)
+def export_competition_history():
+    management.call_command("exportcompetitionhistory")
 
 
 @app.task(ignore_result=True)
@@ -38,6 +43,11 @@ def generate_stats_graphsonly():
     management.call_command("generatestats", "--graphsonly")
 
 
+@app.task(ignore_result=True)
+def run_interest_analyzer():
+    management.call_command("runinterestanalyzer", 5000, "--incremental")
+
+
 @app.task(ignore_result=True)
 def refresh_patreon_tiers():
     management.call_command("refreshpatreontiers")
@@ -3,9 +3,21 @@ from io import StringIO
 
 from django.core import serializers
 from django.core.management import call_command
+from django.db.models import F
 from django.test import TransactionTestCase
+from django.utils import timezone
 
-from aiarena.core.models import CompetitionBotMapStats, CompetitionBotMatchupStats, CompetitionParticipation
+from aiarena.core.api import BotStatistics
+from aiarena.core.api.internal.statistics.elo_graphs_generator import EloGraphsGenerator
+from aiarena.core.models import (
+    CompetitionBotDurationStats,
+    CompetitionBotMapStats,
+    CompetitionBotMatchupStats,
+    CompetitionBotRollupStats,
+    CompetitionParticipation,
+    MatchParticipation,
+    User,
+)
 from aiarena.core.tests.test_mixins import FullDataSetMixin
 
 
@@ -68,3 +80,97 @@ class BotStatisticsTestCase(FullDataSetMixin, TransactionTestCase):
         recalc_stats_json["map_stats"] = json.dumps(map_stats)
 
         self.assertEqual(update_stats_json, recalc_stats_json)
+
+    def test_unchanged_graphs_are_not_regenerated(self):
+        sp = CompetitionParticipation.objects.filter(match_count__gt=0).first()
+        BotStatistics.generate_graphs(sp)
+        self.assertFalse(BotStatistics.generate_graphs(sp))
+        self.assertEqual(CompetitionParticipation.objects.get(id=sp.id).graphs_fingerprint, sp.graphs_fingerprint)
+
+        # rewriting the ELOs the graphs are drawn from should render them again
+        MatchParticipation.objects.filter(
+            bot=sp.bot, match__round__competition=sp.competition, match__result__isnull=False
+        ).update(resultant_elo=F("resultant_elo") + 1)
+        self.assertTrue(BotStatistics.generate_graphs(sp))
+        self.assertFalse(BotStatistics.generate_graphs(sp))
+
+        # a change to the bot moves the update line, so it should be rendered again
+        sp.bot.bot_zip_updated = timezone.now()
+        self.assertTrue(BotStatistics.generate_graphs(sp))
+        self.assertTrue(sp.elo_graph)
+        self.assertTrue(sp.elo_graph_update_plot)
+        self.assertTrue(sp.winrate_vs_duration_graph)
+
+    def test_stats_update_verses_recalculation_after_new_results(self):
+        stat_fields = [
+            "bot",
+            "match_count",
+            "win_count",
+            "win_perc",
+            "loss_count",
+            "loss_perc",
+            "tie_count",
+            "tie_perc",
+            "crash_count",
+            "crash_perc",
+        ]
+
+        def _stats():
+            return (
+                list(
+                    CompetitionBotDurationStats.objects.order_by("bot", "duration_minutes").values(
+                        "bot", "duration_minutes", "win_count", "loss_count", "crash_count", "tie_count"
+                    )
+                ),
+                list(
+                    CompetitionBotRollupStats.objects.order_by("bot", "opponent", "map", "duration_minutes").values(
+                        "bot",
+                        "opponent",
+                        "map",
+                        "duration_minutes",
+                        "match_count",
+                        "win_count",
+                        "loss_count",
+                        "tie_count",
+                        "crash_count",
+                    )
+                ),
+                # ids and update times won't match, so leave them out
+                list(CompetitionBotMatchupStats.objects.order_by("bot", "opponent").values(*stat_fields)),
+                list(CompetitionBotMapStats.objects.order_by("bot", "map").values(*stat_fields)),
+            )
+
+        # results applied after the recalculation in setUp update the stats incrementally
+        self.test_client.login(User.objects.get(username="arenaclient1"))
+        self._generate_match_activity()
+        updated_stats = _stats()
+
+        call_command("generatestats", "--allcompetitions")
+        self.assertEqual(updated_stats, _stats())
+
+        # check the stats against the bot's match history
+        for sp in CompetitionParticipation.objects.all():
+            expected = {}
+            for participation in MatchParticipation.objects.filter(
+                bot=sp.bot, match__round__competition=sp.competition, match__result__isnull=False
+            ).exclude(match__result__type__in=["MatchCancelled", "InitializationError", "Error"]):
+                counts = expected.setdefault(
+                    CompetitionBotDurationStats.get_duration_minutes(participation.match.result.game_steps),
+                    [0, 0, 0, 0],
+                )
+                counts[0] += participation.result == "win"
+                counts[1] += participation.result == "loss" and not participation.crashed
+                counts[2] += participation.crashed
+                counts[3] += participation.result == "tie"
+            self.assertEqual(
+                [(duration, *counts) for duration, counts in sorted(expected.items())],
+                EloGraphsGenerator(sp)._get_winrate_data(),
+            )
+
+    def test_opponent_race_stats(self):
+        for sp in CompetitionParticipation.objects.filter(match_count__gt=0):
+            race_stats = list(BotStatistics.get_opponent_race_stats(sp))
+            self.assertEqual(sum(stats["match_count"] for stats in race_stats), sp.match_count)
+            self.assertEqual(sum(stats["win_count"] for stats in race_stats), sp.win_count)
+            for stats in race_stats:
+                self.assertEqual(stats["win_perc"], stats["win_count"] / stats["match_count"] * 100)
@@ -1,26 +1,32 @@
 import json
+import tempfile
 from datetime import timedelta
 from io import StringIO
+from unittest.mock import patch
 
 from django.core import serializers
 from django.core.management import CommandError, call_command
-from django.test import TransactionTestCase
+from django.test import TransactionTestCase, override_settings
 from django.utils import timezone
 
 from constance import config
 
-from aiarena.core.api import Ladders
+from aiarena.core.api import CompetitionHistory, Ladders
+from aiarena.core.api.internal.statistics.elo_graphs_generator import EloGraphsGenerator
 from aiarena.core.management.commands import cleanupresultfiles
+from aiarena.core.match_interest_analyzer import MatchInterestAnalyzer
 from aiarena.core.models import (
     Bot,
     Competition,
     CompetitionParticipation,
+    Map,
     Match,
     MatchParticipation,
     Result,
     User,
 )
 from aiarena.core.tests.test_mixins import MatchReadyMixin
+from aiarena.core.utils import calculate_md5_django_filefield
 
 
 class ManagementCommandTests(MatchReadyMixin, TransactionTestCase):
@@ -150,6 +156,43 @@ class ManagementCommandTests(MatchReadyMixin, TransactionTestCase):
         for participant in participants:
             self.assertFalse(participant.match_log)
 
+    def test_cleanup_replays_and_logs_in_batches(self):
+        NUM_MATCHES = 12
+        participants, results = self._generate_files_to_cleanup(NUM_MATCHES)
+        replay_files = [result.replay_file for result in results]
+        match_logs = [participant.match_log for participant in participants]
+
+        out = StringIO()
+        call_command("cleanupresultfiles", batch_size=5, stdout=out)
+        self.assertIn(
+            "12 records gathered.\nCleaned up 12 replays and 12 arena client logs.",
+            out.getvalue(),
+        )
+        for result in Result.objects.filter(id__in=[result.id for result in results]):
+            self.assertFalse(result.replay_file)
+            self.assertFalse(result.arenaclient_log)
+            self.assertTrue(result.replay_file_has_been_cleaned)
+            self.assertTrue(result.arenaclient_log_has_been_cleaned)
+        for replay_file in replay_files:
+            self.assertFalse(replay_file.storage.exists(replay_file.name))
+
+        # resuming a cleanup doesn't re-clean the records which were already cleaned
+        out = StringIO()
+        call_command("cleanupresultfiles", batch_size=5, stdout=out)
+        self.assertIn("0 records gathered.\nCleaned up 0 replays and 0 arena client logs.", out.getvalue())
+
+        out = StringIO()
+        call_command("cleanupmatchlogfiles", batch_size=5, stdout=out)
+        self.assertIn(
+            f"{NUM_MATCHES * 2} records gathered.\nCleaned up {NUM_MATCHES * 2} logfiles.",
+            out.getvalue(),
+        )
+        for participant in MatchParticipation.objects.filter(id__in=[participant.id for participant in participants]):
+            self.assertFalse(participant.match_log)
+            self.assertTrue(participant.match_log_has_been_cleaned)
+        for match_log in match_logs:
+            self.assertFalse(match_log.storage.exists(match_log.name))
+
     def _generate_files_to_cleanup(self, num_matches: int):
         self.test_client.login(self.staffUser1)
         # freeze competition2, so we can get anticipatable results
@@ -186,6 +229,28 @@ class ManagementCommandTests(MatchReadyMixin, TransactionTestCase):
         call_command("generatestats", "--graphsonly", stdout=out)
         self.assertIn("Done", out.getvalue())
 
+    def test_generatestats_workers(self):
+        self._generate_full_data_set()
+        # wipe the incrementally updated stats so we know the workers regenerated them
+        CompetitionParticipation.objects.update(match_count=0)
+        out = StringIO()
+        call_command("generatestats", "--workers", 2, stdout=out)
+        self.assertIn("aggregation:", out.getvalue())
+        self.assertIn("Done", out.getvalue())
+        for sp in CompetitionParticipation.objects.filter(competition__status__in=["open", "closing"]):
+            self.assertEqual(
+                sp.match_count,
+                MatchParticipation.objects.filter(
+                    bot=sp.bot, match__result__isnull=False, match__round__competition=sp.competition
+                )
+                .exclude(match__result__type__in=["MatchCancelled", "InitializationError", "Error"])
+                .count(),
+            )
+
+    def test_generatestats_workers_invalid(self):
+        with self.assertRaisesMessage(CommandError, "--workers must be at least 1"):
+            call_command("generatestats", "--workers", 0)
+
     def test_generatestats_graphsonly_invalid_call(self):
         self._generate_full_data_set()
         out = StringIO()
@@ -285,6 +350,123 @@ class ManagementCommandTests(MatchReadyMixin, TransactionTestCase):
             call_command("generatestats", "--botid", bot.id, stdout=out)
         self.assertIn("Done", out.getvalue())
 
+    def test_recalculatecompetitionelos(self):
+        self._generate_full_data_set()
+
+        def _snapshot(competition):
+            return (
+                list(
+                    CompetitionParticipation.objects.filter(competition=competition)
+                    .order_by("id")
+                    .values_list("id", "elo")
+                ),
+                list(
+                    MatchParticipation.objects.filter(
+                        match__round__competition=competition, match__result__isnull=False
+                    )
+                    .order_by("id")
+                    .values_list("id", "resultant_elo", "elo_change")
+                ),
+            )
+
+        for competition in Competition.objects.all():
+            expected = _snapshot(competition)
+
+            # corrupt the figures so we know they're recalculated
+            CompetitionParticipation.objects.filter(competition=competition).update(elo=0)
+            MatchParticipation.objects.filter(
+                match__round__competition=competition, match__result__isnull=False
+            ).update(resultant_elo=0, elo_change=0)
+
+            out = StringIO()
+            call_command("recalculatecompetitionelos", competition.id, stdout=out)
+            self.assertIn("Job finished!", out.getvalue())
+            self.assertEqual(expected, _snapshot(competition))
+
+    def test_recalculatecompetitionelos_regenerates_graphs(self):
+        self._generate_full_data_set()
+        competition = Result.objects.filter(match__round__isnull=False).first().match.round.competition
+        call_command("generatestats", "--graphsonly", "--competitionid", competition.id, stdout=StringIO())
+        rendered_ids = set(
+            CompetitionParticipation.objects.filter(competition=competition)
+            .exclude(graphs_fingerprint="")
+            .values_list("id", flat=True)
+        )
+        self.assertTrue(rendered_ids)
+
+        call_command("recalculatecompetitionelos", competition.id, stdout=StringIO())
+        self.assertFalse(
+            CompetitionParticipation.objects.filter(competition=competition).exclude(graphs_fingerprint="").exists()
+        )
+
+        # the graphs were drawn from the previous ELOs, so they should be rendered again
+        with patch("aiarena.core.api.bot_statistics.EloGraphsGenerator", wraps=EloGraphsGenerator) as generator:
+            call_command("generatestats", "--graphsonly", "--competitionid", competition.id, stdout=StringIO())
+        self.assertLessEqual(rendered_ids, {call.args[0].id for call in generator.call_args_list})
+
+    def test_runinterestanalyzer(self):
+        self._generate_full_data_set()
+        ladder_results = Result.objects.filter(match__round__isnull=False)
+
+        # the batched ratings should match those of the per-match analysis
+        analyzer = MatchInterestAnalyzer(config.ELO_DIFF_RATING_MODIFIER, config.COMBINED_ELO_RATING_DIVISOR)
+        expected = {result.id: analyzer.rate_match(result.match) for result in ladder_results}
+
+        out = StringIO()
+        call_command("runinterestanalyzer", 1000, "--incremental", "--batchsize", 3, stdout=out)
+        self.assertIn(f"Analysis finished. {len(expected)} matches analyzed.", out.getvalue())
+        for result in ladder_results.all():
+            self.assertAlmostEqual(expected[result.id], result.interest_rating)
+            self.assertIsNotNone(result.date_interest_rating_calculated)
+
+        # already analyzed matches are skipped
+        out = StringIO()
+        call_command("runinterestanalyzer", 1000, "--incremental", stdout=out)
+        self.assertIn("Analysis finished. 0 matches analyzed.", out.getvalue())
+
+        # unless they're explicitly re-analyzed
+        out = StringIO()
+        call_command("runinterestanalyzer", 5, "--batchsize", 2, stdout=out)
+        self.assertIn("Analysis finished. 5 matches analyzed.", out.getvalue())
+
+    def test_exportcompetitionhistory(self):
+        self._generate_full_data_set()
+        competition = Competition.objects.first()
+        participations = MatchParticipation.objects.filter(
+            match__round__competition=competition, match__result__isnull=False
+        )
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            # results are only exported once they're old enough
+            out = StringIO()
+            call_command("exportcompetitionhistory", "--competitionid", competition.id, stdout=out)
+            self.assertIn(f"Exported 0 rows for competition {competition.id}.", out.getvalue())
+            self.assertTrue(CompetitionHistory.load(competition.id).empty)
+
+            with patch.object(CompetitionHistory, "EXPORT_DELAY", timedelta()), patch.object(
+                CompetitionHistory, "ROWS_PER_PART", 5
+            ):
+                out = StringIO()
+                call_command("exportcompetitionhistory", "--competitionid", competition.id, stdout=out)
+                self.assertIn(
+                    f"Exported {participations.count()} rows for competition {competition.id}.", out.getvalue()
+                )
+
+                # only new results are appended
+                out = StringIO()
+                call_command("exportcompetitionhistory", "--competitionid", competition.id, stdout=out)
+                self.assertIn(f"Exported 0 rows for competition {competition.id}.", out.getvalue())
+
+            history = CompetitionHistory.load(competition.id, columns=["result_id", "bot_id", "resultant_elo"])
+            self.assertEqual(
+                list(
+                    participations.order_by("match__result__id", "participant_number").values_list(
+                        "match__result__id", "bot_id", "resultant_elo"
+                    )
+                ),
+                list(history.itertuples(index=False, name=None)),
+            )
+
     def test_seed(self):
         out = StringIO()
         call_command("seed", stdout=out)
@@ -296,6 +478,18 @@ class ManagementCommandTests(MatchReadyMixin, TransactionTestCase):
     def test_repair_bot_hashes(self):
         call_command("repairbothashes")
 
+    def test_repair_map_hashes(self):
+        map = Map.objects.exclude(file="").first()
+        file_hash = calculate_md5_django_filefield(map.file)
+        self.assertEqual(map.file_hash, file_hash)
+
+        Map.objects.update(file_hash=None)
+        out = StringIO()
+        call_command("repairmaphashes", stdout=out)
+        self.assertIn(f"{map.name} - MISMATCH - REPAIRED", out.getvalue())
+        map.refresh_from_db()
+        self.assertEqual(map.file_hash, file_hash)
+
     def test_timeout_overtime_matches(self):
         self.test_client.login(User.objects.get(username="arenaclient1"))
 
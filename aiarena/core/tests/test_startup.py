@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+# Modules that should only be loaded by the processes that actually render graphs.
+HEAVY_MODULES = ["matplotlib", "pandas"]
+
+# Reports the import time, peak RSS and the heavy modules loaded after running the given startup code.
+# Run in a fresh interpreter so that nothing imported by the test runner is counted.
+_MEASURE_TEMPLATE = """
+import json, resource, sys, time
+
+start = time.perf_counter()
+{startup_code}
+elapsed = time.perf_counter() - start
+
+print(json.dumps({{
+    "import_time": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "heavy_modules": sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy_modules!r})),
+}}))
+"""
+
+STARTUP_TARGETS = {
+    # get_wsgi_application doesn't load the URLconf, the first request does - so include it here.
+    "aiarena.wsgi": """
+import aiarena.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+""",
+    "manage.py check": """
+sys.argv = ["manage.py", "check"]
+import runpy
+runpy.run_path("manage.py", run_name="__main__")
+""",
+    "celery worker tasks": """
+import django
+django.setup()
+import aiarena.core.tasks
+from django.core.management import load_command_class
+load_command_class("aiarena.core", "timeoutovertimematches")
+""",
+}
+
+
+def measure_startup(startup_code: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _MEASURE_TEMPLATE.format(startup_code=startup_code, heavy_modules=HEAVY_MODULES)],
+        cwd=PROJECT_ROOT,
+        env={"DJANGO_SETTINGS_MODULE": "aiarena.settings", **os.environ},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # manage.py check writes its own output first, so the measurements are always the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class StartupTestCase(SimpleTestCase):
+    def test_heavy_modules_not_imported_on_startup(self):
+        for target, startup_code in STARTUP_TARGETS.items():
+            with self.subTest(target=target):
+                measurements = measure_startup(startup_code)
+                self.assertEqual(
+                    measurements["heavy_modules"],
+                    [],
+                    f"{target} imported {measurements['heavy_modules']} on startup "
+                    f"(import time: {measurements['import_time']:.2f}s, peak RSS: {measurements['max_rss_kb']}KB)",
+                )
+
+
+if __name__ == "__main__":
+    # Usage: DJANGO_ENVIRONMENT=DEVELOPMENT python -m aiarena.core.tests.test_startup
+    for target, startup_code in STARTUP_TARGETS.items():
+        measurements = measure_startup(startup_code)
+        print(
+            f"{target}: import time {measurements['import_time']:.2f}s, peak RSS {measurements['max_rss_kb']}KB, "
+            f"heavy modules {measurements['heavy_modules']}"
+        )
@@ -7,7 +7,7 @@ from django.test import TestCase, TransactionTestCase
 from constance import config
 
 from aiarena import settings
-from aiarena.core.api import Matches
+from aiarena.core.api import Ladders, Matches
 from aiarena.core.models import (
     Bot,
     Competition,
@@ -21,7 +21,7 @@ from aiarena.core.models.bot_race import BotRace
 from aiarena.core.models.game_mode import GameMode
 from aiarena.core.tests.test_mixins import BaseTestMixin, FullDataSetMixin, LoggedInMixin, MatchReadyMixin
 from aiarena.core.tests.testing_utils import TestAssetPaths
-from aiarena.core.utils import calculate_md5
+from aiarena.core.utils import calculate_md5, lttb_downsample
 
 
 # Use this to pre-build a fuller dataset for testing
@@ -32,6 +32,18 @@ class UtilsTestCase(BaseTestMixin, TestCase):
         filename = os.path.join(os.path.dirname(os.path.realpath(__file__)), "test-media/../test-media/test_bot.zip")
         self.assertEqual("c96bcfc79318a8b50b0b2c8696400d06", calculate_md5(filename))
 
+    def test_lttb_downsample(self):
+        points = [(x, (x % 10) * (-1) ** x) for x in range(5000)]
+        sampled = lttb_downsample(points, 100)
+        self.assertEqual(len(sampled), 100)
+        # the end points are always kept and the order is preserved
+        self.assertEqual(sampled[0], points[0])
+        self.assertEqual(sampled[-1], points[-1])
+        self.assertEqual(sampled, sorted(sampled))
+
+        # series under the threshold are left alone
+        self.assertEqual(lttb_downsample(points[:50], 100), points[:50])
+
 
 class BotTestCase(LoggedInMixin, TestCase):
     def test_bot_creation_and_update(self):
@@ -371,3 +383,29 @@ class CompetitionsTestCase(FullDataSetMixin, TransactionTestCase):
         a_terran_bot = Bot.objects.filter(plays_race=terran).first()
         cp = CompetitionParticipation.objects.create(bot=a_terran_bot, competition=competition)
         cp.full_clean()  # causes validation to run
+
+
+class LeaderboardTestCase(FullDataSetMixin, TransactionTestCase):
+    def test_leaderboard_snapshot(self):
+        for competition in Competition.objects.all():
+            # the snapshot is maintained as results are submitted, so it should match the live ranking
+            self.assertEqual(
+                list(Ladders.get_competition_ranked_participants(competition, include_placements=True)),
+                list(Ladders.get_competition_leaderboard(competition, include_placements=True)),
+            )
+            for sp in CompetitionParticipation.objects.filter(competition=competition).select_related("bot"):
+                self.assertEqual(
+                    sp.bot.current_elo_trend(competition, config.ELO_TREND_N_MATCHES) or 0, sp.elo_trend or 0
+                )
+
+        # a participant that hasn't been ranked yet falls in after those that have
+        competition = Competition.objects.filter(status="open").first()
+        leaderboard = list(Ladders.get_competition_leaderboard(competition, include_placements=True))
+        CompetitionParticipation.objects.filter(id=leaderboard[0].id).update(leaderboard_rank=None)
+        self.assertEqual(
+            leaderboard[1:] + leaderboard[:1],
+            list(Ladders.get_competition_leaderboard(competition, include_placements=True)),
+        )
+
+        Ladders.update_leaderboard_ranks(competition)
+        self.assertEqual(leaderboard, list(Ladders.get_competition_leaderboard(competition, include_placements=True)))
@@ -138,3 +138,43 @@ class Elo:
 
     def calculate_elo_expected_win_rate(self, rating1, rating2):
         return 1.0 / (1.0 + 10.0 ** ((rating2 - rating1) / 400.0))
+
+
+def lttb_downsample(points: list[tuple], threshold: int) -> list[tuple]:
+    """
+    Downsamples a series of (x, y) points to `threshold` points using the Largest-Triangle-Three-Buckets algorithm,
+    which keeps the visual shape of the series.
+
+    Source: https://skemman.is/bitstream/1946/15343/3/SS_MSthesis.pdf
+    """
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    # the first and last points are always kept, the rest are split evenly into buckets
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    selected = 0
+    for bucket in range(threshold - 2):
+        bucket_start = int(bucket * bucket_size) + 1
+        bucket_end = int((bucket + 1) * bucket_size) + 1
+
+        # the average of the next bucket is used as the third point of the triangle
+        next_bucket = points[bucket_end : min(int((bucket + 2) * bucket_size) + 1, len(points))]
+        avg_x = sum(point[0] for point in next_bucket) / len(next_bucket)
+        avg_y = sum(point[1] for point in next_bucket) / len(next_bucket)
+
+        selected_x, selected_y = points[selected][0], points[selected][1]
+        max_area = -1
+        for index in range(bucket_start, bucket_end):
+            area = abs(
+                (selected_x - avg_x) * (points[index][1] - selected_y)
+                - (selected_x - points[index][0]) * (avg_y - selected_y)
+            )
+            if area > max_area:
+                max_area = area
+                next_selected = index
+        sampled.append(points[next_selected])
+        selected = next_selected
+
+    sampled.append(points[-1])
+    return sampled
@@ -8,11 +8,16 @@ from wiki.models import ArticleRevision
 from aiarena.core.models import (
     ArenaClient,
     ArenaClientStatus,
+    ArenaClientStatusTime,
+    ArenaClientThroughput,
+    AuthorRecentResult,
     Bot,
     BotCrashLimitAlert,
     Competition,
+    CompetitionBotDurationStats,
     CompetitionBotMapStats,
     CompetitionBotMatchupStats,
+    CompetitionBotRollupStats,
     CompetitionParticipation,
     Map,
     MapPool,
@@ -64,6 +69,7 @@ class ArenaClientAdmin(admin.ModelAdmin):
         "type",
         "owner",
         "trusted",
+        "submitted_result_count",
     )
     list_filter = (
         "date_joined",
@@ -99,25 +105,40 @@ class ArenaClientAdmin(admin.ModelAdmin):
 
 @admin.register(ArenaClientStatus)
 class ArenaClientStatusAdmin(admin.ModelAdmin):
-    search_fields = (
-        "arenaclient",
-        "status",
-        "logged_at",
-    )
-    ordering = (
+    search_fields = ("arenaclient__username",)
+    ordering = ("arenaclient",)
+    list_display = (
         "arenaclient",
         "status",
         "logged_at",
     )
+    list_filter = ("status",)
+    list_select_related = ["arenaclient"]
+
+
+@admin.register(ArenaClientStatusTime)
+class ArenaClientStatusTimeAdmin(admin.ModelAdmin):
+    ordering = ("-hour",)
     list_display = (
         "arenaclient",
+        "hour",
         "status",
-        "logged_at",
+        "seconds",
     )
-    list_filter = (
+    list_filter = ("arenaclient", "status")
+    list_select_related = ["arenaclient"]
+
+
+@admin.register(ArenaClientThroughput)
+class ArenaClientThroughputAdmin(admin.ModelAdmin):
+    ordering = ("-minute",)
+    list_display = (
         "arenaclient",
-        "status",
+        "minute",
+        "result_count",
     )
+    list_filter = ("arenaclient",)
+    list_select_related = ["arenaclient"]
 
 
 @admin.register(Bot)
@@ -256,6 +277,58 @@ class CompetitionAdmin(admin.ModelAdmin):
         return super().response_change(request, obj)
 
 
+@admin.register(CompetitionBotDurationStats)
+class CompetitionBotDurationStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "bot",
+        "duration_minutes",
+        "win_count",
+        "loss_count",
+        "crash_count",
+        "tie_count",
+    )
+    # select related bot.competition and bot.bot because they are used to make up the display string
+    list_select_related = ["bot", "bot__competition", "bot__bot"]
+
+
+@admin.register(CompetitionBotRollupStats)
+class CompetitionBotRollupStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "bot",
+        "opponent",
+        "map",
+        "duration_minutes",
+        "match_count",
+        "win_count",
+        "loss_count",
+        "tie_count",
+        "crash_count",
+    )
+    # select related bot.competition and bot.bot because they are used to make up the display string
+    list_select_related = [
+        "bot",
+        "bot__competition",
+        "bot__bot",
+        "opponent",
+        "opponent__competition",
+        "opponent__bot",
+        "map",
+    ]
+
+
+@admin.register(AuthorRecentResult)
+class AuthorRecentResultAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "user",
+        "result",
+        "created",
+    )
+    list_select_related = ["user", "result", "result__match"]
+
+
 @admin.register(CompetitionBotMapStats)
 class CompetitionBotMapStatsAdmin(admin.ModelAdmin):
     list_display = (
@@ -1,23 +1,22 @@
 import hashlib
 import os
-from datetime import timedelta
 
 from django.conf import settings
 from django.core.cache import cache
-from django.utils import timezone
 
 from constance import config
 
-from aiarena.core.models import Result, User
+from aiarena.core.api import SiteStats
 
 
 def stats(request):
+    match_count_1h, match_count_24h = SiteStats.get_result_counts()
     return {
-        "match_count_1h": Result.objects.only("id").filter(created__gte=timezone.now() - timedelta(hours=1)).count,
-        "match_count_24h": Result.objects.only("id").filter(created__gte=timezone.now() - timedelta(hours=24)).count,
-        "arenaclients": User.objects.only("id").filter(type="ARENA_CLIENT", is_active=True).count,
+        "match_count_1h": match_count_1h,
+        "match_count_24h": match_count_24h,
+        "arenaclients": SiteStats.get_arenaclient_count(),
         "aiarena_settings": settings,
-        "random_supporter": User.random_supporter(),
+        "random_supporter": SiteStats.random_supporter(),
         "config": config,
         "style_md5": style_md5(),
     }
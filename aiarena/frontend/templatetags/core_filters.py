@@ -1,5 +1,9 @@
 from django import template
 
+from constance import config
+
+from aiarena.core.models import CompetitionParticipation
+
 
 def pretty_bool(value):
     """
@@ -117,7 +121,19 @@ def shorten_naturaltime(naturaltime):
     )
 
 
+def truncate_name(name, limit=20):
+    # Matches the truncation of Bot.as_truncated_html_link, for names which aren't rendered from a model instance
+    return (name[: limit - 3] + "...") if len(name) > limit else name
+
+
 def bot_competition_trend(bot, competition, n_matches):
+    if n_matches == config.ELO_TREND_N_MATCHES:
+        # use the snapshot maintained on the bot's participation
+        return (
+            CompetitionParticipation.objects.filter(bot=bot, competition=competition)
+            .values_list("elo_trend", flat=True)
+            .first()
+        )
     return bot.current_elo_trend(competition, n_matches)
 
 
@@ -128,4 +144,5 @@ register.filter("smooth_timedelta", smooth_timedelta)
 register.filter("cents_to_usd", cents_to_usd)
 register.filter("step_time_color", step_time_color)
 register.filter("shorten_naturaltime", shorten_naturaltime)
+register.filter("truncate_name", truncate_name)
 register.simple_tag(bot_competition_trend, name="bot_competition_trend")
@@ -1,7 +1,47 @@
-from django.test import TestCase, TransactionTestCase
-
-from aiarena.core.models import Bot, Competition, Map, MapPool, Match, Result, Round, User
-from aiarena.core.tests.test_mixins import FullDataSetMixin
+from datetime import timedelta
+from unittest.mock import patch
+from urllib.parse import quote
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, F, Q
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from private_storage.servers import NginxXAccelRedirectServer
+from private_storage.views import PrivateStorageDetailView
+
+from aiarena.core.api import Matches, PageCache, RecentResultsFeed, SiteStats
+from aiarena.core.models import (
+    ArenaClient,
+    ArenaClientThroughput,
+    AuthorRecentResult,
+    Bot,
+    Competition,
+    CompetitionParticipation,
+    Map,
+    MapPool,
+    Match,
+    News,
+    RelativeResult,
+    Result,
+    Round,
+    User,
+)
+from aiarena.core.tests.test_mixins import FullDataSetMixin, MatchReadyMixin
+from aiarena.frontend.context_processors import stats
+from aiarena.frontend.views import BotDetail, MatchQueue
+
+
+# The default cache is a dummy cache, so tests of cached content use a local memory cache instead
+LOCMEM_CACHES = override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "select2": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        "constance": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    }
+)
 
 
 class AdminMethodsTestCase(FullDataSetMixin, TestCase):
@@ -103,6 +143,10 @@ class PageRenderTestCase(FullDataSetMixin, TransactionTestCase):
         response = self.client.get(f"/authors/{self.regularUser1.id}/")
         self.assertEqual(response.status_code, 200)
 
+        # bot competition stats
+        response = self.client.get(f"/competitions/stats/{CompetitionParticipation.objects.all()[0].id}/")
+        self.assertEqual(response.status_code, 200)
+
         # match
         response = self.client.get(f"/matches/{Match.objects.all()[0].id}/")
         self.assertEqual(response.status_code, 200)
@@ -176,3 +220,399 @@ class RequestMatchTestCase(FullDataSetMixin, TestCase):
         self.test_client.request_match(
             "specific_matchup", bot1, bot2, "any", "map_pool", None, MapPool.objects.first(), 3
         )
+
+
+@LOCMEM_CACHES
+class BotCompetitionStatsChartsTestCase(MatchReadyMixin, TransactionTestCase):
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def test_chart_data_cached_until_result_submitted(self):
+        self._generate_match_activity()
+        participations = CompetitionParticipation.objects.filter(competition__status="open")
+        for sp in participations:
+            response = self.client.get(f"/competitions/stats/{sp.id}/")
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNotNone(cache.get(f"competition_participation_{sp.id}_charts"))
+
+        # a new result should only invalidate the cached charts of the bots that played in it
+        response = self._post_to_matches()
+        self.assertEqual(response.status_code, 201)
+        match = Match.objects.get(id=response.data["id"])
+        response = self._post_to_results(match.id, "Player1Win")
+        self.assertEqual(response.status_code, 201)
+        match_bot_ids = match.matchparticipation_set.values_list("bot_id", flat=True)
+        for sp in participations:
+            if sp.competition_id == match.round.competition_id and sp.bot_id in match_bot_ids:
+                self.assertIsNone(cache.get(f"competition_participation_{sp.id}_charts"))
+            else:
+                self.assertIsNotNone(cache.get(f"competition_participation_{sp.id}_charts"))
+
+
+@LOCMEM_CACHES
+class SiteStatsTestCase(MatchReadyMixin, TransactionTestCase):
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def test_stats_context_processor_cached(self):
+        self._generate_match_activity()
+        supporter = User.objects.get(username="staff_user")
+        supporter.patreon_level = "gold"
+        supporter.save()
+
+        context = stats(RequestFactory().get("/"))
+        self.assertEqual(context["match_count_1h"], Result.objects.count())
+        self.assertEqual(context["match_count_24h"], Result.objects.count())
+        self.assertEqual(context["arenaclients"], User.objects.filter(type="ARENA_CLIENT", is_active=True).count())
+        self.assertEqual(context["random_supporter"], supporter)
+
+        # once cached, rendering the stats shouldn't touch the database
+        with self.assertNumQueries(0):
+            stats(RequestFactory().get("/"))
+
+        # new results should be counted without re-seeding the counters
+        response = self._post_to_matches()
+        self.assertEqual(response.status_code, 201)
+        response = self._post_to_results(response.data["id"], "Player1Win")
+        self.assertEqual(response.status_code, 201)
+        cache.delete(SiteStats._COUNTS_KEY)
+        with self.assertNumQueries(0):
+            match_count_1h, match_count_24h = SiteStats.get_result_counts()
+        self.assertEqual(match_count_1h, Result.objects.count())
+        self.assertEqual(match_count_24h, Result.objects.count())
+
+        # saving a user should refresh the supporter pool
+        supporter.patreon_level = "none"
+        supporter.save()
+        self.assertIsNone(SiteStats.random_supporter())
+
+
+@LOCMEM_CACHES
+class PageCacheTestCase(MatchReadyMixin, TransactionTestCase):
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def _assert_cached(self, client, url, cached):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        if cached:
+            self.assertEqual(len(queries), 0, f"{url} was not served from the cache")
+        else:
+            self.assertGreater(len(queries), 0, f"{url} was served from the cache")
+
+    def test_anonymous_pages_cached_until_invalidated(self):
+        self._generate_match_activity()
+        competition_id = Round.objects.first().competition_id
+        competition_url = f"/competitions/{competition_id}/"
+        urls = ["/", competition_url, "/results/", "/match-queue/", "/bots/"]
+
+        anonymous_client = Client()
+        for url in urls:
+            self._assert_cached(anonymous_client, url, cached=False)
+            self._assert_cached(anonymous_client, url, cached=True)
+        # the query string is part of the cache key
+        self._assert_cached(anonymous_client, "/bots/?page=1", cached=False)
+
+        # logged in users are never served cached pages
+        self._assert_cached(self.client, "/", cached=False)
+        self._assert_cached(self.client, "/", cached=False)
+
+        other_competition_url = f"/competitions/{Competition.objects.exclude(id=competition_id).first().id}/"
+        self._assert_cached(anonymous_client, other_competition_url, cached=False)
+
+        # a new result should invalidate the pages displaying it
+        response = self._post_to_matches()
+        self.assertEqual(response.status_code, 201)
+        match = Match.objects.get(id=response.data["id"])
+        response = self._post_to_results(match.id, "Player1Win")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(match.round.competition_id, competition_id)
+        for url in urls[:-1]:
+            self._assert_cached(anonymous_client, url, cached=False)
+            self._assert_cached(anonymous_client, url, cached=True)
+        # saving the bots' new data with the result shouldn't invalidate the pages of other competitions
+        self._assert_cached(anonymous_client, "/bots/", cached=True)
+        self._assert_cached(anonymous_client, other_competition_url, cached=True)
+
+        # news should only invalidate the index
+        News.objects.create(title="Test", text="Test news")
+        self._assert_cached(anonymous_client, "/", cached=False)
+        for url in urls[1:]:
+            self._assert_cached(anonymous_client, url, cached=True)
+
+        # updating a bot's undisplayed fields shouldn't invalidate the bot list, but renaming it should
+        bot = Bot.objects.first()
+        bot.bot_zip_publicly_downloadable = not bot.bot_zip_publicly_downloadable
+        bot.save()
+        self._assert_cached(anonymous_client, "/bots/", cached=True)
+        bot.name = "renamed_bot"
+        bot.save()
+        self._assert_cached(anonymous_client, "/bots/", cached=False)
+        self._assert_cached(anonymous_client, other_competition_url, cached=False)
+
+        metrics = PageCache.get_metrics()
+        self.assertEqual(metrics["bot_list"], (4, 3))
+        self.assertEqual(metrics["index"], (2, 3))
+
+
+class BotResultPaginationTestCase(FullDataSetMixin, TransactionTestCase):
+    def _get_page(self, bot, query=""):
+        response = self.client.get(f"/bots/{bot.id}/{query}")
+        self.assertEqual(response.status_code, 200)
+        table = response.context["results_table"]
+        return [record.match_id for record in table.page.object_list.data], table
+
+    def test_keyset_pagination(self):
+        # the bot with the most results
+        bot = Bot.objects.annotate(result_count=Count("matchparticipation__match__result")).order_by("-result_count")[0]
+        match_ids = list(
+            Match.objects.filter(matchparticipation__bot=bot, result__isnull=False)
+            .order_by("-id")
+            .values_list("id", flat=True)
+        )
+        # include results with tied and missing start times
+        tied = timezone.now()
+        Match.objects.filter(id__in=match_ids[:2]).update(started=tied)
+        Match.objects.filter(id__in=match_ids[-1:]).update(started=None)
+        expected = list(
+            RelativeResult.objects.filter(me__bot=bot)
+            .order_by(F("started").desc(nulls_last=True), F("match_id").desc())
+            .values_list("match_id", flat=True)
+        )
+        self.assertGreater(len(expected), 3)
+
+        with patch.object(BotDetail, "results_per_page", 1):
+            # page forwards through the older results
+            seen = []
+            page, table = self._get_page(bot)
+            self.assertEqual(table.paginator.count, len(expected))
+            self.assertFalse(table.page.has_previous)
+            pages = [page]
+            seen += page
+            while table.page.has_next:
+                page, table = self._get_page(bot, f"?older_than={table.page.older_than}")
+                self.assertTrue(table.page.has_previous)
+                pages.append(page)
+                seen += page
+            self.assertEqual(seen, expected)
+
+            # and back through the newer results
+            for expected_page in reversed(pages[:-1]):
+                page, table = self._get_page(bot, f"?newer_than={table.page.newer_than}")
+                self.assertEqual(page, expected_page)
+            self.assertFalse(table.page.has_previous)
+
+            # filters still apply
+            page, table = self._get_page(bot, "?result=win")
+            self.assertEqual(table.paginator.count, RelativeResult.objects.filter(me__bot=bot, result="win").count())
+
+            # other orderings fall back to offset pagination
+            page, table = self._get_page(bot, "?sort=elo_change&page=2")
+            self.assertEqual(table.page.number, 2)
+
+
+@LOCMEM_CACHES
+class MatchQueueTestCase(FullDataSetMixin, TransactionTestCase):
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def test_match_queue(self):
+        unfinished_matches = Match.objects.filter(result__isnull=True)
+        incomplete_round_ids = set(Round.objects.filter(complete=False).values_list("id", flat=True))
+        self.assertTrue(unfinished_matches.filter(round__isnull=False).exists())
+
+        # the queue is built with a single query
+        with self.assertNumQueries(1):
+            requested_matches, rounds = Matches.get_queue()
+        with self.assertNumQueries(0):
+            queued_ids = [match.id for match in requested_matches]
+            for round in rounds:
+                self.assertIn(round.id, incomplete_round_ids)
+                for match in round.matches:
+                    self.assertEqual(match.round_id, round.id)
+                    self.assertEqual([p.participant_number for p in match.participants], [1, 2])
+                    str(match.participants[0].bot.as_truncated_html_link)
+                    queued_ids.append(match.id)
+        self.assertCountEqual(
+            queued_ids,
+            unfinished_matches.filter(Q(round__isnull=True) | Q(round__complete=False)).values_list("id", flat=True),
+        )
+
+        # and cached until a match starts
+        with self.assertNumQueries(0):
+            Matches.get_queue()
+        response = self._post_to_matches()
+        self.assertEqual(response.status_code, 201)
+        requested_matches, rounds = Matches.get_queue()
+        queued_matches = requested_matches + [match for round in rounds for match in round.matches]
+        started = [match for match in queued_matches if match.id == response.data["id"]]
+        self.assertIsNotNone(started[0].started)
+
+        # rounds are paginated
+        with patch.object(MatchQueue, "matches_per_round", 1):
+            response = self.client.get("/match-queue/")
+            self.assertEqual(response.status_code, 200)
+            for round in response.context["round_list"]:
+                self.assertEqual(len(round.matches), 1)
+
+
+class RoundDetailTestCase(FullDataSetMixin, TransactionTestCase):
+    def test_round_detail(self):
+        # the first page render initialises the site config
+        self.client.get("/")
+        query_counts = set()
+        for round in Round.objects.annotate(match_count=Count("match")).filter(match_count__gt=0):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f"/rounds/{round.id}/")
+            self.assertEqual(response.status_code, 200)
+            query_counts.add(len(queries))
+
+            statuses = [match.status for match in round.match_set.all()]
+            self.assertEqual(response.context["matches_finished"], statuses.count("Finished"))
+            self.assertEqual(response.context["matches_started"], statuses.count("Started"))
+            self.assertEqual(response.context["matches_queued"], statuses.count("Queued"))
+        # the number of queries shouldn't depend upon the number of matches in the round
+        self.assertEqual(len(query_counts), 1)
+
+
+class AuthorRecentResultTestCase(FullDataSetMixin, TransactionTestCase):
+    def _latest_result_ids(self, user, count):
+        return list(
+            Result.objects.filter(match__matchparticipation__bot__user=user)
+            .distinct()
+            .order_by("-created", "-id")
+            .values_list("id", flat=True)[:count]
+        )
+
+    def test_author_detail_results(self):
+        for user in User.objects.filter(bots__isnull=False).distinct():
+            response = self.client.get(f"/authors/{user.id}/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                [result.id for result in response.context["result_list"]],
+                self._latest_result_ids(user, AuthorRecentResult.FEED_LENGTH),
+            )
+
+    def test_feed_is_capped(self):
+        result = Result.objects.order_by("-created", "-id").first()
+        with patch.object(AuthorRecentResult, "FEED_LENGTH", 2):
+            AuthorRecentResult.add_result(result)
+
+        for user in User.objects.filter(bots__matchparticipation__match__result=result).distinct():
+            self.assertEqual(
+                list(user.recent_results.order_by("-created", "-id").values_list("result_id", flat=True)),
+                self._latest_result_ids(user, 2),
+            )
+
+
+class ArenaClientThroughputTestCase(MatchReadyMixin, TransactionTestCase):
+    def test_arena_client_throughput(self):
+        self._generate_match_activity()
+        arenaclient = ArenaClient.objects.get(username="arenaclient1")
+        result_count = Result.objects.filter(submitted_by=arenaclient).count()
+        self.assertGreater(result_count, 0)
+        self.assertEqual(arenaclient.submitted_result_count, result_count)
+        self.assertEqual(ArenaClientThroughput.get_result_counts(), {arenaclient.id: (result_count, result_count)})
+
+        # results submitted by other users, such as when a match is cancelled, aren't counted
+        response = self._post_to_matches()
+        self.assertEqual(response.status_code, 201)
+        Match.objects.get(id=response.data["id"]).cancel(self.staffUser1)
+        arenaclient.refresh_from_db()
+        self.assertEqual(arenaclient.submitted_result_count, result_count)
+
+        # counts which have left the window are deleted as new ones are created
+        ArenaClientThroughput.objects.create(
+            arenaclient=arenaclient, minute=timezone.now() - timedelta(hours=25), result_count=10
+        )
+        ArenaClientThroughput.objects.update(minute=F("minute") - timedelta(minutes=1))
+        response = self._post_to_matches()
+        self.assertEqual(response.status_code, 201)
+        response = self._post_to_results(response.data["id"], "Player1Win")
+        self.assertEqual(response.status_code, 201)
+        result_count += 1
+        self.assertFalse(
+            ArenaClientThroughput.objects.filter(minute__lt=timezone.now() - ArenaClientThroughput.WINDOW).exists()
+        )
+
+        response = self.client.get("/arenaclients/")
+        self.assertEqual(response.status_code, 200)
+        arenaclient_row = response.context["arenaclient_list"][0]
+        self.assertEqual((arenaclient_row.matches_1hr, arenaclient_row.matches_24hr), (result_count, result_count))
+
+        response = self.client.get(f"/arenaclients/{arenaclient.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["ac_match_count_1h"], result_count)
+        self.assertEqual(response.context["ac_match_count_24h"], result_count)
+        self.assertEqual(response.context["ac_match_count"], result_count)
+
+        self.client.login(username="regular_user1", password="x")
+        response = self.client.get("/api/arena-clients/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["submitted_result_count"], result_count)
+        self.assertEqual(response.data["results"][0]["result_count_1h"], result_count)
+        self.assertEqual(response.data["results"][0]["result_count_24h"], result_count)
+
+
+@LOCMEM_CACHES
+class RecentResultsFeedTestCase(MatchReadyMixin, TransactionTestCase):
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    def _latest_result_ids(self, count):
+        return list(Result.objects.order_by("-created", "-id").values_list("id", flat=True)[:count])
+
+    def test_recent_results_feed(self):
+        self._generate_match_activity()
+        with patch.object(RecentResultsFeed, "SIZE", 5):
+            response = self.client.get("/results/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([result["id"] for result in response.context["result_list"]], self._latest_result_ids(5))
+
+            # new results should be appended to the buffer, rather than it being rebuilt
+            response = self._post_to_matches()
+            self.assertEqual(response.status_code, 201)
+            response = self._post_to_results(response.data["id"], "Player1Win")
+            self.assertEqual(response.status_code, 201)
+            with self.assertNumQueries(0):
+                summaries = RecentResultsFeed.get()
+            self.assertEqual([summary["id"] for summary in summaries], self._latest_result_ids(5))
+
+            result = Result.objects.get(id=summaries[0]["id"])
+            self.assertEqual(summaries[0]["match"], result.match_id)
+            self.assertEqual(summaries[0]["winner"], result.winner_id)
+            self.assertEqual(
+                [(p["participant_number"], p["bot"]) for p in summaries[0]["participants"]],
+                [(1, result.match.participant1.bot_id), (2, result.match.participant2.bot_id)],
+            )
+            self.assertEqual(summaries[0]["replay_file_url"], result.replay_file.url)
+
+        self.client.login(username="regular_user1", password="x")
+        response = self.client.get("/api/recent-results/?limit=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([summary["id"] for summary in response.data], self._latest_result_ids(2))
+
+
+class PrivateFileServingTestCase(MatchReadyMixin, TransactionTestCase):
+    @patch.object(PrivateStorageDetailView, "server_class", NginxXAccelRedirectServer)
+    def test_downloads_are_handed_to_nginx(self):
+        bot = self.regularUser1Bot1
+        self.client.login(username="regular_user1", password="x")
+        for url, file in ((f"/bots/{bot.id}/bot_zip", bot.bot_zip), (f"/bots/{bot.id}/bot_data", bot.bot_data)):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            # Django only checks access to the file - nginx sends it
+            self.assertEqual(response["X-Accel-Redirect"], quote(f"/private-x-accel-redirect/{file.name}"))
+            self.assertEqual(response.content, b"")
+
+        # access is still checked before handing over the file
+        self.client.logout()
+        response = self.client.get(f"/bots/{bot.id}/bot_zip")
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn("X-Accel-Redirect", response)
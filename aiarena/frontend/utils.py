@@ -1,3 +1,6 @@
+from aiarena.core.api import PageCache
+
+
 def restrict_page_range(num_pages, page_number):
     if num_pages <= 11 or page_number <= 6:  # case 1 and 2
         return [x for x in range(1, min(num_pages + 1, 12))]
@@ -5,3 +8,33 @@ def restrict_page_range(num_pages, page_number):
         return [x for x in range(num_pages - 10, num_pages + 1)]
     else:  # case 3
         return [x for x in range(page_number - 5, page_number + 6)]
+
+
+class AnonymousPageCacheMixin:
+    """
+    Serves the view's pages to anonymous visitors from the PageCache.
+
+    page_cache_name identifies the view in the cache keys and hit/miss metrics. The pages are invalidated along with
+    any of the groups returned by get_page_cache_groups.
+    """
+
+    page_cache_name: str = None
+
+    def get_page_cache_groups(self) -> list[str]:
+        return [self.page_cache_name]
+
+    def dispatch(self, request, *args, **kwargs):
+        if not PageCache.is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = PageCache.get_key(self.page_cache_name, self.get_page_cache_groups(), request)
+        response = PageCache.get(self.page_cache_name, key)
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, "render") and not response.is_rendered:
+            response.add_post_render_callback(lambda rendered: PageCache.set(key, request, rendered))
+        else:
+            PageCache.set(key, request, response)
+        return response
@@ -1,5 +1,4 @@
-import json
-from datetime import timedelta
+import hashlib
 
 from django import forms
 from django.contrib import messages
@@ -14,7 +13,7 @@ from django.db.models.fields import IntegerField
 from django.http import Http404, HttpResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
-from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.safestring import mark_safe
 from django.views import View
 from django.views.generic import CreateView, DeleteView, DetailView, FormView, ListView, UpdateView
@@ -27,17 +26,20 @@ from discord_bind.models import DiscordUser
 from django_filters.widgets import RangeWidget
 from django_select2.forms import Select2Widget
 from django_tables2 import RequestConfig
+from django_tables2.rows import BoundRows
 from private_storage.views import PrivateStorageDetailView
 from rest_framework.authtoken.models import Token
 from wiki.editors import getEditor
 
-from aiarena.core.api import Matches
-from aiarena.core.api.internal.statistics.elo_graphs_generator import EloGraphsGenerator
+from aiarena.core.api import Matches, RecentResultsFeed
+from aiarena.core.api.internal.statistics.competition_participation_charts import CompetitionParticipationCharts
 from aiarena.core.api.ladders import Ladders
 from aiarena.core.api.maps import Maps
 from aiarena.core.d_utils import filter_tags
 from aiarena.core.models import (
     ArenaClient,
+    ArenaClientThroughput,
+    AuthorRecentResult,
     Bot,
     Competition,
     CompetitionParticipation,
@@ -59,7 +61,7 @@ from aiarena.core.s3_helpers import get_file_url_s3_hack
 from aiarena.core.tasks import celery_exception_test
 from aiarena.core.utils import parse_tags
 from aiarena.frontend.templatetags.core_filters import format_elo_change, result_color_class, step_time_color
-from aiarena.frontend.utils import restrict_page_range
+from aiarena.frontend.utils import AnonymousPageCacheMixin, restrict_page_range
 from aiarena.patreon.models import PatreonAccountBind
 
 
@@ -265,7 +267,8 @@ class BotUpload(SuccessMessageMixin, LoginRequiredMixin, CreateView):
             return self.render_to_response(self.get_context_data(form=form))
 
 
-class BotList(ListView):
+class BotList(AnonymousPageCacheMixin, ListView):
+    page_cache_name = "bot_list"
     queryset = (
         Bot.objects.all()
         .only("name", "plays_race", "type", "user__username", "user__type")
@@ -352,6 +355,7 @@ class BotResultTable(tables.Table):
             "thead": {"style": "height: 35px;"},
         }
         model = RelativeResult
+        template_name = "bot_result_table.html"
         fields = (
             "match",
             "started",
@@ -410,6 +414,93 @@ class BotResultTable(tables.Table):
             return "—"
 
 
+class BotResultKeysetPage:
+    def __init__(self, object_list, has_previous: bool, has_next: bool):
+        self.object_list = object_list
+        self.has_previous = has_previous
+        self.has_next = has_next
+        # The cursors for the neighbouring pages
+        self.newer_than = object_list.data[0].match_id if object_list.data else None
+        self.older_than = object_list.data[-1].match_id if object_list.data else None
+
+
+class BotResultKeysetPaginator:
+    """
+    Pages through a bot's results by seeking past the (started, match) of the previous page's last row,
+    rather than by offset, so that deep pages are as cheap as the first. The total number of results is counted
+    once and cached, instead of on every page.
+
+    Pages are identified by a cursor: the match which the page is older or newer than.
+    """
+
+    CURSOR_FIELDS = ("older_than", "newer_than")
+    COUNT_CACHE_TIME = 600
+    is_keyset = True
+
+    def __init__(self, rows, per_page: int, count_cache_key: str):
+        self.rows = rows
+        self.per_page = per_page
+        self.count_cache_key = count_cache_key
+
+    @staticmethod
+    def get_cursor(request) -> tuple[str, int] | None:
+        for field in BotResultKeysetPaginator.CURSOR_FIELDS:
+            value = request.GET.get(field, "")
+            if value.isdigit():
+                return field, int(value)
+        return None
+
+    @cached_property
+    def count(self) -> int:
+        count = cache.get(self.count_cache_key)
+        if count is None:
+            count = self.rows.data.data.count()
+            cache.set(self.count_cache_key, count, self.COUNT_CACHE_TIME)
+        return count
+
+    def page(self, cursor: tuple[str, int] | None) -> BotResultKeysetPage:
+        results = self.rows.data.data
+        ordering = [F("started").desc(nulls_last=True), F("match_id").desc()]
+        newer = False
+        if cursor is not None:
+            field, match_id = cursor
+            cursor_started = list(Match.objects.filter(id=match_id).values_list("started", flat=True))
+            if cursor_started:
+                started = cursor_started[0]
+                newer = field == "newer_than"
+                if newer:
+                    results = results.filter(self._newer_than(started, match_id))
+                    ordering = [F("started").asc(nulls_first=True), F("match_id").asc()]
+                else:
+                    results = results.filter(self._older_than(started, match_id))
+            else:  # an unknown match is treated as the first page
+                cursor = None
+
+        # Fetch an extra row to find out whether there's another page beyond this one
+        records = list(results.order_by(*ordering)[: self.per_page + 1])
+        has_more = len(records) > self.per_page
+        records = records[: self.per_page]
+        if newer:
+            records.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = cursor is not None, has_more
+        return BotResultKeysetPage(BoundRows(records, self.rows.table), has_previous, has_next)
+
+    @staticmethod
+    def _older_than(started, match_id: int) -> Q:
+        # Results without a start time are ordered last
+        if started is None:
+            return Q(started__isnull=True, match_id__lt=match_id)
+        return Q(started__lt=started) | Q(started=started, match_id__lt=match_id) | Q(started__isnull=True)
+
+    @staticmethod
+    def _newer_than(started, match_id: int) -> Q:
+        if started is None:
+            return Q(started__isnull=False) | Q(started__isnull=True, match_id__gt=match_id)
+        return Q(started__gt=started) | Q(started=started, match_id__gt=match_id)
+
+
 class RelativeResultFilter(filters.FilterSet):
     MATCH_TYPES = (
         ("competition", "Competition"),
@@ -498,6 +589,7 @@ class RelativeResultFilter(filters.FilterSet):
 class BotDetail(DetailView):
     model = Bot
     template_name = "bot.html"
+    results_per_page = 30
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -536,7 +628,23 @@ class BotDetail(DetailView):
         if not (self.request.user == self.object.user or self.request.user.is_staff):
             result_table.exclude.append("match_log")
         # Update table based on request information
-        RequestConfig(self.request, paginate={"per_page": 30}).configure(result_table)
+        if self.request.GET.get(result_table.prefixed_order_by_field):
+            # Keyset pagination relies upon the default ordering, so other orderings are paged by offset.
+            RequestConfig(self.request, paginate={"per_page": self.results_per_page}).configure(result_table)
+        else:
+            RequestConfig(self.request, paginate=False).configure(result_table)
+            filter_params = params.copy()
+            for field in BotResultKeysetPaginator.CURSOR_FIELDS + (result_table.prefixed_page_field,):
+                filter_params.pop(field, None)
+            count_cache_key = hashlib.md5(
+                f"{self.request.user.id}|{tags_by_all}|{tags_partial_match}|{filter_params.urlencode()}".encode()
+            ).hexdigest()
+            result_table.paginate(
+                paginator_class=BotResultKeysetPaginator,
+                per_page=self.results_per_page,
+                page=BotResultKeysetPaginator.get_cursor(self.request),
+                count_cache_key=f"bot_{self.object.id}_result_count_{count_cache_key}",
+            )
         context["results_table"] = result_table
         context["filter"] = result_filter
 
@@ -585,99 +693,17 @@ class BotCompetitionStatsDetail(DetailView):
         context["competition_closed"] = competition.statistics_finalized
 
         if not context["competition_closed"]:
-            context["elo_chart_data"] = self.__get_elo_chart_data(context["competitionparticipation"], competition.id)
-            context["winrate_chart_data"] = self.__get_winrate_chart_data(
-                context["competitionparticipation"], competition.id
-            )
+            sp = context["competitionparticipation"]
+            charts = CompetitionParticipationCharts.get(sp)
+            context["elo_chart_data"] = charts["elo_chart_data"]
+            context["winrate_chart_data"] = charts["winrate_chart_data"]
+            if sp.bot.user == self.request.user and self.request.user.patreon_level != "none":
+                context["elo_chart_last_updated"] = (
+                    CompetitionParticipationCharts.get_update_line_datetime(sp, charts).timestamp() * 1000
+                )
 
         return context
 
-    def __get_elo_chart_data(self, sp, competition_id):
-        elo_data = EloGraphsGenerator(sp)._get_elo_data(self.object.bot, competition_id)
-        last_updated = (
-            EloGraphsGenerator(sp)._get_graph_update_line_datetime(self.object.bot, competition_id).timestamp() * 1000
-            if sp.bot.user == self.request.user and self.request.user.patreon_level != "none"
-            else None
-        )
-
-        return json.dumps(
-            {
-                "title": "ELO over time",
-                "lastUpdated": last_updated,
-                "data": {
-                    "datasets": [
-                        {
-                            "label": "ELO",
-                            "backgroundColor": "#86c232",
-                            "borderColor": "#86c232",
-                            "data": [{"x": elo[2].timestamp() * 1000, "y": elo[1]} for elo in elo_data],
-                        }
-                    ],
-                },
-            },
-            default=str,
-        )
-
-    def __get_winrate_chart_data(self, sp, competition_id):
-        winrate_data = EloGraphsGenerator(sp)._get_winrate_data(self.object.bot.id, competition_id)
-        winrate_data_with_total = [(x[0], x[1], x[2], x[3], x[4], (x[1] + x[2] + x[3] + x[4])) for x in winrate_data]
-        labels = [f"{winrate[0]}-{winrate[0]+5}" for winrate in winrate_data_with_total]
-        if len(labels) > 0:
-            if labels[-1] == "30-35":
-                labels[-1] = "30+"
-        datasets = []
-        # Wins
-        datasets.append(
-            {
-                "label": "Wins",
-                "data": [x[1] for x in winrate_data_with_total],
-                "backgroundColor": "#86C232",
-                "extraLabels": [str(round((x[1] / x[5] if x[5] else 0) * 100)) + "%" for x in winrate_data_with_total],
-                "datalabels": {"align": "center", "anchor": "center"},
-            }
-        )
-
-        # Losses
-        datasets.append(
-            {
-                "label": "Losses",
-                "data": [x[2] for x in winrate_data_with_total],
-                "backgroundColor": "#D20044",
-                "extraLabels": [str(round((x[2] / x[5] if x[5] else 0) * 100)) + "%" for x in winrate_data_with_total],
-                "datalabels": {"align": "center", "anchor": "center"},
-            }
-        )
-
-        # Crashes
-        datasets.append(
-            {
-                "label": "Crashes",
-                "data": [x[3] for x in winrate_data_with_total],
-                "backgroundColor": "#AAAAAA",
-                "extraLabels": [str(round((x[3] / x[5] if x[5] else 0) * 100)) + "%" for x in winrate_data_with_total],
-                "datalabels": {"align": "center", "anchor": "center"},
-            }
-        )
-
-        # Ties
-        datasets.append(
-            {
-                "label": "Ties",
-                "data": [x[4] for x in winrate_data_with_total],
-                "backgroundColor": "#DFCE00",
-                "extraLabels": [str(round((x[4] / x[5] if x[5] else 0) * 100)) + "%" for x in winrate_data_with_total],
-                "datalabels": {"align": "center", "anchor": "center"},
-            }
-        )
-
-        return json.dumps(
-            {
-                "title": "Result vs Match Duration",
-                "data": {"labels": labels, "datasets": datasets},
-            },
-            default=str,
-        )
-
     def __get_competition_map_stats(self):
         return self.object.competition_map_stats.select_related("map").order_by("map__name")
 
@@ -874,7 +900,7 @@ class AuthorDetail(DetailView):
             .order_by("-created")
         )
         results_queryset = (
-            Result.objects.filter(match__matchparticipation__bot__in=context["bot_list"])
+            Result.objects.filter(id__in=AuthorRecentResult.objects.filter(user_id=self.object.id).values("result_id"))
             .only("type", "match__requested_by__username", "created", "game_steps", "replay_file", "winner__name")
             .select_related("match__requested_by", "winner")
             .order_by("-created")
@@ -892,43 +918,29 @@ class AuthorDetail(DetailView):
         return context
 
 
-class RecentResults(ListView):
-    queryset = (
-        Result.objects.all()
-        .order_by("-created")
-        .prefetch_related(
-            Prefetch("winner"),
-            Prefetch("match__requested_by"),
-            Prefetch(
-                "match__matchparticipation_set",
-                MatchParticipation.objects.all().prefetch_related("bot"),
-                to_attr="participants",
-            ),
-        )[:200]
-    )
+class RecentResults(AnonymousPageCacheMixin, ListView):
+    page_cache_name = "recent_results"
     template_name = "recent_results.html"
+    context_object_name = "result_list"
+
+    def get_queryset(self):
+        return RecentResultsFeed.get()
 
 
 class ArenaClients(ListView):
+    queryset = ArenaClient.objects.select_related("owner").filter(is_active=True)
     template_name = "arenaclients.html"
 
-    def get_queryset(self):
-        now = timezone.now()
-        one_hour_ago = now - timedelta(hours=1)
-        twenty_four_hours_ago = now - timedelta(hours=24)
-
-        return (
-            ArenaClient.objects.select_related("owner")
-            .filter(is_active=True)
-            .annotate(matches_1hr=Count("submitted_results", filter=Q(submitted_results__created__gte=one_hour_ago)))
-            .annotate(
-                matches_24hr=Count("submitted_results", filter=Q(submitted_results__created__gte=twenty_four_hours_ago))
-            )
-        )
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        result_counts = ArenaClientThroughput.get_result_counts()
+        for arenaclient in context["object_list"]:
+            arenaclient.matches_1hr, arenaclient.matches_24hr = result_counts.get(arenaclient.id, (0, 0))
+        return context
 
 
 class ArenaClientView(DetailView):
-    queryset = User.objects.filter(type="ARENA_CLIENT")
+    queryset = ArenaClient.objects.select_related("owner")
     template_name = "arenaclient.html"
     context_object_name = "arenaclient"  # change the context name to avoid overriding the current user oontext object
 
@@ -939,9 +951,10 @@ class ArenaClientView(DetailView):
         results = self.get_results(arenaclient)
 
         context["assigned_matches_list"] = self.get_assigned_matches()
-        context["ac_match_count_1h"] = self.get_match_count(hours=1)
-        context["ac_match_count_24h"] = self.get_match_count(hours=24)
-        context["ac_match_count"] = results.count()
+        context["ac_match_count_1h"], context["ac_match_count_24h"] = ArenaClientThroughput.get_result_counts(
+            [arenaclient.id]
+        ).get(arenaclient.id, (0, 0))
+        context["ac_match_count"] = arenaclient.submitted_result_count
         context["recent_result_list"] = results[:100]
         return context
 
@@ -978,10 +991,6 @@ class ArenaClientView(DetailView):
             )
         )
 
-    def get_match_count(self, hours):
-        time_threshold = timezone.now() - timedelta(hours=hours)
-        return Result.objects.filter(match__assigned_to=self.object, created__gte=time_threshold).count()
-
 
 class RoundDetail(DetailView):
     model = Round
@@ -989,24 +998,37 @@ class RoundDetail(DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        matches_finished = 0
-        matches_started = 0
-        matches_queued = 0
-
-        matches = self.object.match_set.all()
-        for match in matches:
-            if match.status == "Finished":
-                matches_finished += 1
-            elif match.status == "Started":
-                matches_started += 1
-            elif match.status == "Queued":
-                matches_queued += 1
-            else:
-                raise "A match had an unknown status!"
 
-        context["matches_finished"] = matches_finished
-        context["matches_started"] = matches_started
-        context["matches_queued"] = matches_queued
+        # Count the matches by Match.status in a single query
+        context.update(
+            self.object.match_set.aggregate(
+                matches_finished=Count("id", filter=Q(result__isnull=False)),
+                matches_started=Count("id", filter=Q(result__isnull=True, started__isnull=False)),
+                matches_queued=Count("id", filter=Q(result__isnull=True, started__isnull=True)),
+            )
+        )
+
+        context["matches"] = (
+            self.object.match_set.select_related("result", "assigned_to")
+            .only(
+                "round_id",
+                "started",
+                "result__match_id",
+                "result__created",
+                "assigned_to__username",
+                "assigned_to__type",
+            )
+            .prefetch_related(
+                Prefetch(
+                    "matchparticipation_set",
+                    MatchParticipation.objects.select_related("bot")
+                    .only("match_id", "participant_number", "bot__name")
+                    .order_by("participant_number"),
+                    to_attr="participants",
+                )
+            )
+            .order_by("id")
+        )
 
         return context
 
@@ -1066,7 +1088,9 @@ class MatchLogDownloadView(PrivateStorageDetailView):
         return user.is_authenticated and user.is_staff or private_file.parent_object.bot.user == user
 
 
-class Index(ListView):
+class Index(AnonymousPageCacheMixin, ListView):
+    page_cache_name = "index"
+
     def get_queryset(self):
         """This was applicable before multiple competitions and has only been left here to avoid having to refactor
         the code"""
@@ -1075,7 +1099,6 @@ class Index(ListView):
     def get_competitions(self):
         competition_context = []
         cache_time = config.TOP10_CACHE_TIME
-        elo_trend_n_matches = config.ELO_TREND_N_MATCHES
         competitions = (
             Competition.objects.only("name", "interest", "n_divisions", "n_placements")
             .filter(status__in=["frozen", "paused", "open", "closing"])
@@ -1102,24 +1125,12 @@ class Index(ListView):
                 cache_key = f"{comp.id}-top10-cache"
                 top10 = cache.get(cache_key)
                 if top10 is None:
-                    top10 = Ladders.get_competition_ranked_participants(comp, amount=10).prefetch_related(
-                        Prefetch("bot", queryset=Bot.objects.all().only("user_id", "name")),
-                        Prefetch("bot__user", queryset=User.objects.all().only("patreon_level")),
-                        Prefetch(
-                            "bot__matchparticipation_set",
-                            queryset=MatchParticipation.objects.filter(
-                                elo_change__isnull=False,
-                                match__requested_by__isnull=True,
-                                match__round__competition=comp,
-                            ).order_by("-match__started")[:elo_trend_n_matches],
-                            to_attr="match_participations",
-                        ),
-                    )
-
-                    for participant in top10:
-                        participant.trend = sum(
-                            participation.elo_change for participation in participant.bot.match_participations
+                    top10 = list(
+                        Ladders.get_competition_leaderboard(comp, amount=10).prefetch_related(
+                            Prefetch("bot", queryset=Bot.objects.all().only("user_id", "name")),
+                            Prefetch("bot__user", queryset=User.objects.all().only("patreon_level")),
                         )
+                    )
                     cache.set(cache_key, top10, cache_time)
 
                 competition_context.append(
@@ -1162,37 +1173,16 @@ class Index(ListView):
     template_name = "index.html"
 
 
-class MatchQueue(View):
-    def get(self, request):
-        # Matches without a round are requested ones
-        requested_matches = (
-            Match.objects.filter(round__isnull=True, result__isnull=True)
-            .order_by(F("started").asc(nulls_last=True), F("id").asc())
-            .prefetch_related(
-                Prefetch("map"),
-                Prefetch(
-                    "matchparticipation_set",
-                    MatchParticipation.objects.all().prefetch_related("bot"),
-                    to_attr="participants",
-                ),
-            )
-        )
+class MatchQueue(AnonymousPageCacheMixin, View):
+    page_cache_name = "match_queue"
+    matches_per_round = 100
 
-        # Matches with a round
-        rounds = Round.objects.filter(complete=False).order_by(F("id").asc())
+    def get(self, request):
+        requested_matches, rounds = Matches.get_queue()
         for round in rounds:
-            round.matches = (
-                Match.objects.filter(round_id=round.id, result__isnull=True)
-                .select_related("map")
-                .order_by(F("started").asc(nulls_last=True), F("id").asc())
-                .prefetch_related(
-                    Prefetch(
-                        "matchparticipation_set",
-                        MatchParticipation.objects.all().prefetch_related("bot"),
-                        to_attr="participants",
-                    )
-                )
-            )
+            paginator = Paginator(round.matches, self.matches_per_round)
+            round.matches = paginator.get_page(request.GET.get(f"round_{round.id}_page"))
+            round.page_range = restrict_page_range(paginator.num_pages, round.matches.number)
 
         context = {"round_list": rounds, "requested_matches": requested_matches}
         return render(request, "match_queue.html", context)
@@ -1274,9 +1264,13 @@ class CompetitionList(ListView):
         return context
 
 
-class CompetitionDetail(DetailView):
+class CompetitionDetail(AnonymousPageCacheMixin, DetailView):
     model = Competition
     template_name = "competition.html"
+    page_cache_name = "competition"
+
+    def get_page_cache_groups(self):
+        return ["competition", f"competition_{self.kwargs['pk']}"]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1287,8 +1281,6 @@ class CompetitionDetail(DetailView):
             map_names.append(map.name)
         context["map_names"] = map_names
 
-        elo_trend_n_matches = config.ELO_TREND_N_MATCHES
-
         rounds = Round.objects.filter(competition_id=self.object.id).order_by("-id")
         page = self.request.GET.get("page", 1)
         paginator = Paginator(rounds, 30)
@@ -1304,7 +1296,7 @@ class CompetitionDetail(DetailView):
         if self.object.status == "closed":
             all_participants = Ladders.get_competition_last_round_participants(self.object)
         else:
-            all_participants = Ladders.get_competition_ranked_participants(self.object, include_placements=True)
+            all_participants = Ladders.get_competition_leaderboard(self.object, include_placements=True)
         all_participants = list(
             all_participants.prefetch_related(
                 Prefetch(
@@ -1317,28 +1309,6 @@ class CompetitionDetail(DetailView):
             )
         )
 
-        relative_result = RelativeResult.with_row_number([x.bot.id for x in all_participants], self.object)
-
-        # This check avoids a potential EmptyResultSet exception.
-        # See https://code.djangoproject.com/ticket/26061
-        if relative_result.count() > 0:
-            sql, params = relative_result.query.sql_with_params()
-
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    """
-                    SELECT bot_id as id, SUM("elo_change") trend FROM ({}) row_numbers
-                    WHERE "row_number" <= %s
-                    GROUP BY bot_id
-                """.format(
-                        sql
-                    ),
-                    [*params, elo_trend_n_matches],
-                )
-                rows = cursor.fetchall()
-                for participant in all_participants:
-                    participant.trend = next(iter([x[1] for x in rows if x[0] == participant.bot.id]), None)
-
         context["divisions"] = dict()
         to_title = lambda x: "Awaiting Entry" if x == CompetitionParticipation.DEFAULT_DIVISION else f"Division {x}"
         for participant in all_participants:
@@ -275,7 +275,17 @@ CONSTANCE_CONFIG = {
     ),
     "TOP10_CACHE_TIME": (180, "How long to cache top10 competition results for"),
     "NEWS_CACHE_TIME": (300, "How long to cache news for"),
+    "PAGE_CACHE_TIME": (
+        300,
+        "In seconds, how long to cache public pages for anonymous visitors. "
+        "They are also refreshed whenever their content changes.",
+    ),
     "GAME_AVAILABLE_CACHE_TIME": (60, "How long to cache NoGameAvailable response for"),
+    "BOT_STATS_CHARTS_CACHE_TIME": (
+        86400,
+        "How long to cache a bot's competition stats charts for. "
+        "They are also refreshed whenever a result for the bot is submitted.",
+    ),
 }
 
 CONSTANCE_CONFIG_FIELDSETS = {
@@ -333,7 +343,13 @@ CONSTANCE_CONFIG_FIELDSETS = {
         "ADMIN_WEBSTATS_LINK",
         "PROJECT_FINANCE_LINK",
     ),
-    "Caching": ("TOP10_CACHE_TIME", "NEWS_CACHE_TIME", "GAME_AVAILABLE_CACHE_TIME"),
+    "Caching": (
+        "TOP10_CACHE_TIME",
+        "NEWS_CACHE_TIME",
+        "PAGE_CACHE_TIME",
+        "GAME_AVAILABLE_CACHE_TIME",
+        "BOT_STATS_CHARTS_CACHE_TIME",
+    ),
 }
 
 LOGGING = {
@@ -515,10 +531,18 @@ if crontab:
             "task": "aiarena.core.tasks.kill_slow_queries",
             "schedule": timedelta(seconds=15),
         },
+        "export_competition_history": {
+            "task": "aiarena.core.tasks.export_competition_history",
+            "schedule": crontab(minute=15),  # At minute 15 of every hour
+        },
         "generate_stats": {
             "task": "aiarena.core.tasks.generate_stats",
             "schedule": crontab(minute=0, hour="11,23"),  # At minute 0 past hour 11 and 23
         },
+        "run_interest_analyzer": {
+            "task": "aiarena.core.tasks.run_interest_analyzer",
+            "schedule": timedelta(minutes=1),
+        },
         "refresh_patreon_tiers": {
             "task": "aiarena.core.tasks.refresh_patreon_tiers",
             "schedule": crontab(minute=0, hour=0),  # Everyday at 00:00
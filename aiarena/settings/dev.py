@@ -19,4 +19,9 @@ MIDDLEWARE.append("debug_toolbar.middleware.DebugToolbarMiddleware")  # noqa: F4
 DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
 PRIVATE_STORAGE_CLASS = "private_storage.storage.files.PrivateFileSystemStorage"
 PRIVATE_STORAGE_ROOT = os.path.join(BASE_DIR, "private-media")  # noqa: F405
+# How private files are sent once access to them has been checked.
+# "django" streams them through the worker. "nginx" (X-Accel-Redirect) and "apache" (X-Sendfile) hand the transfer to
+# the web server in front of Django - see docker/local/nginx/default.conf for the required nginx location.
+PRIVATE_STORAGE_SERVER = os.getenv("PRIVATE_STORAGE_SERVER", "django")  # noqa: F405
+PRIVATE_STORAGE_INTERNAL_URL = "/private-x-accel-redirect/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")  # noqa: F405